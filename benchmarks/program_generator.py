@@ -0,0 +1,117 @@
+"""This file implements a generator for synthetic slice_me programs. The size and shape of the generated programs is
+controlled by a few parameters, so that the slicing analyses can be benchmarked on workloads of increasing size."""
+
+from typing import List
+
+
+class ProgramParameters:
+    def __init__(self, loop_iterations: int = 10, variable_count: int = 4, alias_depth: int = 1, nesting_depth: int = 1,
+                 control_flow_depth: int = 1):
+        self.loop_iterations = loop_iterations
+        self.variable_count = max(variable_count, 1)
+        self.alias_depth = alias_depth
+        self.nesting_depth = nesting_depth
+        self.control_flow_depth = control_flow_depth
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class ProgramBuilder:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indentation = 0
+
+    def add(self, line: str):
+        self.lines.append("    " * self.indentation + line)
+
+    def indent(self):
+        self.indentation += 1
+
+    def dedent(self):
+        self.indentation -= 1
+
+    def code(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def attribute_path(depth: int) -> str:
+    return "root" + ".child" * depth
+
+
+def subscript_path(depth: int) -> str:
+    return "grid" + "[0]" * depth
+
+
+def nested_list_literal(depth: int) -> str:
+    literal = "[0, 1]"
+    for _ in range(depth - 1):
+        literal = "[" + literal + ", " + literal + "]"
+    return literal
+
+
+def generate_program(parameters: ProgramParameters) -> str:
+    """Generate the source code of a program with a slice_me function and a single call of it. The slicing criterion
+    is placed on the return statement of slice_me. Only constructs supported by the slicing analyses are used."""
+    builder = ProgramBuilder()
+    variables = ["v" + str(index) for index in range(parameters.variable_count)]
+
+    builder.add("class Node:")
+    builder.indent()
+    builder.add("def __init__(self):")
+    builder.indent()
+    builder.add("self.value = 0")
+    builder.add("self.child = None")
+    builder.dedent()
+    builder.dedent()
+    builder.add("")
+    builder.add("")
+
+    builder.add("def slice_me():")
+    builder.indent()
+    for index, variable in enumerate(variables):
+        builder.add(f"{variable} = {index}")
+
+    # attribute nesting: root.child.child... with the value stored at the innermost node
+    builder.add("root = Node()")
+    for depth in range(1, parameters.nesting_depth + 1):
+        builder.add(f"{attribute_path(depth)} = Node()")
+
+    # subscript nesting: grid[0][0]... with a nested list literal of the same depth
+    builder.add(f"grid = {nested_list_literal(max(parameters.nesting_depth, 1))}")
+
+    # alias chain on a mutable object
+    builder.add("items = [0]")
+    previous_alias = "items"
+    for depth in range(parameters.alias_depth):
+        alias = "alias" + str(depth)
+        builder.add(f"{alias} = {previous_alias}")
+        previous_alias = alias
+
+    builder.add("i = 0")
+    builder.add(f"while i < {parameters.loop_iterations}:")
+    builder.indent()
+
+    for depth in range(parameters.control_flow_depth):
+        builder.add(f"if i % {depth + 2} == 0:")
+        builder.indent()
+        builder.add(f"{variables[depth % len(variables)]} = {variables[(depth + 1) % len(variables)]} + i")
+    for _ in range(parameters.control_flow_depth):
+        builder.dedent()
+
+    for index, variable in enumerate(variables):
+        builder.add(f"{variable} += {variables[(index + 1) % len(variables)]} % 7")
+    builder.add(f"{attribute_path(parameters.nesting_depth)}.value = {variables[0]}")
+    builder.add(f"{subscript_path(max(parameters.nesting_depth, 1) - 1)}[0] = {variables[-1]}")
+    builder.add(f"{previous_alias}.append({variables[0]})")
+    builder.add("i += 1")
+    builder.dedent()
+
+    builder.add(f"result = {variables[0]} + {attribute_path(parameters.nesting_depth)}.value")
+    builder.add("return result # slicing criterion")
+    builder.dedent()
+    builder.add("")
+    builder.add("")
+    builder.add("slice_me()")
+
+    return builder.code()
@@ -0,0 +1,224 @@
+"""This file implements a benchmark suite for the slicing analyses. It generates synthetic slice_me programs of
+increasing size, runs them with the available analyses and writes the measured timings and memory usage as JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output bench_results.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import platform
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from dynapyt.instrument.instrument import instrument_file
+
+from program_generator import ProgramParameters, generate_program
+from dynamicslicing.analysis_hooks import get_analysis_hooks
+from dynamicslicing.inline_recording import generate_inline_recording, replay_records, run_inline_recording
+from dynamicslicing.utils import remove_lines
+
+ANALYSES = {
+    "Slice": "dynamicslicing.slice.Slice",
+    "SliceDataflow": "dynamicslicing.slice_dataflow.SliceDataflow",
+}
+
+BASE_PARAMETERS = {
+    "loop_iterations": 10,
+    "variable_count": 4,
+    "alias_depth": 1,
+    "nesting_depth": 1,
+    "control_flow_depth": 1,
+}
+
+# every parameter is scaled on its own while the others keep their base value
+PARAMETER_SCALES = {
+    "loop_iterations": [10, 40, 160],
+    "variable_count": [4, 8, 16],
+    "alias_depth": [1, 4, 16],
+    "nesting_depth": [1, 2, 4],
+    "control_flow_depth": [1, 2, 4],
+}
+
+
+def build_parameter_grid(scales: Dict[str, List[int]]) -> List[ProgramParameters]:
+    grid = []
+    seen = set()
+    for name, values in scales.items():
+        for value in values:
+            arguments = dict(BASE_PARAMETERS)
+            arguments[name] = value
+            key = tuple(sorted(arguments.items()))
+            if key not in seen:
+                seen.add(key)
+                grid.append(ProgramParameters(**arguments))
+    return grid
+
+
+def measure(function: Callable[[], Any]) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def prepare_program(folder: Path, source: str, analysis_path: str) -> Tuple[Path, float]:
+    """Write the program to the given folder and instrument it for the given analysis. Returns the path of the
+    original (uninstrumented) program copy, as expected by the analysis constructors, and the instrumentation time."""
+    program_file = folder.joinpath("program.py")
+    with open(program_file, "w") as file:
+        file.write(source)
+    hooks = get_analysis_hooks([f"{analysis_path}:{program_file}"])
+    with contextlib.redirect_stdout(sys.stderr):
+        instrumentation_time, _ = measure(lambda: instrument_file(str(program_file), hooks))
+    return folder.joinpath("program.py.orig"), instrumentation_time
+
+
+def load_analysis_class(analysis_path: str):
+    module_name, class_name = analysis_path.rsplit(".", 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def run_instrumented(program_file: Path, analysis) -> float:
+    """Execute the instrumented program with the given analysis instance, without triggering the end of execution
+    hook, so that the analysis phases can be measured separately afterwards."""
+    import dynapyt.runtime as _rt
+
+    _rt.analyses = None
+    _rt.set_analysis([analysis])
+    _rt.end_execution_called = True  # the analysis phases are triggered manually
+    analysis.begin_execution()
+    execution_time, _ = measure(lambda: runpy.run_path(str(program_file)))
+    del sys.modules["dynapyt.runtime"]
+    return execution_time
+
+
+def benchmark_inline_recording(orig_program_file: Path, analysis_class) -> Dict[str, Any]:
+    """Record the program with generated recording code instead of the DynaPyt hooks."""
+    analysis = analysis_class(str(orig_program_file))
+    generation_time, program = measure(lambda: generate_inline_recording(analysis.ast, analysis.alias_primitive_values))
+    with contextlib.redirect_stdout(sys.stderr):
+        execution_time, records = measure(lambda: run_inline_recording(program, orig_program_file))
+    replay_time, _ = measure(lambda: replay_records(records, program.variables, analysis.recorder))
+    return {
+        "generation_time": generation_time,
+        "execution_time": execution_time,
+        "replay_time": replay_time,
+        "event_count": len(analysis.recorder.event_stack),
+        "slice": analysis.compute_slice(),
+    }
+
+
+def benchmark_analysis(folder: Path, source: str, analysis_name: str, track_memory: bool) -> Dict[str, Any]:
+    analysis_path = ANALYSES[analysis_name]
+    analysis_class = load_analysis_class(analysis_path)
+    orig_program_file, instrumentation_time = prepare_program(folder, source, analysis_path)
+    program_file = folder.joinpath("program.py")
+
+    analysis = analysis_class(str(orig_program_file))
+    execution_time = run_instrumented(program_file, analysis)
+    compute_slice_time, result_slice = measure(analysis.compute_slice)
+    remove_lines_time, _ = measure(lambda: remove_lines(analysis.source, list(result_slice)))
+
+    result = {
+        "analysis": analysis_name,
+        "instrumentation_time": instrumentation_time,
+        "execution_time": execution_time,
+        "compute_slice_time": compute_slice_time,
+        "remove_lines_time": remove_lines_time,
+        "event_count": len(analysis.recorder.event_stack),
+        "slice_size": len(result_slice),
+    }
+
+    inline = benchmark_inline_recording(orig_program_file, analysis_class)
+    result.update({
+        "inline_generation_time": inline["generation_time"],
+        "inline_execution_time": inline["execution_time"],
+        "inline_replay_time": inline["replay_time"],
+        "inline_event_count": inline["event_count"],
+        "inline_slice_matches": inline["slice"] == result_slice,
+    })
+
+    if track_memory:
+        # separate run, as tracemalloc distorts the timings
+        analysis = analysis_class(str(orig_program_file))
+        tracemalloc.start()
+        run_instrumented(program_file, analysis)
+        _, execution_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result_slice = analysis.compute_slice()
+        remove_lines(analysis.source, list(result_slice))
+        _, analysis_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_execution"] = execution_peak
+        result["peak_memory_analysis"] = analysis_peak
+
+    shutil.move(str(orig_program_file), str(program_file))
+    folder.joinpath("program-dynapyt.json").unlink()
+    return result
+
+
+def benchmark_program(parameters: ProgramParameters, analyses: List[str], repetitions: int,
+                      track_memory: bool) -> Dict[str, Any]:
+    source = generate_program(parameters)
+    baseline_times = [measure(lambda: exec(compile(source, "program.py", "exec"), {"__name__": "__main__"}))[0]
+                      for _ in range(repetitions)]
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        folder = Path(directory)
+        for analysis_name in analyses:
+            runs = [benchmark_analysis(folder, source, analysis_name, track_memory and repetition == 0)
+                    for repetition in range(repetitions)]
+            result = min(runs, key=lambda run: run["execution_time"])
+            result.update({key: value for key, value in runs[0].items() if key.startswith("peak_memory")})
+            result["execution_overhead"] = result["execution_time"] / max(min(baseline_times), 1e-9)
+            result["inline_execution_overhead"] = result["inline_execution_time"] / max(min(baseline_times), 1e-9)
+            results.append(result)
+
+    return {
+        "parameters": parameters.to_dict(),
+        "source_lines": source.count("\n"),
+        "baseline_execution_time": min(baseline_times),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the slicing analyses on synthetic programs.")
+    parser.add_argument("--output", help="File to write the JSON results to (default: stdout)")
+    parser.add_argument("--analyses", nargs="+", choices=list(ANALYSES), default=list(ANALYSES))
+    parser.add_argument("--repetitions", type=int, default=3, help="Runs per program, the fastest one is reported")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc based memory measurement")
+    parser.add_argument("--scales", help="JSON object mapping parameter names to lists of values to benchmark")
+    args = parser.parse_args()
+
+    scales = json.loads(args.scales) if args.scales else PARAMETER_SCALES
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "programs": [benchmark_program(parameters, args.analyses, args.repetitions, not args.no_memory)
+                     for parameters in build_parameter_grid(scales)],
+    }
+
+    json_string = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(json_string)
+    else:
+        print(json_string)
+
+
+if __name__ == "__main__":
+    main()
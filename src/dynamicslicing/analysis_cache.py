@@ -0,0 +1,141 @@
+"""This file implements process wide caches for the parts of an analysis that do not depend on the execution: the
+static analysis of the source (parsed CST, definitions, control flow elements, static graph layers and static
+pre-slice), the parsed instrumented CST and the IID maps. Each hook otherwise reloads the IID map from disk. The caches
+pay off most in long-lived processes like the slicing server, which slice the same programs repeatedly."""
+
+import hashlib
+import os
+from collections import Counter, OrderedDict
+from typing import Optional, Tuple
+
+import libcst as cst
+from dynapyt.instrument.IIDs import IIDs
+from rdflib import Graph
+
+from .dependency_graph_control_flow import create_graph_from_control_flow
+from .dependency_graph_definitions import create_graph_from_definitions
+from .finders import (CFElement, find_calls_reaching, find_control_flow_elements, find_definitions,
+                      find_slice_me_call, find_slicing_criterion_line)
+from .static_pre_slice import StaticPreSlice, compute_static_pre_slice
+
+MAX_CACHED_PROGRAMS = 32
+
+# the number of static analysis results taken from the caches instead of being computed, by part, for the profiling
+# report: phases served from the cache take next to no time and memory
+cache_hits: Counter = Counter()
+
+
+class StaticAnalysis:
+    """Static analysis results of a source. The control flow elements, graph layers and pre-slice are computed on first
+    use. Instances are shared between analyses, so they must not be modified."""
+
+    def __init__(self, source: str):
+        self.ast = cst.parse_module(source)
+        self.definitions = find_definitions(self.ast)
+        self.slicing_criterion = find_slicing_criterion_line(self.ast)
+        self.slice_me_call = find_slice_me_call(self.ast)
+        # the lines to keep in each slice so that slice_me is called, e.g. through the function containing the call
+        self.slice_me_calls = find_calls_reaching(self.ast, self.definitions, self.slice_me_call)
+        self.cf_elements: Optional[CFElement] = None
+        self.graph_definitions: Optional[Graph] = None
+        self.graph_control_flow: Optional[Graph] = None
+        self.static_pre_slice: Optional[StaticPreSlice] = None
+
+    def get_control_flow_elements(self) -> CFElement:
+        if self.cf_elements is None:
+            self.cf_elements = find_control_flow_elements(self.definitions["slice_me"], self.ast)
+        else:
+            cache_hits["control_flow_elements"] += 1
+        return self.cf_elements
+
+    def get_graph_definitions(self) -> Graph:
+        if self.graph_definitions is None:
+            self.graph_definitions = create_graph_from_definitions(self.definitions)
+        else:
+            cache_hits["graph_definitions"] += 1
+        return self.graph_definitions
+
+    def get_graph_control_flow(self) -> Graph:
+        if self.graph_control_flow is None:
+            self.graph_control_flow = create_graph_from_control_flow(self.get_control_flow_elements())
+        else:
+            cache_hits["graph_control_flow"] += 1
+        return self.graph_control_flow
+
+    def get_static_pre_slice(self) -> StaticPreSlice:
+        if self.static_pre_slice is None:
+            self.static_pre_slice = compute_static_pre_slice(self.ast, self.definitions,
+                                                             self.get_control_flow_elements(), self.slicing_criterion)
+        else:
+            cache_hits["static_pre_slice"] += 1
+        return self.static_pre_slice
+
+
+class LruCache(OrderedDict):
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def lookup(self, key):
+        if key not in self:
+            return None
+        self.move_to_end(key)
+        return self[key]
+
+    def store(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+static_analyses = LruCache(MAX_CACHED_PROGRAMS)
+instrumented_asts = LruCache(MAX_CACHED_PROGRAMS)
+iid_maps = LruCache(MAX_CACHED_PROGRAMS)
+
+
+def get_static_analysis(source: str) -> StaticAnalysis:
+    key = hashlib.sha256(source.encode()).hexdigest()
+    static_analysis = static_analyses.lookup(key)
+    if static_analysis is None:
+        static_analysis = StaticAnalysis(source)
+        static_analyses.store(key, static_analysis)
+    else:
+        cache_hits["static_analysis"] += 1
+    return static_analysis
+
+
+def get_file_version(path: str) -> Optional[Tuple[str, int, int]]:
+    """Return a key identifying the current content of a file, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def get_iids(file_path: str) -> IIDs:
+    """Return the IID map of an (instrumented) file, reloading it only if its file changed."""
+    iids_path = (file_path[:-8] if file_path.endswith(".py.orig") else file_path[:-3]) + "-dynapyt.json"
+    version = get_file_version(iids_path)
+    if version is None:
+        return IIDs(file_path)
+    iids = iid_maps.lookup(version)
+    if iids is None:
+        iids = IIDs(file_path)
+        iid_maps.store(version, iids)
+    return iids
+
+
+def get_instrumented_ast(file_path: str) -> Optional[Tuple[cst.Module, IIDs]]:
+    """Return the parsed CST of an instrumented file together with its IID map, in the format of
+    BaseAnalysis._get_ast."""
+    version = get_file_version(file_path)
+    if version is None:
+        return None
+    entry = instrumented_asts.lookup(version)
+    if entry is None:
+        with open(file_path, "r") as file:
+            entry = (cst.parse_module(file.read()), get_iids(file_path))
+        instrumented_asts.store(version, entry)
+    return entry
@@ -0,0 +1,32 @@
+"""This file provides the DynaPyt hooks a program is instrumented with for the analyses. DynaPyt selects every hook an
+analysis defines, but some hooks of the analyses only serve optional modes. These are left out of the instrumentation
+unless a setting requires them, so that the callbacks of the default analysis stay the same."""
+
+from typing import Dict, List
+
+from dynapyt.utils.hooks import get_hooks_from_analysis
+
+from dynamicslicing.settings import EARLY_TERMINATION, SCOPE_FILTER, INCREMENTAL_SLICING, LOOP_FIXED_POINT
+
+
+def get_optional_hooks() -> Dict[str, bool]:
+    """Map each optional hook of the analyses to whether the current settings require it."""
+    return {
+        # observes the return of slice_me, and of the calls in its dynamic extent
+        "post_call": EARLY_TERMINATION or SCOPE_FILTER,
+        # collects the functions entered during execution, which edits have to leave unchanged
+        "function_enter": INCREMENTAL_SLICING,
+        # split the execution of loops into the iterations compared to detect a fixed point
+        "enter_for": LOOP_FIXED_POINT,
+        "exit_for": LOOP_FIXED_POINT,
+        "enter_while": LOOP_FIXED_POINT,
+        "exit_while": LOOP_FIXED_POINT,
+    }
+
+
+def get_analysis_hooks(classes: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Return the hooks of the given analyses (as for get_hooks_from_analysis), without the optional hooks that the
+    settings do not require."""
+    optional_hooks = get_optional_hooks()
+    return {hook: details for hook, details in get_hooks_from_analysis(classes).items()
+            if optional_hooks.get(hook, True)}
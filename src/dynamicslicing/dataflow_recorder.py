@@ -1,16 +1,24 @@
 """This file defines the event recorder classes for dataflow events. To be filled with data during
 execution of instructed code. Can then be used to perform dataflow analysis based on the recorded events."""
 
+import asyncio
 import copy
-from typing import List
+import heapq
+import inspect
+import itertools
+import sys
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
-from json import dumps
+from json import dumps, loads
 
 
 class Event:
     def __init__(self, line: int):
         self.line = line
-        self.aliases: set[EventAlias] = set()
+        # variables behind the aliases of the event's variable, only resolved at recording time by the indexed recorder
+        self.aliases: set[str] = set()
 
 
 class EventAssign(Event):
@@ -41,6 +49,8 @@ class EventAlias(Event):
 class DataflowRecorderSimple:
     def __init__(self):
         self.event_stack: List[Event] = []
+        # the slicing criterion the events were restricted to by a static pre-slice, if the trace was loaded from a file
+        self.pre_slice_criterion: Optional[int] = None
 
     def record_assignment(self, variable: str, line: int):
         self.event_stack.append(EventAssign(line, variable))
@@ -55,6 +65,210 @@ class DataflowRecorderSimple:
         self.event_stack.append(EventUse(line, variable))
 
 
+class DataflowRecorderIndexed(DataflowRecorderSimple):
+    """
+    Recorder for demand-driven traversal of the trace. In addition to the events, it keeps
+    - for each use and modification, the variables behind the aliases of the variable at that time, so that the trace
+      can be traversed backwards without replaying the alias events forwards,
+    - the index of the first event of each line and of the first definition of each variable, so that a backward
+      traversal can tell when no relevant event is left.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.latest_aliases: Dict[str, str] = {}
+        self.first_event_by_line: Dict[int, int] = {}
+        self.first_definition_by_variable: Dict[str, int] = {}
+
+    def record_assignment(self, variable: str, line: int):
+        self.index_event(line, [variable])
+        super().record_assignment(variable, line)
+        # note that this requires alias event to be triggered after assign event
+        self.latest_aliases.pop(variable, None)
+
+    def record_alias(self, alias: str, variable: str, line: int):
+        self.index_event(line, [])
+        super().record_alias(alias, variable, line)
+        self.latest_aliases[alias] = variable
+
+    def record_modification(self, variable: str, line: int):
+        aliases = self.resolve_aliases(variable)
+        self.index_event(line, [variable, *aliases])
+        super().record_modification(variable, line)
+        self.event_stack[-1].aliases = aliases
+
+    def record_usage(self, variable: str, line: int):
+        aliases = self.resolve_aliases(variable)
+        self.index_event(line, [])
+        super().record_usage(variable, line)
+        self.event_stack[-1].aliases = aliases
+
+    def index_event(self, line: int, defined_variables: List[str]):
+        index = len(self.event_stack)
+        self.first_event_by_line.setdefault(line, index)
+        for variable in defined_variables:
+            self.first_definition_by_variable.setdefault(variable, index)
+
+    def resolve_aliases(self, variable: str) -> set[str]:
+        aliases = set()
+        variable = self.latest_aliases.get(variable)
+        # stop at the end of the alias chain or when it runs into a cycle
+        while variable and variable not in aliases:
+            aliases.add(variable)
+            variable = self.latest_aliases.get(variable)
+        return aliases
+
+
+class DataflowRecorderThreaded(DataflowRecorderSimple):
+    """
+    Recorder for multi-threaded programs. Each thread appends to its own buffer, so that recording does not serialize
+    on one shared list. Every event is tagged with a global monotonic sequence number (next on an itertools.count is
+    atomic), and the buffers are merged lazily in sequence order when the event stack is accessed. Thus, the dataflow
+    is built in the order the events actually happened across threads.
+    """
+
+    def __init__(self):
+        # the event stack is provided by the merging property instead
+        self.local = threading.local()
+        self.sequence = itertools.count()
+        self.buffers: List[List[Tuple[int, Event]]] = []
+        self.merged_events: List[Event] = []
+        self.merged_count = 0
+
+    @property
+    def event_stack(self) -> List[Event]:
+        count = sum(len(buffer) for buffer in self.buffers)
+        if count != self.merged_count:
+            self.merged_events = [event for _, event in heapq.merge(*self.buffers, key=lambda entry: entry[0])]
+            self.merged_count = count
+        return self.merged_events
+
+    def get_buffer(self) -> List[Tuple[int, Event]]:
+        buffer: Optional[List[Tuple[int, Event]]] = getattr(self.local, "buffer", None)
+        if buffer is None:
+            buffer = []
+            self.local.buffer = buffer
+            self.buffers.append(buffer)
+        return buffer
+
+    def record_event(self, event: Event):
+        self.get_buffer().append((next(self.sequence), event))
+
+    def record_assignment(self, variable: str, line: int):
+        self.record_event(EventAssign(line, variable))
+
+    def record_alias(self, alias: str, variable: str, line: int):
+        self.record_event(EventAlias(line, alias, variable))
+
+    def record_modification(self, variable: str, line: int):
+        self.record_event(EventModify(line, variable))
+
+    def record_usage(self, variable: str, line: int):
+        self.record_event(EventUse(line, variable))
+
+
+class DataflowRecorderAsync(DataflowRecorderThreaded):
+    """
+    Recorder for asyncio programs. In addition to the threads, the events are buffered per asyncio task, so that the
+    events of interleaved coroutines stay distinguishable. The buffers are stitched together in sequence order, i.e.
+    they switch at the await boundaries where the event loop switched tasks.
+    The local variables of the coroutines a task runs are qualified with the task (e.g. x@task1 in the coroutine of the
+    task, x@helper@task1 in a coroutine helper it awaits), so that the dataflow does not mix up the local variables of
+    concurrently running instances of a coroutine. All other variables (e.g. shared through closures or globals) and the
+    local variables of plain functions, which cannot be interleaved with other tasks, keep their names and connect the
+    tasks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.task_streams: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.task_numbers = itertools.count(1)
+
+    def get_task_stream(self) -> Optional["TaskStream"]:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            # no event loop is running in this thread
+            return None
+        if task is None:
+            return None
+
+        stream = self.task_streams.get(task)
+        if stream is None:
+            stream = TaskStream(next(self.task_numbers), task.get_coro())
+            self.task_streams[task] = stream
+            self.buffers.append(stream.buffer)
+        return stream
+
+    def get_buffer(self) -> List[Tuple[int, Event]]:
+        stream = self.get_task_stream()
+        return stream.buffer if stream else super().get_buffer()
+
+    def qualify(self, variable: str) -> str:
+        stream = self.get_task_stream()
+        return stream.qualify(variable, get_program_frame()) if stream else variable
+
+    def record_assignment(self, variable: str, line: int):
+        super().record_assignment(self.qualify(variable), line)
+
+    def record_alias(self, alias: str, variable: str, line: int):
+        super().record_alias(self.qualify(alias), self.qualify(variable), line)
+
+    def record_modification(self, variable: str, line: int):
+        super().record_modification(self.qualify(variable), line)
+
+    def record_usage(self, variable: str, line: int):
+        super().record_usage(self.qualify(variable), line)
+
+
+# the frames of these packages belong to the analysis, not to the analyzed program
+ANALYSIS_PACKAGES = ("dynapyt", "dynamicslicing")
+
+COROUTINE_FLAGS = inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE | inspect.CO_ASYNC_GENERATOR
+
+
+def get_program_frame():
+    """Return the innermost frame of the analyzed program, i.e. the one whose execution triggered the hook."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__", "").split(".")[0] in ANALYSIS_PACKAGES:
+        frame = frame.f_back
+    return frame
+
+
+class TaskStream:
+    """Event buffer of an asyncio task, together with the coroutine it runs."""
+
+    def __init__(self, number: int, coroutine):
+        self.buffer: List[Tuple[int, Event]] = []
+        self.suffix = "@task" + str(number)
+        self.coroutine = coroutine
+
+    def get_suffix(self, frame) -> Optional[str]:
+        """Return the qualifier of the local variables of the given frame, if it is a coroutine frame."""
+        if frame is None or not frame.f_code.co_flags & COROUTINE_FLAGS:
+            return None
+        if frame is getattr(self.coroutine, "cr_frame", None):
+            return self.suffix
+        # awaited helpers run one at a time within a task, so they do not need to be distinguished further
+        return "@" + frame.f_code.co_name + self.suffix
+
+    def qualify(self, variable: str, frame) -> str:
+        suffix = self.get_suffix(frame)
+        if suffix is None:
+            return variable
+        root_length = len(variable)
+        for separator in (".", "["):
+            index = variable.find(separator)
+            if index != -1:
+                root_length = min(root_length, index)
+        # cell variables are shared with nested functions, but still created per call. Free variables are the ones
+        # shared with the enclosing function, so they are not local
+        code = frame.f_code
+        if variable[:root_length] not in code.co_varnames and variable[:root_length] not in code.co_cellvars:
+            return variable
+        return variable[:root_length] + suffix + variable[root_length:]
+
+
 def convert_recorder_to_dict(recorder: DataflowRecorderSimple) -> dict:
     events = []
 
@@ -68,7 +282,55 @@ def convert_recorder_to_dict(recorder: DataflowRecorderSimple) -> dict:
     return {"events": events}
 
 
-def save_recorder_to_file(recorder: DataflowRecorderSimple, path: Path):
-    json_string = dumps(convert_recorder_to_dict(recorder), indent=4)
+def save_recorder_to_file(recorder: DataflowRecorderSimple, path: Path, pre_slice_criterion: Optional[int] = None):
+    """Save the events of a recorder. If they were restricted to the events relevant to a slicing criterion by a static
+    pre-slice, the criterion is saved with them, as the trace can not be sliced for other criteria."""
+    data = convert_recorder_to_dict(recorder)
+    if pre_slice_criterion is not None:
+        data["pre_slice_criterion"] = pre_slice_criterion
+    json_string = dumps(data, indent=4)
     with open(path, 'w') as file:
         file.write(json_string)
+
+
+def convert_dict_to_recorder(data: dict) -> DataflowRecorderSimple:
+    recorder = DataflowRecorderSimple()
+
+    for event_data in data["events"]:
+        event_type = event_data["type"]
+        if event_type == EventAssign.__name__:
+            event = EventAssign(event_data["line"], event_data["variable"])
+        elif event_type == EventUse.__name__:
+            event = EventUse(event_data["line"], event_data["variable"])
+        elif event_type == EventModify.__name__:
+            event = EventModify(event_data["line"], event_data["variable"])
+        elif event_type == EventAlias.__name__:
+            event = EventAlias(event_data["line"], event_data["alias"], event_data["variable_behind_alias"])
+        else:
+            raise RuntimeError("Unknown event type in recorder data: " + str(event_type))
+        event.aliases = set(event_data.get("aliases", []))
+        recorder.event_stack.append(event)
+    recorder.pre_slice_criterion = data.get("pre_slice_criterion")
+
+    return recorder
+
+
+def replay_events(events: Iterable[Event], recorder: DataflowRecorderSimple):
+    """Record the given events again with another recorder, e.g. to rebuild the indexes of a specialized recorder."""
+    for event in events:
+        if isinstance(recorder, DataflowRecorderThreaded):
+            # the variables were already qualified when the events were recorded
+            recorder.record_event(event)
+        elif isinstance(event, EventAssign):
+            recorder.record_assignment(event.variable, event.line)
+        elif isinstance(event, EventUse):
+            recorder.record_usage(event.variable, event.line)
+        elif isinstance(event, EventModify):
+            recorder.record_modification(event.variable, event.line)
+        elif isinstance(event, EventAlias):
+            recorder.record_alias(event.alias, event.variable_behind_alias, event.line)
+
+
+def load_recorder_from_file(path: Path) -> DataflowRecorderSimple:
+    with open(path, 'r') as file:
+        return convert_dict_to_recorder(loads(file.read()))
@@ -0,0 +1,132 @@
+"""This file defines a recorder that computes the slice while the instrumented code executes, instead of storing the
+events. For each variable, it keeps the set of lines its current value depends on, stored as bitset over the line
+numbers (an int with bit n set for line n). Uses, assignments and modifications union these sets, so that the slice of
+the slicing criterion is known as soon as it executed."""
+
+from typing import Dict, List, Set
+
+from dynamicslicing.dataflow_recorder import Event
+from dynamicslicing.dependency_graph_instances import StatementInstanceCounter
+from dynamicslicing.finders import Definition
+
+
+def lines_to_bitset(lines: Set[int]) -> int:
+    bitset = 0
+    for line in lines:
+        bitset |= 1 << line
+    return bitset
+
+
+def bitset_to_lines(bitset: int) -> Set[int]:
+    lines = set()
+    line = 0
+    while bitset:
+        if bitset & 1:
+            lines.add(line)
+        bitset >>= 1
+        line += 1
+    return lines
+
+
+class DataflowRecorderOnline:
+    """
+    Drop-in replacement for the event recorders that computes the slice on the fly. Each execution instance of a line
+    (see StatementInstanceCounter) starts with the line, the lines it statically depends on and the current slices of
+    its control flow headers, and accumulates the slices of the variables it uses. Assigned and modified variables take
+    over the slice of the instance. Variables that were never assigned are resolved by their static definition, like in
+    the dataflow graph. Compared to the dataflow graph, only the dependencies of the executions that actually reach the
+    criterion are included, so the slice may be smaller.
+    Memory is bounded by the number of variables times the number of lines, as no events are stored.
+    """
+
+    def __init__(self, slicing_criterion_line: int, definitions: dict[str, Definition],
+                 static_dependencies: Dict[int, Set[int]], control_dependencies: Dict[int, Set[int]]):
+        # kept empty, for compatibility with the event recorders
+        self.event_stack: List[Event] = []
+        self.event_count = 0
+        self.slicing_criterion_line = slicing_criterion_line
+        self.definitions = definitions
+        self.static_dependencies = static_dependencies
+        self.control_dependencies = control_dependencies
+        self.instances = StatementInstanceCounter(definitions)
+        self.static_slices: Dict[int, int] = {}
+        self.line_slices: Dict[int, int] = {}
+        self.variable_slices: Dict[str, int] = {}
+        self.latest_aliases: Dict[str, str] = {}
+        self.criterion_slice = 0
+
+    def record_assignment(self, variable: str, line: int):
+        line_slice = self.observe_line(line)
+        self.variable_slices[variable] = line_slice
+        # note that this requires alias event to be triggered after assign event
+        self.latest_aliases.pop(variable, None)
+        self.update_criterion(line)
+
+    def record_alias(self, alias: str, variable: str, line: int):
+        self.observe_line(line)
+        self.latest_aliases[alias] = variable
+
+    def record_modification(self, variable: str, line: int):
+        line_slice = self.observe_line(line)
+        variables = self.resolve_aliases(variable)
+        for current in variables:
+            line_slice |= self.get_variable_slice(current)
+        self.line_slices[line] = line_slice
+        for current in variables:
+            self.variable_slices[current] = line_slice
+        self.update_criterion(line)
+
+    def record_usage(self, variable: str, line: int):
+        line_slice = self.observe_line(line)
+        for current in self.resolve_aliases(variable):
+            line_slice |= self.get_variable_slice(current)
+        self.line_slices[line] = line_slice
+        self.update_criterion(line)
+
+    def observe_line(self, line: int) -> int:
+        """Register an event on the given line and return the slice of the current instance of the line."""
+        self.event_count += 1
+        if self.instances.observe_line(line):
+            line_slice = self.get_static_slice(line)
+            for header in self.control_dependencies.get(line, ()):
+                line_slice |= self.line_slices.get(header, 0)
+            self.line_slices[line] = line_slice
+        return self.line_slices[line]
+
+    def update_criterion(self, line: int):
+        if line == self.slicing_criterion_line:
+            self.criterion_slice |= self.line_slices[line]
+
+    def resolve_aliases(self, variable: str) -> List[str]:
+        variables = [variable]
+        variable = self.latest_aliases.get(variable)
+        # stop at the end of the alias chain or when it runs into a cycle
+        while variable and variable not in variables:
+            variables.append(variable)
+            variable = self.latest_aliases.get(variable)
+        return variables
+
+    def get_variable_slice(self, variable: str) -> int:
+        if variable in self.variable_slices:
+            return self.variable_slices[variable]
+        if variable in self.definitions:
+            return self.get_static_slice(self.definitions[variable].location.start.line)
+        return 0
+
+    def get_static_slice(self, line: int) -> int:
+        """Return the line and all lines it (transitively) statically depends on."""
+        if line not in self.static_slices:
+            lines = set()
+            pending = [line]
+            while pending:
+                current = pending.pop()
+                if current not in lines:
+                    lines.add(current)
+                    pending.extend(self.static_dependencies.get(current, ()))
+            self.static_slices[line] = lines_to_bitset(lines)
+        return self.static_slices[line]
+
+    def get_slice_lines(self) -> Set[int]:
+        """Return the lines of the slice of the slicing criterion, including the criterion itself even if it was
+        not executed."""
+        return bitset_to_lines(self.criterion_slice | self.get_static_slice(self.slicing_criterion_line))
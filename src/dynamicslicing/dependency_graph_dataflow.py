@@ -1,21 +1,24 @@
 """This file provides a function to generate an RDF knowledge graph based on recorded dataflow events, modeling
 dataflow dependencies."""
 
-from typing import Dict
+from typing import Dict, Sequence
 
 from rdflib import Graph, URIRef, Namespace
 
 from dynamicslicing.dataflow_recorder import DataflowRecorderSimple
 from dynamicslicing.dependency_graph_utils import statement_to_node
 from dynamicslicing.finders import Definition
-from dynamicslicing.dataflow_recorder import EventUse, EventModify, EventAssign, EventAlias
+from dynamicslicing.dataflow_recorder import Event, EventUse, EventModify, EventAssign, EventAlias
+from dynamicslicing.trace_shards import TraceShard, find_child_shards
 
 RELATIONSHIP_DEFINITION_IS_USED_BY = URIRef("g:def_used_by")
 RELATIONSHIP_DEFINITION_IS_MODIFIED_BY = URIRef("g:def_modified_by")
 
 
 def create_graph_from_dataflow(recorder: DataflowRecorderSimple, slicing_criterion_line: int,
-                               definitions: dict[str, Definition]) -> Graph:
+                               definitions: dict[str, Definition], shards: Sequence[TraceShard] = ()) -> Graph:
+    if shards:
+        return DependencyGraphDataflowShards(recorder, shards, slicing_criterion_line, definitions).g
     return DependencyGraphDataflowForward(recorder, slicing_criterion_line, definitions).g
 
 
@@ -30,28 +33,33 @@ class DependencyGraphDataflowForward:
         self.latest_assignments: Dict[str, int] = {}
         self.latest_aliases: Dict[str, str] = {}
 
-        for event in recorder.event_stack:
-
-            if isinstance(event, EventAssign):
-                self.latest_assignments[event.variable] = event.line
-                # remove alias linkage on assignment.
-                # note that this requires alias event to be triggered after assign event
-                if event.variable in self.latest_aliases:
-                    del self.latest_aliases[event.variable]
-
-            elif isinstance(event, EventUse):
-                variable_definitions = self.get_definitions_for_variable(event.variable)
-                for definition_line in variable_definitions.values():
-                    self.add_definition_use_tuple(definition_line, event.line, RELATIONSHIP_DEFINITION_IS_USED_BY)
+        self.process_recorder(recorder)
 
-            elif isinstance(event, EventModify):
-                variable_definitions = self.get_definitions_for_variable(event.variable)
-                for variable, definition_line in variable_definitions.items():
-                    self.add_definition_use_tuple(definition_line, event.line, RELATIONSHIP_DEFINITION_IS_MODIFIED_BY)
-                    self.latest_assignments[variable] = event.line
-
-            elif isinstance(event, EventAlias):
-                self.latest_aliases[event.alias] = event.variable_behind_alias
+    def process_recorder(self, recorder: DataflowRecorderSimple):
+        for event in recorder.event_stack:
+            self.process_event(event)
+
+    def process_event(self, event: Event):
+        if isinstance(event, EventAssign):
+            self.latest_assignments[event.variable] = event.line
+            # remove alias linkage on assignment.
+            # note that this requires alias event to be triggered after assign event
+            if event.variable in self.latest_aliases:
+                del self.latest_aliases[event.variable]
+
+        elif isinstance(event, EventUse):
+            variable_definitions = self.get_definitions_for_variable(event.variable)
+            for definition_line in variable_definitions.values():
+                self.add_definition_use_tuple(definition_line, event.line, RELATIONSHIP_DEFINITION_IS_USED_BY)
+
+        elif isinstance(event, EventModify):
+            variable_definitions = self.get_definitions_for_variable(event.variable)
+            for variable, definition_line in variable_definitions.items():
+                self.add_definition_use_tuple(definition_line, event.line, RELATIONSHIP_DEFINITION_IS_MODIFIED_BY)
+                self.latest_assignments[variable] = event.line
+
+        elif isinstance(event, EventAlias):
+            self.latest_aliases[event.alias] = event.variable_behind_alias
 
     def add_definition_use_tuple(self, definition_line: int, use_line: int, relationship: URIRef):
         self.g.add((
@@ -64,8 +72,7 @@ class DependencyGraphDataflowForward:
         latest_assignment = self.latest_assignments.get(variable, -1)
 
         if latest_assignment == -1:
-            if variable in self.definitions:
-                latest_assignment = self.definitions[variable].location.start.line
+            latest_assignment = self.get_static_definition_line(variable)
         result_lines = {
             variable: latest_assignment
         }
@@ -76,3 +83,43 @@ class DependencyGraphDataflowForward:
                 result_lines.update(self.get_definitions_for_variable(variable_behind_alias))
 
         return result_lines
+
+    def get_static_definition_line(self, variable: str) -> int:
+        if variable in self.definitions:
+            return self.definitions[variable].location.start.line
+        return -1
+
+
+class DependencyGraphDataflowShards(DependencyGraphDataflowForward):
+    """
+    Builds the dataflow graph of a process together with the trace shards of its (transitively) forked children. The
+    events of a child are processed at the position of the fork, starting from the state of the parent at that time.
+    Afterwards, the state of the parent is restored, as the child does not share its memory.
+    """
+
+    def __init__(self, recorder: DataflowRecorderSimple, shards: Sequence[TraceShard], slicing_criterion_line: int,
+                 definitions: dict[str, Definition]):
+        self.shards = list(shards)
+        # the process the recorder belongs to is the only one that is not a child itself
+        children = {shard.process_id for shard in shards}
+        self.current_process = next(iter({shard.parent_id for shard in shards} - children), None)
+        super().__init__(recorder, slicing_criterion_line, definitions)
+
+    def process_recorder(self, recorder: DataflowRecorderSimple):
+        process_id = self.current_process
+        events = recorder.event_stack
+        position = 0
+
+        for child in find_child_shards(self.shards, process_id):
+            for event in events[position:child.fork_index]:
+                self.process_event(event)
+            position = max(position, child.fork_index)
+
+            state = (dict(self.latest_assignments), dict(self.latest_aliases))
+            self.current_process = child.process_id
+            self.process_recorder(child.recorder)
+            self.current_process = process_id
+            self.latest_assignments, self.latest_aliases = state
+
+        for event in events[position:]:
+            self.process_event(event)
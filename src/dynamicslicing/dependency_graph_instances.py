@@ -0,0 +1,222 @@
+"""This file provides a compacted dynamic dependence graph on statement instance level, following the idea of Zhang &
+Gupta: the nodes are statements (lines) like in the statement-level graph, but each edge is labeled with the pairs of
+execution instances (timestamps) of the dependent and the depended on statement it was observed for. The pairs are
+stored as compressed runs, so that e.g. a dependency inside a loop is stored as a single run instead of one pair per
+iteration. This allows slicing for a specific execution instance of the slicing criterion with memory close to the
+statement-level graph."""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, Event, EventUse, EventModify, EventAssign, \
+    EventAlias
+from dynamicslicing.finders import Definition, find_own_lines
+
+# the instance of statements that are not executed, like the header of a definition
+STATIC_INSTANCE = 0
+
+
+class TimestampPairSequence:
+    """
+    Sequence of (instance of the dependent statement, instance of the depended on statement) pairs of an edge,
+    compressed into runs. A run starts at a pair and covers the following pairs which increment the dependent
+    instance by one and the depended on instance by a constant stride, i.e. it is stored as
+    [dependent start, depended on start, stride, length]. Pairs are appended in execution order, so the runs are sorted
+    by the instance of the dependent statement.
+    """
+
+    def __init__(self):
+        self.runs: List[List[int]] = []
+        self.run_starts: List[int] = []
+
+    def append(self, instance: int, source_instance: int):
+        if self.runs:
+            run = self.runs[-1]
+            last_instance = run[0] + run[3] - 1
+            last_source_instance = run[1] + run[2] * (run[3] - 1)
+            if instance == last_instance and source_instance == last_source_instance:
+                return
+            if instance == last_instance + 1:
+                if run[3] == 1:
+                    run[2] = source_instance - run[1]
+                if source_instance == last_source_instance + run[2]:
+                    run[3] += 1
+                    return
+        self.runs.append([instance, source_instance, 0, 1])
+        self.run_starts.append(instance)
+
+    def find_source_instances(self, instance: Optional[int]) -> List[int]:
+        """Return the instances of the depended on statement for the given instance of the dependent statement, or for
+        all instances if no instance is given."""
+        if instance is None:
+            return [start + stride * offset for _, start, stride, length in self.runs for offset in range(length)]
+
+        result = []
+        index = bisect_right(self.run_starts, instance) - 1
+        while index >= 0:
+            run_instance, source_start, stride, length = self.runs[index]
+            offset = instance - run_instance
+            if offset >= length:
+                break
+            result.append(source_start + stride * offset)
+            index -= 1
+        return result
+
+    def __len__(self) -> int:
+        return sum(run[3] for run in self.runs)
+
+
+def find_line_owners(definitions: dict[str, Definition]) -> Dict[int, int]:
+    """Map each line of a definition to the first line of the innermost definition it belongs to."""
+    owners: Dict[int, int] = {}
+    for definition in definitions.values():
+        for line in find_own_lines(definition):
+            owners[line] = definition.location.start.line
+        owners.update(find_line_owners(definition.children))
+    return owners
+
+
+class StatementInstanceCounter:
+    """
+    Counts the execution instances of each line. A new instance of a line starts with its first event after another
+    line of the same function executed, so that the events of a statement are still grouped when calls are nested
+    inside of it (this does not distinguish the frames of recursive calls).
+    """
+
+    def __init__(self, definitions: dict[str, Definition]):
+        self.line_owners = find_line_owners(definitions)
+        self.current_lines: Dict[int, int] = {}
+        self.instance_counts: Dict[int, int] = {}
+
+    def observe_line(self, line: int) -> bool:
+        """Register an event on the given line and return whether it starts a new instance of the line."""
+        owner = self.line_owners.get(line, 0)
+        if self.current_lines.get(owner) == line:
+            return False
+        self.current_lines[owner] = line
+        self.instance_counts[line] = self.instance_counts.get(line, 0) + 1
+        return True
+
+
+def create_instance_graph(recorder: DataflowRecorderSimple, definitions: dict[str, Definition],
+                          control_dependencies: Dict[int, Set[int]]) -> "CompactDependenceGraph":
+    return CompactDependenceGraph(recorder, definitions, control_dependencies)
+
+
+class CompactDependenceGraph:
+    """
+    Builds the instance-level dependence graph from the recorded events, with the same dataflow semantics as the
+    statement-level dataflow graph. Control dependencies are recorded dynamically as well: a new instance of a line
+    depends on the latest instance of each control flow header it is statically dependent on.
+    """
+
+    def __init__(self, recorder: DataflowRecorderSimple, definitions: dict[str, Definition],
+                 control_dependencies: Dict[int, Set[int]]):
+        self.definitions = definitions
+        self.control_dependencies = control_dependencies
+        self.instances = StatementInstanceCounter(definitions)
+        self.instance_counts = self.instances.instance_counts
+        # edges by dependent line, then by depended on line
+        self.edges: Dict[int, Dict[int, TimestampPairSequence]] = {}
+        self.latest_assignments: Dict[str, Tuple[int, int]] = {}
+        self.latest_aliases: Dict[str, str] = {}
+
+        for event in recorder.event_stack:
+            self.process_event(event)
+
+    def process_event(self, event: Event):
+        instance = self.get_instance(event.line)
+
+        if isinstance(event, EventAssign):
+            self.latest_assignments[event.variable] = (event.line, instance)
+            # note that this requires alias event to be triggered after assign event
+            if event.variable in self.latest_aliases:
+                del self.latest_aliases[event.variable]
+
+        elif isinstance(event, EventUse):
+            for definition in self.get_definitions_for_variable(event.variable).values():
+                self.add_edge(definition, event.line, instance)
+
+        elif isinstance(event, EventModify):
+            for variable, definition in self.get_definitions_for_variable(event.variable).items():
+                self.add_edge(definition, event.line, instance)
+                self.latest_assignments[variable] = (event.line, instance)
+
+        elif isinstance(event, EventAlias):
+            self.latest_aliases[event.alias] = event.variable_behind_alias
+
+    def get_instance(self, line: int) -> int:
+        if not self.instances.observe_line(line):
+            return self.instance_counts[line]
+
+        instance = self.instance_counts[line]
+        for header in self.control_dependencies.get(line, ()):
+            if header in self.instance_counts:
+                self.add_edge((header, self.instance_counts[header]), line, instance)
+        return instance
+
+    def add_edge(self, source: Tuple[int, int], line: int, instance: int):
+        source_line, source_instance = source
+        if source_line == -1:
+            return
+        sequences = self.edges.setdefault(line, {})
+        if source_line not in sequences:
+            sequences[source_line] = TimestampPairSequence()
+        sequences[source_line].append(instance, source_instance)
+
+    def get_definitions_for_variable(self, variable: str) -> Dict[str, Tuple[int, int]]:
+        latest_assignment = self.latest_assignments.get(variable, (-1, STATIC_INSTANCE))
+
+        if latest_assignment[0] == -1 and variable in self.definitions:
+            latest_assignment = (self.definitions[variable].location.start.line, STATIC_INSTANCE)
+        result = {
+            variable: latest_assignment
+        }
+
+        if variable in self.latest_aliases:
+            variable_behind_alias = self.latest_aliases[variable]
+            if variable_behind_alias:
+                result.update(self.get_definitions_for_variable(variable_behind_alias))
+
+        return result
+
+    def count_pairs(self) -> int:
+        return sum(len(sequence) for sequences in self.edges.values() for sequence in sequences.values())
+
+    def count_runs(self) -> int:
+        return sum(len(sequence.runs) for sequences in self.edges.values() for sequence in sequences.values())
+
+    def get_dependency_lines(self, line: int, occurrence: Optional[int],
+                             structural_dependencies: Dict[int, Set[int]]) -> Set[int]:
+        """
+        Return the lines the given execution instance (counted from 1) of a line depends on, or all of its instances
+        if no occurrence is given. Structural dependencies are followed for all instances of the depended on lines,
+        while the instances of control flow headers are determined by the dynamic control dependencies. Headers that
+        are never executed (like else) are included as line only.
+        """
+        if occurrence is not None and not 1 <= occurrence <= self.instance_counts.get(line, 0):
+            raise RuntimeError(f"Line {line} was executed {self.instance_counts.get(line, 0)} times, unable to slice "
+                               f"for its execution {occurrence}.")
+
+        lines: Set[int] = set()
+        visited: Set[Tuple[int, Optional[int]]] = set()
+        pending: List[Tuple[int, Optional[int]]] = [(line, occurrence)]
+
+        while pending:
+            current = pending.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            current_line, instance = current
+
+            if current_line not in lines:
+                lines.add(current_line)
+                lines.update(self.control_dependencies.get(current_line, ()))
+                for dependency in structural_dependencies.get(current_line, ()):
+                    pending.append((dependency, None))
+
+            for source_line, sequence in self.edges.get(current_line, {}).items():
+                for source_instance in sequence.find_source_instances(instance):
+                    pending.append((source_line, None if source_instance == STATIC_INSTANCE else source_instance))
+
+        return lines
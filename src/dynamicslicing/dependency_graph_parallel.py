@@ -0,0 +1,129 @@
+"""This file provides a multi-process variant of the dataflow graph construction. The definitions of a variable only
+depend on the events of the variable itself and of the variables it is (transitively) aliased with. Thus, the trace is
+partitioned by the connected components of the alias relation, the partitions are distributed over a process pool and
+each worker resolves the def-use edges of its partitions with the regular (or vectorized) graph construction. The parent
+merges the edges into the dataflow graph."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from rdflib import Graph, Namespace, URIRef
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, Event, EventAlias, EventAssign, EventModify, \
+    EventUse
+from dynamicslicing.dependency_graph_dataflow import DependencyGraphDataflowForward, create_graph_from_dataflow
+from dynamicslicing.dependency_graph_utils import statement_to_node
+from dynamicslicing.dependency_graph_vectorized import DependencyGraphDataflowVectorized, np
+from dynamicslicing.finders import Definition
+from dynamicslicing.trace_shards import TraceShard
+
+# compact representation of an event to send to a worker: (kind, line, variable or alias, variable behind alias)
+EventTuple = Tuple[str, int, str, Optional[str]]
+Edge = Tuple[int, int, URIRef]
+
+
+def create_graph_from_dataflow_parallel(recorder: DataflowRecorderSimple, slicing_criterion_line: int,
+                                        definitions: dict[str, Definition], workers: Optional[int] = None,
+                                        vectorized: bool = False, shards: Sequence[TraceShard] = ()) -> Graph:
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or shards:
+        return create_graph_from_dataflow(recorder, slicing_criterion_line, definitions, shards)
+
+    static_definition_lines = {name: definition.location.start.line for name, definition in definitions.items()}
+    partitions = partition_events(recorder.event_stack, workers)
+    g = Graph()
+    g.bind("g", Namespace("g"))
+    with ProcessPoolExecutor(max_workers=len(partitions)) as executor:
+        results = executor.map(resolve_partition, partitions, [static_definition_lines] * len(partitions),
+                               [vectorized] * len(partitions))
+        for edges in results:
+            for definition_line, use_line, relationship in edges:
+                g.add((statement_to_node(definition_line), relationship, statement_to_node(use_line)))
+    return g
+
+
+def find_alias_groups(events: Sequence[Event]) -> Dict[str, str]:
+    """Map each variable of the trace to a representative of its connected component of the alias relation."""
+    parents: Dict[str, str] = {}
+
+    def find(variable: str) -> str:
+        root = parents.setdefault(variable, variable)
+        while root != parents[root]:
+            root = parents[root]
+        # path compression
+        while variable != root:
+            parents[variable], variable = root, parents[variable]
+        return root
+
+    for event in events:
+        if isinstance(event, EventAlias):
+            root = find(event.alias)
+            if event.variable_behind_alias:
+                parents[find(event.variable_behind_alias)] = root
+        else:
+            find(event.variable)
+    return {variable: find(variable) for variable in parents}
+
+
+def partition_events(events: Sequence[Event], count: int) -> List[List[EventTuple]]:
+    """Split the events into at most count partitions of similar size, without splitting an alias group. The events
+    of each partition keep their order."""
+    groups = find_alias_groups(events)
+    group_sizes: Dict[str, int] = {}
+    for event in events:
+        variable = event.alias if isinstance(event, EventAlias) else event.variable
+        group_sizes[groups[variable]] = group_sizes.get(groups[variable], 0) + 1
+
+    # assign the largest groups first, each to the partition with the fewest events so far
+    partition_sizes = [0] * min(count, max(len(group_sizes), 1))
+    partition_by_group: Dict[str, int] = {}
+    for group, size in sorted(group_sizes.items(), key=lambda item: -item[1]):
+        index = partition_sizes.index(min(partition_sizes))
+        partition_by_group[group] = index
+        partition_sizes[index] += size
+
+    partitions: List[List[EventTuple]] = [[] for _ in partition_sizes]
+    for event in events:
+        if isinstance(event, EventAlias):
+            entry = (EventAlias.__name__, event.line, event.alias, event.variable_behind_alias)
+        else:
+            entry = (type(event).__name__, event.line, event.variable, None)
+        partitions[partition_by_group[groups[entry[2]]]].append(entry)
+    return [partition for partition in partitions if partition]
+
+
+def resolve_partition(events: List[EventTuple], static_definition_lines: Dict[str, int],
+                      vectorized: bool) -> Set[Edge]:
+    recorder = DataflowRecorderSimple()
+    for kind, line, variable, variable_behind_alias in events:
+        if kind == EventAssign.__name__:
+            recorder.record_assignment(variable, line)
+        elif kind == EventUse.__name__:
+            recorder.record_usage(variable, line)
+        elif kind == EventModify.__name__:
+            recorder.record_modification(variable, line)
+        else:
+            recorder.record_alias(variable, variable_behind_alias, line)
+    collector_class = DataflowEdgeCollectorVectorized if vectorized and np is not None else DataflowEdgeCollector
+    return collector_class(recorder, static_definition_lines).edges
+
+
+class DataflowEdgeCollector(DependencyGraphDataflowForward):
+    """Collects the def-use edges as tuples instead of adding them to an RDF graph, so that they can be returned from a
+    worker process cheaply. The static definitions are given by their first line only."""
+
+    def __init__(self, recorder: DataflowRecorderSimple, static_definition_lines: Dict[str, int]):
+        self.edges: Set[Edge] = set()
+        self.static_definition_lines = static_definition_lines
+        super().__init__(recorder, -1, {})
+
+    def add_definition_use_tuple(self, definition_line: int, use_line: int, relationship: URIRef):
+        self.edges.add((definition_line, use_line, relationship))
+
+    def get_static_definition_line(self, variable: str) -> int:
+        return self.static_definition_lines.get(variable, -1)
+
+
+class DataflowEdgeCollectorVectorized(DataflowEdgeCollector, DependencyGraphDataflowVectorized):
+    pass
@@ -1,39 +1,137 @@
-"""This file provides a function to determine all (directly or indirectly) connected nodes to a given target node in
-an RDF graph, with all edges being towards the direction of the target node."""
+"""This file provides functions to determine the (directly or indirectly) connected nodes of an RDF graph, with all
+edges being towards the direction of the dependent node: the nodes a target node depends on (backward slice), the nodes
+depending on a source node (forward slice) and the nodes on the dependency paths between the two (chop). The edges are
+tagged by the layer they belong to (definitions, dataflow and control flow) through their relationship, so that a mask
+of layers selects which kind of slice is computed from the same graph."""
 
-from typing import Set
+from typing import Iterable, Optional, Set
 
 from rdflib import URIRef
 from rdflib import Graph
 
+from dynamicslicing.dependency_graph_control_flow import RELATIONSHIP_CONTROL_FLOW_HAS_DEPENDENT
+from dynamicslicing.dependency_graph_dataflow import (RELATIONSHIP_DEFINITION_IS_USED_BY,
+                                                      RELATIONSHIP_DEFINITION_IS_MODIFIED_BY)
+from dynamicslicing.dependency_graph_definitions import (RELATIONSHIP_DEFINITION_HAS_DEPENDENT,
+                                                         RELATIONSHIP_DEFINITION_OUTSIDE_OF_ANALYSIS)
 
-def get_dependency_nodes(graph: Graph, target_node: URIRef) -> Set[URIRef]:
-    nodes: set[URIRef] = set()
-    nodes.add(target_node)
+LAYER_DEFINITIONS = 1
+LAYER_DATAFLOW = 2
+LAYER_CONTROL_FLOW = 4
+LAYERS_ALL = LAYER_DEFINITIONS | LAYER_DATAFLOW | LAYER_CONTROL_FLOW
 
-    had_change = True
+LAYERS_BY_NAME = {
+    "definitions": LAYER_DEFINITIONS,
+    "dataflow": LAYER_DATAFLOW,
+    "control_flow": LAYER_CONTROL_FLOW,
+}
 
-    while had_change:
-        had_change = False
+RELATIONSHIPS_BY_LAYER = {
+    LAYER_DEFINITIONS: {RELATIONSHIP_DEFINITION_HAS_DEPENDENT, RELATIONSHIP_DEFINITION_OUTSIDE_OF_ANALYSIS},
+    LAYER_DATAFLOW: {RELATIONSHIP_DEFINITION_IS_USED_BY, RELATIONSHIP_DEFINITION_IS_MODIFIED_BY},
+    LAYER_CONTROL_FLOW: {RELATIONSHIP_CONTROL_FLOW_HAS_DEPENDENT},
+}
 
-        new_nodes: set[URIRef] = set()
 
-        for node in nodes:
-            # todo: maybe it is possible to have a single query that returns all nodes connected
-            # via any path, instead of going just one step and then repeating it
-            sparql_query = f"""
-            SELECT DISTINCT ?sourceNode
-            WHERE {{
-                ?sourceNode ?predicate ?targetNode.
-            }}
-            """
-            query_result = graph.query(sparql_query, initBindings={'targetNode': node})
-            for row in query_result:
-                found_node = row.sourceNode
-                if found_node not in nodes:
-                    new_nodes.add(found_node)
-                    had_change = True
+def get_layer_mask(layer_names: Iterable[str]) -> int:
+    mask = 0
+    for name in layer_names:
+        if name not in LAYERS_BY_NAME:
+            raise ValueError(f"Unknown graph layer '{name}', expected one of {', '.join(LAYERS_BY_NAME)}")
+        mask |= LAYERS_BY_NAME[name]
+    return mask
 
-        nodes.update(new_nodes)
 
-    return nodes
+def get_layer_relationships(layers: int) -> Set[URIRef]:
+    relationships: Set[URIRef] = set()
+    for layer, layer_relationships in RELATIONSHIPS_BY_LAYER.items():
+        if layers & layer:
+            relationships.update(layer_relationships)
+    return relationships
+
+
+class DependencySearch:
+    """
+    Search of the nodes connected to a start node, following the edges of the given relationships backwards (the nodes
+    the start node depends on) or forwards (the nodes depending on the start node). The search may be restricted to a
+    set of nodes and can be expanded node by node.
+    """
+
+    def __init__(self, graph: Graph, start_node: URIRef, relationships: Set[URIRef], forward: bool,
+                 within: Optional[Set[URIRef]] = None):
+        self.graph = graph
+        self.start_node = start_node
+        self.relationships = relationships
+        self.forward = forward
+        self.within = within
+        self.nodes: Set[URIRef] = {start_node}
+        self.pending = [start_node]
+
+    @property
+    def complete(self) -> bool:
+        return not self.pending
+
+    def expand(self):
+        node = self.pending.pop()
+        if self.forward:
+            neighbors = self.graph.predicate_objects(node)
+        else:
+            neighbors = ((predicate, subject) for subject, predicate in self.graph.subject_predicates(node))
+        for relationship, neighbor in neighbors:
+            if relationship in self.relationships and neighbor not in self.nodes and \
+                    (self.within is None or neighbor in self.within):
+                self.nodes.add(neighbor)
+                self.pending.append(neighbor)
+
+    def run(self) -> Set[URIRef]:
+        while self.pending:
+            self.expand()
+        return self.nodes
+
+
+def get_dependency_nodes(graph: Graph, target_node: URIRef, layers: int = LAYERS_ALL) -> Set[URIRef]:
+    """Return the target node and all nodes it (transitively) depends on via edges of the given layers."""
+    return DependencySearch(graph, target_node, get_layer_relationships(layers), forward=False).run()
+
+
+def get_dependent_nodes(graph: Graph, source_node: URIRef, layers: int = LAYERS_ALL) -> Set[URIRef]:
+    """Return the source node and all nodes (transitively) depending on it via edges of the given layers."""
+    return DependencySearch(graph, source_node, get_layer_relationships(layers), forward=True).run()
+
+
+def get_chop_nodes(graph: Graph, source_node: URIRef, target_node: URIRef, layers: int = LAYERS_ALL) -> Set[URIRef]:
+    """
+    Return the nodes on the dependency paths from the source node to the target node, i.e. the nodes that depend on the
+    source node and that the target node depends on. The forward search from the source node and the backward search
+    from the target node are expanded alternately, always the one with the smaller frontier. Once one of them is
+    complete, the chop is the part of its closure that the other search reaches when it is restricted to this closure,
+    as every node on a path between the two lies in both closures. Thus, the larger closure is never computed in full,
+    and if the source node is not in the closure of the backward search (or vice versa), the chop is empty.
+    """
+    relationships = get_layer_relationships(layers)
+    forward_search = DependencySearch(graph, source_node, relationships, forward=True)
+    backward_search = DependencySearch(graph, target_node, relationships, forward=False)
+    while not forward_search.complete and not backward_search.complete:
+        if len(forward_search.pending) <= len(backward_search.pending):
+            forward_search.expand()
+        else:
+            backward_search.expand()
+
+    complete_search, other_search = (forward_search, backward_search) if forward_search.complete \
+        else (backward_search, forward_search)
+    if other_search.start_node not in complete_search.nodes:
+        return set()
+    return DependencySearch(graph, other_search.start_node, relationships, other_search.forward,
+                            complete_search.nodes).run()
+
+
+def get_enclosing_nodes(graph: Graph, nodes: Set[URIRef]) -> Set[URIRef]:
+    """
+    Return the nodes together with the heads of the control flow elements (transitively) enclosing them. A slice
+    without the control flow layer needs these heads to be shown as source code, as a line can not be kept without the
+    statement it is nested in. Unlike the control flow layer, the nodes the heads depend on are not added.
+    """
+    enclosing_nodes = set(nodes)
+    for node in nodes:
+        enclosing_nodes |= get_dependency_nodes(graph, node, LAYER_CONTROL_FLOW)
+    return enclosing_nodes
@@ -0,0 +1,164 @@
+"""This file provides a NumPy based variant of the dataflow graph construction. The trace is converted to columns (event
+kind, line and variable id per event) once. Stretches of the trace without active aliases are then resolved in bulk:
+the events are grouped by variable and, within each group, the reaching definition of each use or modification is the
+latest preceding assignment or modification, found with a running maximum. Stretches with active aliases are processed
+event by event like in DependencyGraphDataflowForward, as resolving aliases makes the definitions of variables depend
+on each other. NumPy is optional, without it the graph is built by DependencyGraphDataflowForward."""
+
+from typing import Dict, List, Sequence
+
+from rdflib import Graph
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, EventAlias, EventAssign, EventModify
+from dynamicslicing.dependency_graph_dataflow import DependencyGraphDataflowForward, create_graph_from_dataflow, \
+    RELATIONSHIP_DEFINITION_IS_USED_BY, RELATIONSHIP_DEFINITION_IS_MODIFIED_BY
+from dynamicslicing.finders import Definition
+from dynamicslicing.trace_shards import TraceShard
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+KIND_ASSIGN = 0
+KIND_USE = 1
+KIND_MODIFY = 2
+KIND_ALIAS = 3
+
+# edges are emitted as [definition line, use line, relationship] rows
+RELATIONSHIPS = [RELATIONSHIP_DEFINITION_IS_USED_BY, RELATIONSHIP_DEFINITION_IS_MODIFIED_BY]
+
+
+def create_graph_from_dataflow_vectorized(recorder: DataflowRecorderSimple, slicing_criterion_line: int,
+                                          definitions: dict[str, Definition],
+                                          shards: Sequence[TraceShard] = ()) -> Graph:
+    if np is None or shards:
+        return create_graph_from_dataflow(recorder, slicing_criterion_line, definitions, shards)
+    return DependencyGraphDataflowVectorized(recorder, slicing_criterion_line, definitions).g
+
+
+class ColumnarTrace:
+    """The events of a recorder as columns. Alias events store the alias as variable."""
+
+    def __init__(self, recorder: DataflowRecorderSimple):
+        self.variables: List[str] = []
+        variable_ids: Dict[str, int] = {}
+        events = recorder.event_stack
+        kinds = np.empty(len(events), dtype=np.int8)
+        lines = np.empty(len(events), dtype=np.int64)
+        variables = np.empty(len(events), dtype=np.int64)
+
+        for index, event in enumerate(events):
+            if isinstance(event, EventAlias):
+                kind, variable = KIND_ALIAS, event.alias
+            elif isinstance(event, EventAssign):
+                kind, variable = KIND_ASSIGN, event.variable
+            elif isinstance(event, EventModify):
+                kind, variable = KIND_MODIFY, event.variable
+            else:
+                kind, variable = KIND_USE, event.variable
+            variable_id = variable_ids.get(variable)
+            if variable_id is None:
+                variable_id = variable_ids[variable] = len(self.variables)
+                self.variables.append(variable)
+            kinds[index] = kind
+            lines[index] = event.line
+            variables[index] = variable_id
+
+        self.kinds = kinds
+        self.lines = lines
+        self.variable_ids = variables
+
+    def find_alias_stretches(self) -> "np.ndarray":
+        """Return for each event whether an alias is active, i.e. some alias event happened before (or at) it and the
+        alias was not reassigned before it."""
+        count = len(self.kinds)
+        alias_positions = np.flatnonzero(self.kinds == KIND_ALIAS)
+        if len(alias_positions) == 0:
+            return np.zeros(count, dtype=bool)
+
+        # an alias stays active until the next assignment of the alias variable, which is part of the stretch, as it
+        # removes the alias
+        assign_positions = np.flatnonzero(self.kinds == KIND_ASSIGN)
+        assign_keys = np.sort(self.variable_ids[assign_positions] * count + assign_positions)
+        alias_keys = self.variable_ids[alias_positions] * count + alias_positions
+        next_assign = np.searchsorted(assign_keys, alias_keys, side="right")
+        ends = np.full(len(alias_positions), count)
+        has_next = next_assign < len(assign_keys)
+        next_keys = assign_keys[np.minimum(next_assign, len(assign_keys) - 1)] if len(assign_keys) else alias_keys
+        same_variable = has_next & (next_keys // count == self.variable_ids[alias_positions])
+        ends[same_variable] = next_keys[same_variable] % count + 1
+
+        coverage = np.zeros(count + 1, dtype=np.int64)
+        np.add.at(coverage, alias_positions, 1)
+        np.add.at(coverage, ends, -1)
+        return np.cumsum(coverage[:-1]) > 0
+
+
+class DependencyGraphDataflowVectorized(DependencyGraphDataflowForward):
+    """Builds the same graph as DependencyGraphDataflowForward, but resolves the definitions of alias free stretches of
+    the trace in bulk."""
+
+    def process_recorder(self, recorder: DataflowRecorderSimple):
+        trace = ColumnarTrace(recorder)
+        events = recorder.event_stack
+        alias_active = trace.find_alias_stretches()
+        boundaries = np.flatnonzero(np.diff(alias_active.astype(np.int8))) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(events)]))
+
+        edges = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if start == end:
+                continue
+            if alias_active[start]:
+                for event in events[start:end]:
+                    self.process_event(event)
+            else:
+                edges.append(self.resolve_stretch(trace, start, end))
+
+        if edges:
+            for definition_line, use_line, relationship in np.unique(np.concatenate(edges), axis=0).tolist():
+                self.add_definition_use_tuple(definition_line, use_line, RELATIONSHIPS[relationship])
+
+    def resolve_stretch(self, trace: ColumnarTrace, start: int, end: int) -> "np.ndarray":
+        """Resolve the reaching definitions of the uses and modifications of an alias free stretch, update the latest
+        assignments and return the def-use edges."""
+        kinds = trace.kinds[start:end]
+        # a stable sort keeps the events of each variable in execution order
+        order = np.argsort(trace.variable_ids[start:end], kind="stable")
+        kinds = kinds[order]
+        lines = trace.lines[start:end][order]
+        variables = trace.variable_ids[start:end][order]
+        positions = np.arange(len(order))
+
+        group_starts = np.ones(len(order), dtype=bool)
+        group_starts[1:] = variables[1:] != variables[:-1]
+        group_start_positions = np.maximum.accumulate(np.where(group_starts, positions, 0))
+
+        is_definition = (kinds == KIND_ASSIGN) | (kinds == KIND_MODIFY)
+        latest_definition = np.maximum.accumulate(np.where(is_definition, positions, -1))
+        reaching_definition = np.concatenate(([-1], latest_definition[:-1]))
+        has_reaching_definition = reaching_definition >= group_start_positions
+
+        # definitions before the stretch, falling back to the static definition like get_definitions_for_variable
+        unique_variables = np.unique(variables)
+        fallback_lines = np.empty(len(trace.variables), dtype=np.int64)
+        for variable_id in unique_variables.tolist():
+            fallback_lines[variable_id] = self.get_definitions_for_variable(trace.variables[variable_id])[
+                trace.variables[variable_id]]
+        definition_lines = np.where(has_reaching_definition, lines[np.maximum(reaching_definition, 0)],
+                                    fallback_lines[variables])
+
+        is_use = (kinds == KIND_USE) | (kinds == KIND_MODIFY)
+        edges = np.stack((definition_lines[is_use], lines[is_use], (kinds[is_use] == KIND_MODIFY).astype(np.int64)),
+                         axis=1)
+
+        group_ends = np.ones(len(order), dtype=bool)
+        group_ends[:-1] = group_starts[1:]
+        last_definitions = latest_definition[group_ends]
+        defined = last_definitions >= group_start_positions[group_ends]
+        defined_variables = variables[group_ends][defined].tolist()
+        for variable_id, line in zip(defined_variables, lines[last_definitions[defined]].tolist()):
+            self.latest_assignments[trace.variables[variable_id]] = line
+        return edges
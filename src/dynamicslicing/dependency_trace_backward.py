@@ -0,0 +1,106 @@
+"""This file implements demand-driven slicing: instead of building the dataflow graph of the whole trace, the recorded
+events are traversed backwards, starting at the last execution of the slicing criterion. A worklist holds the variables
+whose definitions are still needed. The traversal stops as soon as the worklist is empty and no line of the slice is
+executed earlier, or once the start of the trace is reached."""
+
+from typing import Dict, Set
+
+from rdflib import Graph
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderIndexed, EventAssign, EventModify, EventUse
+from dynamicslicing.dependency_graph_utils import node_to_statement
+from dynamicslicing.finders import Definition
+
+
+def get_static_dependencies(graph: Graph) -> Dict[int, Set[int]]:
+    """Map each line of the given (static) dependency graph to the lines it directly depends on."""
+    dependencies: Dict[int, Set[int]] = {}
+    for source_node, _, target_node in graph:
+        dependencies.setdefault(node_to_statement(target_node), set()).add(node_to_statement(source_node))
+    return dependencies
+
+
+def get_dependency_lines_backward(recorder: DataflowRecorderIndexed, slicing_criterion_line: int,
+                                  definitions: dict[str, Definition], static_graph: Graph) -> Set[int]:
+    return DependencyTraceBackward(recorder, slicing_criterion_line, definitions, static_graph).lines
+
+
+class DependencyTraceBackward:
+    """
+    Computes the lines the slicing criterion depends on by traversing the trace backwards. A use on a line of the slice
+    adds its variable (and the variables behind its aliases) to the worklist. The next definition of a variable of the
+    worklist that is found adds its line to the slice. An assignment removes the variable from the worklist, while a
+    modification keeps it, as the modified value depends on the previous definition. Adding a line also adds the lines
+    it statically depends on (definitions and control flow).
+    Variables that are not defined earlier in the trace are resolved by their static definition, as done by the
+    dataflow graph. Compared to the dataflow graph, uses after the last execution of the criterion and executions of a
+    line after the last of its executions relevant to the criterion are ignored, so the slice may be smaller.
+    """
+
+    def __init__(self, recorder: DataflowRecorderIndexed, slicing_criterion_line: int,
+                 definitions: dict[str, Definition], static_graph: Graph):
+        self.recorder = recorder
+        self.definitions = definitions
+        self.static_dependencies = get_static_dependencies(static_graph)
+        self.lines: Set[int] = set()
+        self.worklist: Set[str] = set()
+        # index of the first event of any line of the slice, no event before it can add to the worklist
+        self.first_relevant_event = len(recorder.event_stack)
+        self.visited_events = 0
+
+        self.add_line(slicing_criterion_line)
+        self.traverse(self.find_last_event(slicing_criterion_line))
+
+    def find_last_event(self, line: int) -> int:
+        for index in range(len(self.recorder.event_stack) - 1, -1, -1):
+            if self.recorder.event_stack[index].line == line:
+                return index
+        return -1
+
+    def traverse(self, start: int):
+        events = self.recorder.event_stack
+        position = start
+        while position >= 0 and (self.worklist or self.first_relevant_event <= position):
+            event = events[position]
+            self.visited_events += 1
+
+            if isinstance(event, EventAssign):
+                if event.variable in self.worklist:
+                    self.worklist.discard(event.variable)
+                    self.add_line(event.line)
+
+            elif isinstance(event, EventModify):
+                variables = {event.variable, *event.aliases}
+                if event.line in self.lines or not self.worklist.isdisjoint(variables):
+                    self.add_line(event.line)
+                    for variable in variables:
+                        self.require(variable, position)
+
+            elif isinstance(event, EventUse):
+                if event.line in self.lines:
+                    for variable in (event.variable, *event.aliases):
+                        self.require(variable, position)
+
+            position -= 1
+
+    def require(self, variable: str, position: int):
+        """Add the variable to the worklist, if it is defined before the given event index. Otherwise, it is resolved
+        by its static definition right away."""
+        if self.recorder.first_definition_by_variable.get(variable, position) < position:
+            self.worklist.add(variable)
+        else:
+            self.worklist.discard(variable)
+            if variable in self.definitions:
+                self.add_line(self.definitions[variable].location.start.line)
+
+    def add_line(self, line: int):
+        pending = [line]
+        while pending:
+            current = pending.pop()
+            if current in self.lines:
+                continue
+            self.lines.add(current)
+            first_event = self.recorder.first_event_by_line.get(current)
+            if first_event is not None:
+                self.first_relevant_event = min(self.first_relevant_event, first_event)
+            pending.extend(self.static_dependencies.get(current, ()))
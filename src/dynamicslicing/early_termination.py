@@ -0,0 +1,73 @@
+"""This file implements the tracking of the slicing criterion executions, used to stop recording as soon as the
+criterion can no longer be executed. Events recorded after the last execution of the criterion can not influence the
+backward slice, so recording them only costs time and memory."""
+
+from typing import Callable, Optional, Set
+
+import libcst as cst
+
+from .finders import Definition, find_own_lines, is_function_executed_once
+
+
+class CriterionTracker:
+    """
+    Decides for each hook whether its events still need to be recorded. Recording stops
+    - once the function containing the criterion returns, if it is statically known to be called only once, or
+    - once the criterion has completed its k-th execution, if a maximum number of occurrences is given. An execution of
+      the criterion is considered complete as soon as another line of the function itself (not of a callee) executes.
+    The function is identified by its object, taken at its call site, as methods or imported functions may have the same
+    name.
+    """
+
+    def __init__(self, enabled: bool, function: Definition, call_line: int, criterion_line: int, stop_on_return: bool,
+                 max_occurrences: Optional[int]):
+        self.recording = True
+        self.function_name = function.name
+        self.call_line = call_line
+        self.function: Optional[Callable] = None
+        self.criterion_line = criterion_line
+        self.stop_on_return = enabled and stop_on_return
+        self.max_occurrences = max_occurrences if enabled else None
+        self.own_lines: Set[int] = find_own_lines(function)
+        self.own_lines.discard(criterion_line)
+        self.occurrences = 0
+        self.in_criterion = False
+
+    def is_unresolved_call(self, function: Callable) -> bool:
+        """Whether the called function may be the function containing the criterion, which is not resolved yet."""
+        return self.stop_on_return and self.function is None and \
+            getattr(function, "__name__", None) == self.function_name
+
+    def on_call_start(self, function: Callable, line: int):
+        if line == self.call_line:
+            self.function = function
+
+    def on_call_end(self, function: Callable):
+        # the return is observed at the call site, as DynaPyt does not instrument return statements
+        if self.stop_on_return and self.function is not None and function is self.function:
+            self.recording = False
+
+    def observe_line(self, line: int) -> bool:
+        """Register a hook on the given line and return whether its events are to be recorded."""
+        if not self.recording:
+            return False
+        if self.max_occurrences is None:
+            return True
+
+        if line == self.criterion_line:
+            if not self.in_criterion:
+                self.in_criterion = True
+                self.occurrences += 1
+        elif line in self.own_lines and self.in_criterion:
+            self.in_criterion = False
+            if self.occurrences >= self.max_occurrences:
+                self.recording = False
+                return False
+
+        return True
+
+
+def create_criterion_tracker(enabled: bool, ast: cst.Module, function: Definition, call_line: int, criterion_line: int,
+                             max_occurrences: Optional[int]) -> CriterionTracker:
+    stop_on_return = is_function_executed_once(ast, function.name)
+    return CriterionTracker(enabled, function, call_line, criterion_line, stop_on_return, max_occurrences)
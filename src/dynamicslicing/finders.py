@@ -58,15 +58,20 @@ class CallFinder(cst.CSTVisitor):
 
 
 def find_slice_me_call(ast: cst.Module) -> int:
-    call_finder = CallFinder("slice_me")
-    wrapper = cst.metadata.MetadataWrapper(ast)
-    wrapper.visit(call_finder)
-    if len(call_finder.results) == 0:
+    results = find_calls(ast, "slice_me")
+    if len(results) == 0:
         raise RuntimeError("Unable to find slice_me call in given ast.")
-    elif len(call_finder.results) > 1:
-        raise RuntimeError("Found multiple slice_me calls in given ast: " + str(call_finder.results))
+    elif len(results) > 1:
+        raise RuntimeError("Found multiple slice_me calls in given ast: " + str(results))
     else:
-        return call_finder.results[0]
+        return results[0]
+
+
+def find_calls(ast: cst.Module, function_name: str) -> list[int]:
+    call_finder = CallFinder(function_name)
+    wrapper = cst.metadata.MetadataWrapper(ast)
+    wrapper.visit(call_finder)
+    return call_finder.results
 
 
 class Definition:
@@ -114,6 +119,33 @@ def find_definitions(ast: cst.Module) -> dict[str, Definition]:
     return def_finder.results
 
 
+def find_enclosing_definitions(definitions: dict[str, Definition], line: int) -> list[Definition]:
+    """Return the definitions containing the given line, from the outermost to the innermost one."""
+    for definition in definitions.values():
+        if definition.location.start.line <= line <= definition.location.end.line:
+            return [definition] + find_enclosing_definitions(definition.children, line)
+    return []
+
+
+def find_calls_reaching(ast: cst.Module, definitions: dict[str, Definition], call_line: int) -> set[int]:
+    """
+    Return the line of a call together with the lines needed to execute it: if it is located in a function, the
+    headers of the definitions containing it and the calls of the function, and so on for the functions containing
+    these calls. Only functions called by their name are followed.
+    """
+    lines = {call_line}
+    pending = [call_line]
+    while pending:
+        enclosing_definitions = find_enclosing_definitions(definitions, pending.pop())
+        lines.update(definition.location.start.line for definition in enclosing_definitions)
+        if enclosing_definitions and isinstance(enclosing_definitions[-1].node, cst.FunctionDef):
+            for line in find_calls(ast, enclosing_definitions[-1].name):
+                if line not in lines:
+                    lines.add(line)
+                    pending.append(line)
+    return lines
+
+
 class CFElement:
     def __init__(self, node: cst.CSTNode, location: CodeRange, parent: Optional):
         self.node = node
@@ -166,3 +198,43 @@ def find_control_flow_elements(function_def: Definition, ast: cst.Module) -> CFE
     # this still works because the module contains only one function with control flow elements
     wrapper.visit(cf_finder)
     return cf_finder.current_element
+
+
+class SingleExecutionCallFinder(cst.CSTVisitor):
+    """
+    Find the calls of a function and determine for each call whether it is executed at most once, i.e. whether it is
+    located outside of any loop, comprehension, lambda, function or class body.
+    """
+    REPEATED_OR_DEFERRED_NODES = (cst.For, cst.While, cst.FunctionDef, cst.ClassDef, cst.Lambda, cst.ListComp,
+                                  cst.SetComp, cst.DictComp, cst.GeneratorExp)
+
+    def __init__(self, function_name: str):
+        super().__init__()
+        self.function_name = function_name
+        self.depth = 0
+        self.results: list[bool] = []
+
+    def on_visit(self, node: cst.CSTNode):
+        if isinstance(node, self.REPEATED_OR_DEFERRED_NODES):
+            self.depth += 1
+        if isinstance(node, cst.Call) and isinstance(node.func, cst.Name) and node.func.value == self.function_name:
+            self.results.append(self.depth == 0)
+        return True
+
+    def on_leave(self, original_node: cst.CSTNode) -> None:
+        if isinstance(original_node, self.REPEATED_OR_DEFERRED_NODES):
+            self.depth -= 1
+
+
+def is_function_executed_once(ast: cst.Module, function_name: str) -> bool:
+    call_finder = SingleExecutionCallFinder(function_name)
+    ast.visit(call_finder)
+    return call_finder.results == [True]
+
+
+def find_own_lines(definition: Definition) -> set[int]:
+    """Return the lines of a definition, excluding the lines of the definitions nested inside of it."""
+    lines = set(range(definition.location.start.line, definition.location.end.line + 1))
+    for child in definition.children.values():
+        lines.difference_update(range(child.location.start.line, child.location.end.line + 1))
+    return lines
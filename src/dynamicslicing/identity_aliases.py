@@ -0,0 +1,153 @@
+"""This file implements alias detection based on object identity. The analyses otherwise only detect an alias if the
+right-hand side of an assignment is a plain name. Instead, the table below maps the id() of each object that was
+assigned to a variable to the variables currently holding it. An assignment of an object that is already held by
+another variable is an alias of that variable, no matter whether the object was passed through a call, taken out of a
+container or assigned directly.
+
+The table maps an object to the variables holding it rather than to the line defining it: the recorders resolve an
+alias by the name of the aliased variable, whose latest assignment is the defining line of the object. The variables
+are qualified by the frame of the program they belong to, so that a variable of one call does not replace the variable
+of the same name in another call. Entries are pruned when their object is collected, when no variable holds their object
+anymore and when the frames of their variables finish."""
+
+import sys
+import weakref
+from types import FrameType
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dynamicslicing.utils import is_of_primitive_type
+
+RUNTIME_MODULE = "dynapyt.runtime"
+
+# a frame is identified by its id together with the id of its code, as the id of a finished frame may be reused
+FrameKey = Tuple[int, int]
+# a variable qualified by the frame it belongs to
+Holder = Tuple[FrameKey, str]
+
+# the key of variables recorded outside of the hooks of the program
+NO_FRAME: FrameKey = (0, 0)
+
+
+def get_program_frame() -> Optional[FrameType]:
+    """Return the frame of the program code whose execution called the current hook, i.e. the caller of the DynaPyt
+    runtime, or None if no hook is being called."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") != RUNTIME_MODULE:
+        frame = frame.f_back
+    while frame is not None and frame.f_globals.get("__name__") == RUNTIME_MODULE:
+        frame = frame.f_back
+    return frame
+
+
+def get_frame_key(frame: Optional[FrameType]) -> FrameKey:
+    return NO_FRAME if frame is None else (id(frame), id(frame.f_code))
+
+
+def get_running_frames() -> Set[FrameKey]:
+    """Return the keys of the frames on the stacks of all threads. Suspended generators and coroutines are not
+    included."""
+    keys = {NO_FRAME}
+    for frame in sys._current_frames().values():
+        while frame is not None:
+            keys.add(get_frame_key(frame))
+            frame = frame.f_back
+    return keys
+
+
+class ObjectEntry:
+    """The variables holding an object, in the order they were assigned. The object is referenced weakly where
+    possible. Objects that do not support weak references (e.g. lists and dicts) are referenced strongly, so that their
+    id cannot be reused by another object, but only as long as a variable of a running frame holds them."""
+
+    def __init__(self, value: Any, on_collect):
+        try:
+            self.reference = weakref.ref(value, on_collect)
+            self.value = None
+        except TypeError:
+            self.reference = None
+            self.value = value
+        self.holders: List[Holder] = []
+
+    def get_object(self) -> Any:
+        return self.value if self.reference is None else self.reference()
+
+
+class IdentityAliasTable:
+
+    def __init__(self):
+        self.entries: Dict[int, ObjectEntry] = {}
+        # the id of the object each variable holds, to remove the variable from the entry when it is reassigned
+        self.objects_by_holder: Dict[Holder, int] = {}
+        self.holders_by_frame: Dict[FrameKey, Set[Holder]] = {}
+
+    def find_owner(self, value: Any) -> Optional[str]:
+        """Return the variable the given object was first assigned to, among the variables still holding it."""
+        entry = self.get_entry(value)
+        if entry is None or not entry.holders:
+            return None
+        return entry.holders[0][1]
+
+    def record_assignment(self, variable: str, value: Any, frame: Optional[FrameType] = None):
+        """Register that the variable of the given frame (by default the frame of the program calling the current
+        hook) now holds the given value, replacing the object it held before."""
+        frame_key = get_frame_key(frame or get_program_frame())
+        if frame_key not in self.holders_by_frame:
+            # a new frame was entered, the frames that finished since the last one was entered are pruned
+            self.prune_frames(get_running_frames())
+            self.holders_by_frame[frame_key] = set()
+        holder = (frame_key, variable)
+
+        entry = self.get_entry(value)
+        if entry is not None and holder in entry.holders:
+            return
+        self.remove_holder(holder)
+
+        if is_of_primitive_type(value):
+            # primitive values are interned and immutable, their identity does not imply aliasing
+            return
+        if entry is None:
+            object_id = id(value)
+            entry = ObjectEntry(value, lambda reference: self.remove_collected(object_id, reference))
+            self.entries[object_id] = entry
+        entry.holders.append(holder)
+        self.objects_by_holder[holder] = id(value)
+        self.holders_by_frame[frame_key].add(holder)
+
+    def record_read(self, variable: str, value: Any, frame: Optional[FrameType] = None):
+        """Register the object a variable holds when it is read. This covers variables whose assignment was not
+        observed, like parameters or variables assigned outside of the recorded code."""
+        if self.find_owner(value) is None:
+            self.record_assignment(variable, value, frame)
+
+    def get_entry(self, value: Any) -> Optional[ObjectEntry]:
+        entry = self.entries.get(id(value))
+        # the id of a collected object may have been reused by another one
+        if entry is None or entry.get_object() is not value:
+            return None
+        return entry
+
+    def remove_holder(self, holder: Holder):
+        object_id = self.objects_by_holder.pop(holder, None)
+        self.holders_by_frame.get(holder[0], set()).discard(holder)
+        entry = self.entries.get(object_id)
+        if entry is None or holder not in entry.holders:
+            return
+        entry.holders.remove(holder)
+        if not entry.holders:
+            del self.entries[object_id]
+
+    def remove_collected(self, object_id: int, reference: weakref.ref):
+        entry = self.entries.get(object_id)
+        if entry is None or entry.reference is not reference:
+            return
+        del self.entries[object_id]
+        for holder in entry.holders:
+            self.objects_by_holder.pop(holder, None)
+            self.holders_by_frame.get(holder[0], set()).discard(holder)
+
+    def prune_frames(self, running_frames: Set[FrameKey]):
+        """Remove the variables of the frames that are not running anymore."""
+        for frame_key in [key for key in self.holders_by_frame if key not in running_frames]:
+            for holder in list(self.holders_by_frame[frame_key]):
+                self.remove_holder(holder)
+            del self.holders_by_frame[frame_key]
@@ -0,0 +1,127 @@
+"""This file implements incremental re-slicing of edited programs. If an edit does not change the execution of the
+program, the trace of the previous run is still valid after renumbering its lines, so the program needs neither be
+instrumented nor run again. This holds if the old and new program only differ in comments and formatting, or in the
+bodies of functions that were not entered during the previous run (the run is deterministic up to these functions, so
+the new run does not enter them either). Other edits require a new run."""
+
+import ast
+import difflib
+from typing import Dict, List, Optional, Set
+
+import libcst as cst
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, EventAlias, EventAssign, EventModify, EventUse
+from dynamicslicing.finders import Definition, find_definitions
+
+
+class FunctionBodyStripper(cst.CSTTransformer):
+    """Replaces the body of each function with an ellipsis, leaving the code that runs when a module or class body is
+    executed."""
+
+    def leave_FunctionDef(self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef) -> cst.FunctionDef:
+        return updated_node.with_changes(body=cst.IndentedBlock([cst.SimpleStatementLine([cst.Expr(cst.Ellipsis())])]))
+
+
+def normalize_code(code: str) -> str:
+    """Return a representation of the code that ignores comments and formatting."""
+    return ast.dump(ast.parse(code))
+
+
+def normalize_function_body(function: cst.FunctionDef) -> str:
+    """Normalize the body of a function, without the bodies of the functions nested in it, as they only run when the
+    nested functions are called."""
+    body = function.body.visit(FunctionBodyStripper())
+    if isinstance(body, cst.IndentedBlock):
+        statements = list(body.body)
+    else:
+        statements = [cst.SimpleStatementLine(body=body.body)]
+    return normalize_code(cst.Module(body=statements).code)
+
+
+def flatten_functions(definitions: dict[str, Definition]) -> List[Definition]:
+    functions = []
+    for definition in definitions.values():
+        if isinstance(definition.node, cst.FunctionDef):
+            functions.append(definition)
+        functions.extend(flatten_functions(definition.children))
+    return functions
+
+
+def find_changed_functions(old_ast: cst.Module, new_ast: cst.Module) -> Optional[Set[int]]:
+    """
+    Return the first lines (in the old program) of the functions whose bodies differ between the two programs. Returns
+    None if the programs differ outside of function bodies, e.g. in module level code, class bodies or function
+    headers.
+    """
+    if normalize_code(old_ast.visit(FunctionBodyStripper()).code) != \
+            normalize_code(new_ast.visit(FunctionBodyStripper()).code):
+        return None
+
+    # the same structure outside of function bodies implies the same functions in the same order
+    changed = set()
+    for old_function, new_function in zip(flatten_functions(find_definitions(old_ast)),
+                                          flatten_functions(find_definitions(new_ast))):
+        if normalize_function_body(old_function.node) != normalize_function_body(new_function.node):
+            changed.add(old_function.location.start.line)
+    return changed
+
+
+def create_line_mapping(old_source: str, new_source: str) -> Dict[int, int]:
+    """Map the lines of the old source to the lines of the new source with the same code. Comments and indentation
+    are ignored, so that a line whose comment was edited is still mapped."""
+
+    def get_code(line: str) -> str:
+        return line.split("#", 1)[0].strip()
+
+    old_lines = [get_code(line) for line in old_source.splitlines()]
+    new_lines = [get_code(line) for line in new_source.splitlines()]
+    mapping = {}
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for old_start, new_start, length in matcher.get_matching_blocks():
+        for offset in range(length):
+            mapping[old_start + offset + 1] = new_start + offset + 1
+    return mapping
+
+
+def remap_recorder(recorder: DataflowRecorderSimple, line_mapping: Dict[int, int]) -> Optional[DataflowRecorderSimple]:
+    """Copy the events of the recorder with renumbered lines. Returns None if an event is on a line without mapping."""
+    remapped = DataflowRecorderSimple()
+    for event in recorder.event_stack:
+        line = line_mapping.get(event.line)
+        if line is None:
+            return None
+        if isinstance(event, EventAssign):
+            remapped.record_assignment(event.variable, line)
+        elif isinstance(event, EventUse):
+            remapped.record_usage(event.variable, line)
+        elif isinstance(event, EventModify):
+            remapped.record_modification(event.variable, line)
+        elif isinstance(event, EventAlias):
+            remapped.record_alias(event.alias, event.variable_behind_alias, line)
+    return remapped
+
+
+class PreviousRun:
+    """The source a program was executed with, together with the recorded trace and the entered functions."""
+
+    def __init__(self, source: str, recorder: DataflowRecorderSimple, entered_functions: Set[int]):
+        self.source = source
+        self.recorder = recorder
+        self.entered_functions = entered_functions
+
+    def update(self, new_source: str) -> Optional["PreviousRun"]:
+        """Return this run renumbered for the new source, or None if the edit may change the execution."""
+        if new_source == self.source:
+            return self
+        try:
+            changed_functions = find_changed_functions(cst.parse_module(self.source), cst.parse_module(new_source))
+        except (cst.ParserSyntaxError, SyntaxError):
+            return None
+        if changed_functions is None or not changed_functions.isdisjoint(self.entered_functions):
+            return None
+
+        line_mapping = create_line_mapping(self.source, new_source)
+        recorder = remap_recorder(self.recorder, line_mapping)
+        if recorder is None or not self.entered_functions.issubset(line_mapping):
+            return None
+        return PreviousRun(new_source, recorder, {line_mapping[line] for line in self.entered_functions})
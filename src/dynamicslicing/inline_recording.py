@@ -0,0 +1,235 @@
+"""This file implements an instrumentation mode that generates the recording code instead of calling DynaPyt hooks. The
+events of each statement are precomputed (with the line effects of the monitoring backend) as compact records of
+(kind, line, variable id, id of the variable behind an alias), and the statement is rewritten to extend a plain list
+with the tuple of its records. No AST, IID or location lookups and no hook dispatch happen during execution, the
+buffer is only converted into the recorder of the analysis after the program finished.
+
+For example, `y = x` in a function is rewritten to
+    _dynamicslicing_extend(_dynamicslicing_site_0)
+    y = x
+    _dynamicslicing_extend(_dynamicslicing_site_1)
+    _dynamicslicing_is_primitive(x) or _dynamicslicing_append(_dynamicslicing_site_2)
+and the test of `if`/`while` statements as well as the iterable of `for` loops are prefixed with
+`_dynamicslicing_extend(...) or`, so that their uses are recorded each time they are evaluated.
+
+Usage:
+    python -m dynamicslicing.inline_recording program.py --analysis dynamicslicing.slice.Slice
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import libcst as cst
+import libcst.matchers as m
+from libcst.metadata import PositionProvider
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple
+from dynamicslicing.monitoring_backend import Effect, LineEffects, find_line_effects
+from dynamicslicing.utils import is_of_primitive_type
+
+NAME_PREFIX = "_dynamicslicing_"
+
+KIND_ASSIGN = 0
+KIND_USE = 1
+KIND_MODIFY = 2
+KIND_ALIAS = 3
+
+KINDS = {"assign": KIND_ASSIGN, "use": KIND_USE, "modify": KIND_MODIFY, "alias": KIND_ALIAS}
+
+# (kind, line, variable id, id of the variable behind the alias or -1)
+Record = Tuple[int, int, int, int]
+
+
+class InlineRecordingProgram:
+    """The rewritten source of a program together with the precomputed records of its sites."""
+
+    def __init__(self, code: str, sites: Dict[str, Tuple[Record, ...]], variables: List[str]):
+        self.code = code
+        self.sites = sites
+        self.variables = variables
+
+
+class InlineRecordingTransformer(cst.CSTTransformer):
+    METADATA_DEPENDENCIES = (
+        PositionProvider,
+    )
+
+    def __init__(self, effects: Dict[int, LineEffects], alias_primitive_values: bool):
+        super().__init__()
+        self.effects = effects
+        self.alias_primitive_values = alias_primitive_values
+        self.sites: Dict[str, Tuple[Record, ...]] = {}
+        self.site_count = 0
+        self.variables: List[str] = []
+        self.variable_ids: Dict[str, int] = {}
+
+    def leave_SimpleStatementLine(self, original_node: cst.SimpleStatementLine,
+                                  updated_node: cst.SimpleStatementLine) -> Union[cst.BaseStatement,
+                                                                                  cst.FlattenSentinel]:
+        effects = self.get_effects(original_node)
+        if effects is None:
+            return updated_node
+        # the comments and empty lines above the statement are moved above the generated code
+        leading_lines = updated_node.leading_lines
+        updated_node = updated_node.with_changes(leading_lines=[])
+        statements = []
+        if effects.before:
+            statements.append(self.create_call_statement("extend", self.create_site(effects.before)))
+        statements.append(updated_node)
+        # consecutive writes share a site, each alias needs its own site, as it is only recorded for some values
+        writes = []
+        for effect in effects.after:
+            if effect[0] != "alias":
+                writes.append(effect)
+                continue
+            if writes:
+                statements.append(self.create_call_statement("extend", self.create_site(writes)))
+                writes = []
+            statements.append(self.create_alias_statement(effect))
+        if writes:
+            statements.append(self.create_call_statement("extend", self.create_site(writes)))
+        statements[0] = statements[0].with_changes(leading_lines=leading_lines)
+        return cst.FlattenSentinel(statements)
+
+    def leave_IndentedBlock(self, original_node: cst.IndentedBlock,
+                            updated_node: cst.IndentedBlock) -> cst.IndentedBlock:
+        return updated_node.with_changes(body=self.merge_sites(updated_node.body))
+
+    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
+        return updated_node.with_changes(body=self.merge_sites(updated_node.body))
+
+    def merge_sites(self, statements: Sequence[cst.BaseStatement]) -> List[cst.BaseStatement]:
+        """Merge the sites of consecutive extend statements, e.g. of the writes of a statement and the uses of the next
+        one, so that each of them is recorded by a single call."""
+        merged = []
+        for statement in statements:
+            site = self.get_extended_site(statement)
+            previous_site = self.get_extended_site(merged[-1]) if merged else None
+            if site is not None and previous_site is not None and not statement.leading_lines:
+                self.sites[previous_site] = self.sites[previous_site] + self.sites.pop(site)
+            else:
+                merged.append(statement)
+        return merged
+
+    @staticmethod
+    def get_extended_site(statement: cst.BaseStatement) -> Optional[str]:
+        if m.matches(statement, m.SimpleStatementLine([m.Expr(m.Call(func=m.Name(NAME_PREFIX + "extend")))])):
+            return statement.body[0].value.args[0].value.value
+        return None
+
+    def leave_If(self, original_node: cst.If, updated_node: cst.If) -> cst.If:
+        return updated_node.with_changes(test=self.prefix_expression(original_node, updated_node.test))
+
+    def leave_While(self, original_node: cst.While, updated_node: cst.While) -> cst.While:
+        return updated_node.with_changes(test=self.prefix_expression(original_node, updated_node.test))
+
+    def leave_For(self, original_node: cst.For, updated_node: cst.For) -> cst.For:
+        return updated_node.with_changes(iter=self.prefix_expression(original_node, updated_node.iter))
+
+    def prefix_expression(self, original_node: cst.CSTNode, expression: cst.BaseExpression) -> cst.BaseExpression:
+        """Record the uses of a header expression right before it is evaluated, extend returns None."""
+        effects = self.get_effects(original_node)
+        if effects is None or not effects.before:
+            return expression
+        return cst.BooleanOperation(
+            left=self.create_call("extend", self.create_site(effects.before)),
+            operator=cst.Or(),
+            right=expression.with_changes(lpar=[cst.LeftParen()], rpar=[cst.RightParen()]),
+        )
+
+    def get_effects(self, node: cst.CSTNode):
+        return self.effects.get(self.get_metadata(PositionProvider, node).start.line)
+
+    def create_alias_statement(self, effect: Effect) -> cst.SimpleStatementLine:
+        append = self.create_call("append", self.create_site([effect]))
+        if self.alias_primitive_values:
+            return cst.SimpleStatementLine([cst.Expr(append)])
+        # like the write hook, the alias is only recorded if the assigned value is not primitive
+        check = cst.Call(func=cst.Name(NAME_PREFIX + "is_primitive"), args=[cst.Arg(cst.Name(effect[3]))])
+        return cst.SimpleStatementLine([cst.Expr(cst.BooleanOperation(left=check, operator=cst.Or(), right=append))])
+
+    def create_call_statement(self, function: str, site: str) -> cst.SimpleStatementLine:
+        return cst.SimpleStatementLine([cst.Expr(self.create_call(function, site))])
+
+    @staticmethod
+    def create_call(function: str, site: str) -> cst.Call:
+        return cst.Call(func=cst.Name(NAME_PREFIX + function), args=[cst.Arg(cst.Name(site))])
+
+    def create_site(self, effects: List[Effect]) -> str:
+        name = f"{NAME_PREFIX}site_{self.site_count}"
+        self.site_count += 1
+        records = []
+        for effect in effects:
+            variable_behind_alias_id = self.get_variable_id(effect[3]) if effect[0] == "alias" else -1
+            records.append((KINDS[effect[0]], effect[2], self.get_variable_id(effect[1]), variable_behind_alias_id))
+        # alias sites are appended to the buffer as a single record, all other sites extend it
+        self.sites[name] = records[0] if len(effects) == 1 and effects[0][0] == "alias" else tuple(records)
+        return name
+
+    def get_variable_id(self, variable: str) -> int:
+        variable_id = self.variable_ids.get(variable)
+        if variable_id is None:
+            variable_id = self.variable_ids[variable] = len(self.variables)
+            self.variables.append(variable)
+        return variable_id
+
+
+def generate_inline_recording(ast: cst.Module, alias_primitive_values: bool) -> InlineRecordingProgram:
+    transformer = InlineRecordingTransformer(find_line_effects(ast), alias_primitive_values)
+    code = cst.metadata.MetadataWrapper(ast).visit(transformer).code
+    return InlineRecordingProgram(code, transformer.sites, transformer.variables)
+
+
+def run_inline_recording(program: InlineRecordingProgram, program_file: Path) -> List[Record]:
+    """Execute the rewritten program as __main__ and return the buffer of records."""
+    buffer: List[Record] = []
+    module_globals = {
+        "__name__": "__main__",
+        "__file__": str(program_file),
+        "__builtins__": __builtins__,
+        NAME_PREFIX + "extend": buffer.extend,
+        NAME_PREFIX + "append": buffer.append,
+        NAME_PREFIX + "is_primitive": is_of_primitive_type,
+    }
+    module_globals.update(program.sites)
+    exec(compile(program.code, str(program_file), "exec"), module_globals)
+    return buffer
+
+
+def replay_records(records: List[Record], variables: List[str], recorder: DataflowRecorderSimple):
+    for kind, line, variable_id, variable_behind_alias_id in records:
+        if kind == KIND_USE:
+            recorder.record_usage(variables[variable_id], line)
+        elif kind == KIND_ASSIGN:
+            recorder.record_assignment(variables[variable_id], line)
+        elif kind == KIND_MODIFY:
+            recorder.record_modification(variables[variable_id], line)
+        else:
+            recorder.record_alias(variables[variable_id], variables[variable_behind_alias_id], line)
+
+
+def slice_with_inline_recording(program: str, analysis_path: str):
+    """Record the program with generated recording code and write its sliced.py like the DynaPyt hooks would."""
+    # the server module provides the helpers to create analyses for uninstrumented programs
+    from dynamicslicing.slicing_server import create_analysis
+
+    program_file = Path(program).resolve()
+    analysis = create_analysis(analysis_path, program_file)
+    inline_program = generate_inline_recording(analysis.ast, analysis.alias_primitive_values)
+    analysis.begin_execution()
+    records = run_inline_recording(inline_program, program_file)
+    replay_records(records, inline_program.variables, analysis.recorder)
+    analysis.end_execution()
+
+
+def main(arguments: List[str] = None):
+    parser = argparse.ArgumentParser(description="Slice a program recorded with generated recording code.")
+    parser.add_argument("program", help="Path of the program to slice")
+    parser.add_argument("--analysis", default="dynamicslicing.slice.Slice", help="Class path of the analysis")
+    args = parser.parse_args(arguments)
+    slice_with_inline_recording(args.program, args.analysis)
+
+
+if __name__ == "__main__":
+    main()
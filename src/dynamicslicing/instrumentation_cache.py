@@ -0,0 +1,84 @@
+"""This file implements a cache for the instrumentation of programs. Instrumenting a program with DynaPyt parses and
+transforms the whole module, although the result only depends on the source, the selected hooks and the DynaPyt
+version. The cache stores the instrumented module and its IID map (program-dynapyt.json) under a hash of these inputs
+and restores them on a hit, so that repeated runs skip the instrumentation."""
+
+import hashlib
+import os
+import re
+import tempfile
+from importlib.metadata import version, PackageNotFoundError
+from json import dumps
+from pathlib import Path
+from shutil import copyfile, rmtree
+from typing import Dict, List, Optional
+
+from dynapyt.instrument.instrument import instrument_file
+
+DEFAULT_CACHE_FOLDER = Path(tempfile.gettempdir()).joinpath("dynamicslicing_instrumentation_cache")
+INSTRUMENTED_FILE_NAME = "instrumented.py"
+IIDS_FILE_NAME = "iids.json"
+
+
+def get_dynapyt_version() -> str:
+    try:
+        return version("dynapyt")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_iids_file_path(file_path: str) -> str:
+    return re.sub(r"\.py$", "-dynapyt.json", file_path)
+
+
+def get_cache_key(source: str, file_path: str, selected_hooks: Dict[str, Dict[str, List[str]]]) -> str:
+    """Hash the inputs of the instrumentation. The absolute path of the program is part of the key, as DynaPyt embeds
+    it into the instrumented module and the IID map."""
+    content = dumps({
+        "source": source,
+        "path": os.path.abspath(file_path),
+        "hooks": selected_hooks,
+        "dynapyt": get_dynapyt_version(),
+    }, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def instrument_file_cached(file_path: str, selected_hooks: Dict[str, Dict[str, List[str]]],
+                           cache_folder: Optional[Path] = None) -> bool:
+    """
+    Drop-in replacement for DynaPyt's instrument_file: afterwards, the file contains the instrumented module, the
+    original is copied to <program>.py.orig and the IID map is stored in <program>-dynapyt.json.
+    Returns whether the instrumentation was restored from the cache.
+    """
+    cache_folder = cache_folder or DEFAULT_CACHE_FOLDER
+    with open(file_path, "r") as file:
+        source = file.read()
+    entry_folder = cache_folder.joinpath(get_cache_key(source, file_path, selected_hooks))
+    iids_file_path = get_iids_file_path(file_path)
+
+    if entry_folder.joinpath(IIDS_FILE_NAME).exists():
+        copyfile(file_path, re.sub(r"\.py$", ".py.orig", file_path))
+        copyfile(entry_folder.joinpath(INSTRUMENTED_FILE_NAME), file_path)
+        copyfile(entry_folder.joinpath(IIDS_FILE_NAME), iids_file_path)
+        return True
+
+    instrument_file(file_path, selected_hooks)
+    if not os.path.exists(iids_file_path):
+        # DynaPyt skipped the file, e.g. because it is already instrumented
+        return False
+
+    # fill the entry in a temporary folder first, so that concurrent runs never see a partial entry
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    temporary_folder = Path(tempfile.mkdtemp(dir=cache_folder))
+    copyfile(file_path, temporary_folder.joinpath(INSTRUMENTED_FILE_NAME))
+    copyfile(iids_file_path, temporary_folder.joinpath(IIDS_FILE_NAME))
+    try:
+        os.rename(temporary_folder, entry_folder)
+    except OSError:
+        # another run stored the same entry in the meantime
+        rmtree(temporary_folder, ignore_errors=True)
+    return False
+
+
+def clear_instrumentation_cache(cache_folder: Optional[Path] = None):
+    rmtree(cache_folder or DEFAULT_CACHE_FOLDER, ignore_errors=True)
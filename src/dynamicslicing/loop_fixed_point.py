@@ -0,0 +1,101 @@
+"""This file implements the suspension of recording for loop iterations that cannot add new dependencies. The hook calls
+between two loop events (the start of an iteration or the end of a loop) form a segment, whose events are fully
+determined by the hooks and IIDs it contains (and, for writes, whether the value is primitive). Once the recorded
+segments end with a period of up to max_period segments repeated k >= 2 times (e.g. the iterations of a loop body, or
+of a loop body alternating between two branches), the latest definition of each variable is the same before and after
+each further repetition, so it adds exactly the same statement level dependencies again. The hook calls of further
+segments are therefore only buffered, and dropped once a whole repetition of the period matched. Otherwise (e.g. a
+branch was taken differently, the loop ended or was left with break), the buffered hook calls are recorded after all."""
+
+from typing import Any, List, Optional, Tuple
+
+# (hook, dyn_ast, iid, value)
+HookCall = Tuple[str, str, int, Any]
+
+
+class LoopFixedPointTracker:
+
+    def __init__(self, enabled: bool, repetitions: int, max_period: int):
+        self.enabled = enabled
+        # a single recorded repetition does not determine the definitions the next one starts with
+        self.repetitions = max(repetitions, 2)
+        self.max_period = max(max_period, 1)
+        # the loop event that started the current segment, followed by its hook calls
+        self.signature: List[Any] = [None]
+        # the signatures of the latest recorded segments, equal signatures are the same object
+        self.history: List[tuple] = []
+        # the repeated segments while recording is suspended, and the position of the current segment in them
+        self.period: Optional[List[tuple]] = None
+        self.position = 0
+        self.deferring = False
+        self.deferred: List[HookCall] = []
+        self.dropped_segments = 0
+
+    def defer(self, hook: str, dyn_ast: str, iid: int, value: Any = None, variant: Any = None) -> bool:
+        """Add a hook call to the current segment. Returns whether it is deferred, i.e. must not be recorded now. The
+        variant distinguishes hook calls of the same IID that record different events."""
+        self.signature.append((hook, dyn_ast, iid, variant))
+        if self.deferring:
+            self.deferred.append((hook, dyn_ast, iid, value))
+        return self.deferring
+
+    def on_loop_event(self, dyn_ast: str, iid: int, is_iteration: bool) -> List[HookCall]:
+        """Close the current segment at a loop event and start the next one. Returns the deferred hook calls that have
+        to be recorded after all."""
+        loop_event = (dyn_ast, iid, is_iteration)
+        to_record = self.close_segment()
+        if self.period is not None and self.position and self.period[self.position][0] != loop_event:
+            to_record += self.resume([])
+        self.deferring = self.period is not None and self.period[self.position][0] == loop_event
+        self.signature = [loop_event]
+        return to_record
+
+    def finish(self) -> List[HookCall]:
+        """Close the current segment at the end of execution."""
+        to_record = self.close_segment()
+        if self.position:
+            to_record += self.resume([])
+        self.signature = [None]
+        return to_record
+
+    def close_segment(self) -> List[HookCall]:
+        signature = tuple(self.signature)
+        if not self.deferring:
+            self.add_to_history([signature])
+            return []
+        self.deferring = False
+        if signature != self.period[self.position]:
+            return self.resume([signature])
+        self.position += 1
+        if self.position == len(self.period):
+            # a whole repetition of the period leaves the latest definitions unchanged
+            self.dropped_segments += self.position
+            self.position = 0
+            self.deferred = []
+        return []
+
+    def resume(self, signatures: List[tuple]) -> List[HookCall]:
+        """End the suspension, the segments of the current repetition are recorded after all."""
+        to_record = self.deferred
+        self.deferred = []
+        self.add_to_history(self.period[:self.position] + signatures)
+        return to_record
+
+    def add_to_history(self, signatures: List[tuple]):
+        for signature in signatures:
+            # share equal signatures, so that finding the period compares by identity
+            signature = next((previous for previous in self.history if previous == signature), signature)
+            self.history.append(signature)
+        del self.history[:-self.max_period * self.repetitions]
+        self.period = self.find_period()
+        self.position = 0
+
+    def find_period(self) -> Optional[List[tuple]]:
+        history = self.history
+        for period in range(1, self.max_period + 1):
+            window = period * self.repetitions
+            if window > len(history):
+                return None
+            if all(history[-i] is history[-i - period] for i in range(1, window - period + 1)):
+                return history[-period:]
+        return None
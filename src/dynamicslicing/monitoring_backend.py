@@ -0,0 +1,378 @@
+"""This file implements a recording backend that does not instrument the program. Instead of the DynaPyt hooks, which
+are dispatched for every read and write of the instrumented code, it uses line events of the interpreter on the code
+objects of the sliced module only: sys.monitoring (PEP 669) on Python 3.12+, sys.settrace on older versions. The reads,
+writes and calls of each line are derived statically with the variable_extractor logic, following what the hooks of the
+analyses would record for them, and replayed into the recorder of the analysis whenever the line executes.
+
+Writes of a statement are recorded when the next line of the same frame starts (or the frame returns), so that the
+events of called functions are recorded in between, like with the hooks. Whether a plain name assignment is an alias
+is decided by the value of the assigned name at the start of the line. Threads started by the program are recorded as
+well. Early termination and the scope filter are not supported by this backend.
+
+Usage:
+    python -m dynamicslicing.monitoring_backend program.py --analysis dynamicslicing.slice.Slice
+"""
+
+import argparse
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import libcst as cst
+from libcst.metadata import ExpressionContext, ExpressionContextProvider, PositionProvider, QualifiedNameProvider, \
+    QualifiedNameSource
+
+from dynamicslicing.utils import is_of_primitive_type
+from dynamicslicing.variable_extractor import extract_variables_from_args, extract_variables_from_expression, \
+    get_contained_variables
+
+MONITORING_TOOL_NAME = "dynamicslicing"
+
+# (kind, variable, line) with kind one of "assign", "use", "modify"; aliases are stored as ("alias", alias, line, name)
+Effect = Tuple
+
+
+class LineEffects:
+    """The events of a statement: the uses and call effects recorded when its line starts, and the writes recorded
+    when it finished. Aliases are only recorded if the value of their name is not primitive (if requested)."""
+
+    def __init__(self):
+        self.before: List[Effect] = []
+        self.after: List[Effect] = []
+        # for loops: the last line of the body, the iterable is only evaluated when entering the loop
+        self.loop_end_line: Optional[int] = None
+
+
+class LineEffectsFinder(cst.CSTVisitor):
+    METADATA_DEPENDENCIES = (
+        PositionProvider,
+        ExpressionContextProvider,
+        QualifiedNameProvider,
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.results: Dict[int, LineEffects] = {}
+        self.current: Optional[LineEffects] = None
+
+    def visit_SimpleStatementLine(self, node: cst.SimpleStatementLine):
+        self.start_statement(node)
+
+    def leave_SimpleStatementLine(self, original_node: cst.SimpleStatementLine):
+        self.current = None
+
+    def visit_If(self, node: cst.If):
+        self.visit_header(node, node.test)
+        return False
+
+    def visit_While(self, node: cst.While):
+        self.visit_header(node, node.test)
+        return False
+
+    def visit_For(self, node: cst.For):
+        self.visit_header(node, node.iter)
+        line = self.get_metadata(PositionProvider, node).start.line
+        self.results[line].loop_end_line = self.get_metadata(PositionProvider, node.body).end.line
+        return False
+
+    def visit_header(self, node: cst.CSTNode, expression: cst.BaseExpression):
+        """Record the effects of the header expression only, the blocks are visited as statements of their own."""
+        self.start_statement(node)
+        expression.visit(self)
+        self.current = None
+        for child in node.children:
+            if child is not expression:
+                child.visit(self)
+
+    def start_statement(self, node: cst.CSTNode):
+        line = self.get_metadata(PositionProvider, node).start.line
+        self.current = self.results.setdefault(line, LineEffects())
+
+    def visit_FunctionDef(self, node: cst.FunctionDef):
+        # the body is executed separately, the header is not recorded by the hooks either
+        self.current = None
+        node.body.visit(self)
+        return False
+
+    def visit_ClassDef(self, node: cst.ClassDef):
+        self.current = None
+        node.body.visit(self)
+        return False
+
+    def visit_Lambda(self, node: cst.Lambda):
+        return False
+
+    def leave_Name(self, original_node: cst.Name):
+        if self.current is None or not self.is_local_load(original_node):
+            return
+        self.add_use(original_node.value, original_node)
+
+    def leave_Attribute(self, original_node: cst.Attribute):
+        if self.current is not None and self.get_context(original_node) == ExpressionContext.LOAD:
+            self.add_read(original_node)
+
+    def leave_Subscript(self, original_node: cst.Subscript):
+        if self.current is not None and self.get_context(original_node) == ExpressionContext.LOAD:
+            self.add_read(original_node)
+
+    def visit_Assign(self, node: cst.Assign):
+        # the targets of assignments are not read
+        node.value.visit(self)
+        return False
+
+    def visit_AugAssign(self, node: cst.AugAssign):
+        # the target of an augmented assignment is read after the value, but only if it is an attribute or subscript
+        node.value.visit(self)
+        node.target.visit(self)
+        if self.current is not None and isinstance(node.target, (cst.Attribute, cst.Subscript)):
+            self.add_read(node.target)
+        return False
+
+    def add_read(self, node: cst.BaseExpression):
+        """Mirror of the read hook for attributes and subscripts."""
+        try:
+            variables = extract_variables_from_expression(node)
+        except (RuntimeError, IndexError):
+            return
+        for variable in get_contained_variables(variables):
+            self.add_use(variable, node)
+
+    def leave_Call(self, original_node: cst.Call):
+        func = original_node.func
+        if self.current is None or not isinstance(func, cst.Attribute) or not isinstance(func.value, cst.Name):
+            return
+        line = self.get_metadata(PositionProvider, original_node).start.line
+        try:
+            variables = get_contained_variables(extract_variables_from_args(original_node.args))
+        except (RuntimeError, IndexError):
+            variables = []
+        for variable in variables:
+            self.current.before.append(("use", variable, line))
+        self.current.before.append(("modify", func.value.value, line))
+
+    def leave_Assign(self, original_node: cst.Assign):
+        if self.current is None:
+            return
+        line = self.get_metadata(PositionProvider, original_node).start.line
+        value = original_node.value
+        alias_source = value.value if isinstance(value, cst.Name) else None
+        for target in original_node.targets:
+            self.add_write(target.target, line, alias_source, False)
+
+    def leave_AugAssign(self, original_node: cst.AugAssign):
+        if self.current is None:
+            return
+        line = self.get_metadata(PositionProvider, original_node).start.line
+        self.add_write(original_node.target, line, None, True)
+
+    def add_write(self, target: cst.BaseAssignTargetExpression, line: int, alias_source: Optional[str],
+                  is_aug_assign: bool):
+        """Mirror of Slice.record_assign_to_target."""
+        if isinstance(target, (cst.Subscript, cst.Attribute)):
+            try:
+                prefix = extract_variables_from_expression(target.value)[0]
+            except (RuntimeError, IndexError):
+                return
+            path = prefix + "[?]" if isinstance(target, cst.Subscript) else prefix + "." + target.attr.value
+            self.current.after.append(("modify" if is_aug_assign else "assign", path, line))
+            self.current.after.append(("modify", prefix, line))
+        elif isinstance(target, cst.Name):
+            path = target.value
+            self.current.after.append(("modify" if is_aug_assign else "assign", path, line))
+        else:
+            return
+        if alias_source and alias_source != path:
+            self.current.after.append(("alias", path, line, alias_source))
+
+    def add_use(self, variable: str, node: cst.CSTNode):
+        self.current.before.append(("use", variable, self.get_metadata(PositionProvider, node).start.line))
+
+    def is_local_load(self, node: cst.Name) -> bool:
+        if self.get_context(node) != ExpressionContext.LOAD:
+            return False
+        names = list(self.get_metadata(QualifiedNameProvider, node, []))
+        return len(names) > 0 and names[0].source == QualifiedNameSource.LOCAL
+
+    def get_context(self, node: cst.CSTNode) -> Optional[ExpressionContext]:
+        return self.get_metadata(ExpressionContextProvider, node, None)
+
+
+def find_line_effects(ast: cst.Module) -> Dict[int, LineEffects]:
+    finder = LineEffectsFinder()
+    wrapper = cst.metadata.MetadataWrapper(ast)
+    wrapper.visit(finder)
+    return finder.results
+
+
+class LineEventRecorder:
+    """Replays the effects of the executed lines into a recorder. Frames are only used as keys and to look up the
+    values deciding about aliases. The line events of all threads are serialized by a lock, so that the effects of a
+    line are recorded together and the pending writes of the frames of different threads do not interfere."""
+
+    def __init__(self, recorder, effects: Dict[int, LineEffects], alias_primitive_values: bool):
+        self.recorder = recorder
+        self.effects = effects
+        self.alias_primitive_values = alias_primitive_values
+        self.pending_writes: Dict[object, List[Effect]] = {}
+        self.last_lines: Dict[object, int] = {}
+        self.lock = threading.RLock()
+
+    def on_line(self, frame, line: int):
+        with self.lock:
+            self.record_line(frame, line)
+
+    def record_line(self, frame, line: int):
+        self.flush(frame)
+        last_line = self.last_lines.get(frame)
+        self.last_lines[frame] = line
+        effects = self.effects.get(line)
+        if effects is None:
+            return
+        # the line event of a for loop also fires for each further iteration, coming from the end of its body
+        if effects.loop_end_line is not None and last_line is not None and line < last_line <= effects.loop_end_line:
+            return
+        for kind, variable, effect_line in effects.before:
+            self.record(kind, variable, effect_line)
+        if effects.after:
+            self.pending_writes[frame] = [effect for effect in effects.after
+                                          if effect[0] != "alias" or self.is_alias(frame, effect[3])]
+
+    def on_return(self, frame):
+        with self.lock:
+            self.flush(frame)
+            self.last_lines.pop(frame, None)
+
+    def flush(self, frame=None):
+        with self.lock:
+            frames = [frame] if frame is not None else list(self.pending_writes)
+            for current in frames:
+                for effect in self.pending_writes.pop(current, ()):
+                    if effect[0] == "alias":
+                        self.recorder.record_alias(effect[1], effect[3], effect[2])
+                    else:
+                        self.record(*effect)
+
+    def record(self, kind: str, variable: str, line: int):
+        if kind == "use":
+            self.recorder.record_usage(variable, line)
+        elif kind == "modify":
+            self.recorder.record_modification(variable, line)
+        else:
+            self.recorder.record_assignment(variable, line)
+
+    def is_alias(self, frame, name: str) -> bool:
+        if self.alias_primitive_values:
+            return True
+        if name in frame.f_locals:
+            value = frame.f_locals[name]
+        elif name in frame.f_globals:
+            value = frame.f_globals[name]
+        else:
+            return False
+        return not is_of_primitive_type(value)
+
+
+def collect_code_objects(code) -> List:
+    result = [code]
+    for constant in code.co_consts:
+        if hasattr(constant, "co_code"):
+            result.extend(collect_code_objects(constant))
+    return result
+
+
+def run_with_monitoring(program_file: Path, recorder, effects: Dict[int, LineEffects],
+                        alias_primitive_values: bool):
+    """Execute the (uninstrumented) program as __main__ and record its events into the recorder."""
+    with open(program_file, "r") as file:
+        code = compile(file.read(), str(program_file), "exec")
+    line_recorder = LineEventRecorder(recorder, effects, alias_primitive_values)
+    module_globals = {"__name__": "__main__", "__file__": str(program_file), "__builtins__": __builtins__}
+    code_objects = set(collect_code_objects(code))
+
+    if hasattr(sys, "monitoring"):
+        run_with_sys_monitoring(code, code_objects, module_globals, line_recorder)
+    else:
+        run_with_settrace(code, code_objects, module_globals, line_recorder)
+    line_recorder.flush()
+
+
+def run_with_sys_monitoring(code, code_objects: set, module_globals: dict, line_recorder: LineEventRecorder):
+    monitoring = sys.monitoring
+    tool = next(tool for tool in range(monitoring.DEBUGGER_ID + 1, 6) if monitoring.get_tool(tool) is None)
+    events = monitoring.events
+
+    def on_line(code_object, line: int):
+        line_recorder.on_line(sys._getframe(1), line)
+
+    def on_return(code_object, instruction_offset: int, value):
+        line_recorder.on_return(sys._getframe(1))
+
+    monitoring.use_tool_id(tool, MONITORING_TOOL_NAME)
+    try:
+        monitoring.register_callback(tool, events.LINE, on_line)
+        monitoring.register_callback(tool, events.PY_RETURN, on_return)
+        monitoring.register_callback(tool, events.PY_UNWIND, on_return)
+        monitoring.register_callback(tool, events.PY_YIELD, on_return)
+        for code_object in code_objects:
+            monitoring.set_local_events(tool, code_object, events.LINE | events.PY_RETURN | events.PY_YIELD)
+        # unwinding can only be monitored globally, it is filtered by the frames with pending writes
+        monitoring.set_events(tool, events.PY_UNWIND)
+        exec(code, module_globals)
+    finally:
+        monitoring.set_events(tool, events.NO_EVENTS)
+        for code_object in code_objects:
+            monitoring.set_local_events(tool, code_object, events.NO_EVENTS)
+        monitoring.free_tool_id(tool)
+
+
+def run_with_settrace(code, code_objects: set, module_globals: dict, line_recorder: LineEventRecorder):
+
+    def trace_local(frame, event: str, argument):
+        if event == "line":
+            line_recorder.on_line(frame, frame.f_lineno)
+        elif event == "return":
+            line_recorder.on_return(frame)
+        return trace_local
+
+    def trace_global(frame, event: str, argument):
+        # only frames of the program are traced, all other frames run without a local trace function
+        if frame.f_code in code_objects:
+            return trace_local(frame, event, argument)
+        return None
+
+    # threads started by the program are traced as well, sys.settrace only affects the current thread
+    previous_trace = sys.gettrace()
+    previous_thread_trace = threading.gettrace()
+    threading.settrace(trace_global)
+    sys.settrace(trace_global)
+    try:
+        exec(code, module_globals)
+    finally:
+        sys.settrace(previous_trace)
+        threading.settrace(previous_thread_trace)
+
+
+def slice_with_monitoring(program: str, analysis_path: str):
+    """Record the program with the monitoring backend and write its sliced.py like the DynaPyt hooks would."""
+    # the server module provides the helpers to create analyses for uninstrumented programs
+    from dynamicslicing.slicing_server import create_analysis
+
+    program_file = Path(program).resolve()
+    analysis = create_analysis(analysis_path, program_file)
+    effects = find_line_effects(analysis.ast)
+    analysis.begin_execution()
+    run_with_monitoring(program_file, analysis.recorder, effects, analysis.alias_primitive_values)
+    analysis.end_execution()
+
+
+def main(arguments: List[str] = None):
+    parser = argparse.ArgumentParser(description="Slice a program recorded with interpreter line events.")
+    parser.add_argument("program", help="Path of the program to slice")
+    parser.add_argument("--analysis", default="dynamicslicing.slice.Slice", help="Class path of the analysis")
+    args = parser.parse_args(arguments)
+    slice_with_monitoring(args.program, args.analysis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""This file implements a lightweight profiler for the slicing analyses. It counts and times the calls of each hook
+type, times the phases of computing and saving a slice, optionally accounts the memory of each phase and collects event
+and edge counts as well as the static analysis results taken from the caches. The collected data can be saved as JSON
+report."""
+
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from json import dumps
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Tuple
+
+from .analysis_cache import cache_hits
+from .dataflow_recorder import DataflowRecorderSimple
+
+# the modules allocating the recorded events and the state of the recorders, including the online recorder (and the
+# instance counter it uses) and the identity alias table
+RECORDER_MODULES = ("dataflow_recorder.py", "dataflow_recorder_online.py", "dependency_graph_instances.py",
+                    "identity_aliases.py")
+
+
+class AnalysisProfiler:
+    """Collects the profiling data of an analysis run. Timing and memory accounting can be enabled independently.
+    Memory accounting is based on tracemalloc and reports for each phase the peak and the retained (still allocated
+    at the end of the phase) bytes, relative to the allocated bytes at the start of the phase. Phases must not be
+    nested when memory accounting is enabled, as each phase resets the tracemalloc peak."""
+
+    def __init__(self, enabled: bool, track_memory: bool = False):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.active = enabled or track_memory
+        self.hook_counts: Dict[str, int] = {}
+        self.hook_times: Dict[str, float] = {}
+        self.phase_times: Dict[str, float] = {}
+        self.phase_memory: Dict[str, Dict[str, int]] = {}
+        self.counts: Dict[str, int] = {}
+        self.running_phases: Dict[str, Tuple[float, int]] = {}
+        self.started_tracemalloc = False
+        self.cache_hits_at_start = dict(cache_hits)
+
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+
+    def record_hook(self, hook: str, duration: float):
+        self.hook_counts[hook] = self.hook_counts.get(hook, 0) + 1
+        self.hook_times[hook] = self.hook_times.get(hook, 0.0) + duration
+
+    def record_phase(self, phase: str, duration: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + duration
+
+    def record_phase_memory(self, phase: str, peak: int, retained: int):
+        memory = self.phase_memory.setdefault(phase, {"peak": 0, "retained": 0})
+        memory["peak"] = max(memory["peak"], peak)
+        memory["retained"] += retained
+
+    def start_phase(self, phase: str):
+        if not self.active:
+            return
+        allocated = 0
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            allocated, _ = tracemalloc.get_traced_memory()
+        self.running_phases[phase] = (perf_counter(), allocated)
+
+    def stop_phase(self, phase: str):
+        if phase not in self.running_phases:
+            return
+        start, allocated_at_start = self.running_phases.pop(phase)
+        if self.enabled:
+            self.record_phase(phase, perf_counter() - start)
+        if self.track_memory:
+            allocated, peak = tracemalloc.get_traced_memory()
+            self.record_phase_memory(phase, peak - allocated_at_start, allocated - allocated_at_start)
+
+    @contextmanager
+    def measure_phase(self, phase: str):
+        if not self.active:
+            yield
+            return
+        self.start_phase(phase)
+        try:
+            yield
+        finally:
+            self.stop_phase(phase)
+
+    def set_count(self, name: str, value: int):
+        if self.active:
+            self.counts[name] = value
+
+    def count_events(self, recorder: DataflowRecorderSimple):
+        if not self.active:
+            return
+        self.set_count("events", len(recorder.event_stack))
+        for event in recorder.event_stack:
+            name = "events_" + event.__class__.__name__
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def account_recorder_memory(self):
+        """Account the bytes still allocated by the recorder modules, i.e. the memory of the recorded events."""
+        if not self.track_memory:
+            return
+        filters = [tracemalloc.Filter(True, "*" + module) for module in RECORDER_MODULES]
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        self.phase_memory["recorder"] = {"retained": sum(stat.size for stat in snapshot.statistics("filename"))}
+
+    def get_cache_hits(self) -> Dict[str, int]:
+        """Return the static analysis results taken from the caches since the profiler was created."""
+        hits = {part: count - self.cache_hits_at_start.get(part, 0) for part, count in cache_hits.items()}
+        return {part: count for part, count in hits.items() if count}
+
+    def finish(self):
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def to_dict(self) -> dict:
+        result = {
+            "hooks": {
+                hook: {"count": self.hook_counts[hook], "time": self.hook_times[hook]} for hook in self.hook_counts
+            },
+            "phases": self.phase_times,
+            "counts": self.counts,
+            "cache_hits": self.get_cache_hits(),
+        }
+
+        if self.track_memory:
+            result["memory"] = self.phase_memory
+            events = self.counts.get("events", 0)
+            if events and "recorder" in self.phase_memory:
+                result["bytes_per_event"] = self.phase_memory["recorder"]["retained"] / events
+
+        return result
+
+
+def profile_hook(hook: Callable) -> Callable:
+    """Decorator for the hooks of an analysis with a `profiler` attribute, counting and timing each call of the hook
+    if profiling is enabled."""
+    hook_name = hook.__name__
+
+    @functools.wraps(hook)
+    def wrapper(self, *args, **kwargs):
+        profiler: AnalysisProfiler = self.profiler
+        if not profiler.enabled:
+            return hook(self, *args, **kwargs)
+        start = perf_counter()
+        try:
+            return hook(self, *args, **kwargs)
+        finally:
+            profiler.record_hook(hook_name, perf_counter() - start)
+
+    return wrapper
+
+
+def save_profiling_report(profiler: AnalysisProfiler, path: Path):
+    json_string = dumps(profiler.to_dict(), indent=4)
+    with open(path, 'w') as file:
+        file.write(json_string)
@@ -0,0 +1,66 @@
+"""This file implements the tracking of the dynamic extent of the function to slice, used to drop the events that
+occur outside of it before they reach the recorder. Outside of the dynamic extent, only module level code is executed,
+which defines the (structurally included) classes and functions, the globals the function may read, and calls the
+function to slice. Thus, module level code is recorded until the function is entered for the first time. The events of
+module level code after the function returned are deferred, and only recorded if the function is entered again, as
+they may define globals it reads then."""
+
+from typing import Callable, List, Type
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, Event
+
+
+class DynamicExtentFilter:
+    """
+    Tracks the calls in progress to determine whether execution currently is inside the dynamic extent of the function
+    to slice. If callees are not included, only the code of the function itself is part of the extent.
+    The calls are observed at the call sites (pre and post call hooks), as DynaPyt does not instrument return
+    statements. Calls left by an exception do not trigger the post call hook, so the tracking is only exact for
+    programs that do not propagate exceptions out of functions.
+    """
+
+    def __init__(self, enabled: bool, function_name: str, include_callees: bool,
+                 buffer_type: Type[DataflowRecorderSimple] = DataflowRecorderSimple):
+        self.enabled = enabled
+        self.function_name = function_name
+        self.include_callees = include_callees
+        # for each call in progress since the (outermost) call of the function to slice: whether it calls that function
+        self.calls: List[bool] = []
+        self.in_extent = not enabled
+        self.entered = False
+        # whether events are recorded at all, and whether they are deferred until the function is entered again
+        self.recording = True
+        self.deferring = False
+        # the events are deferred with a recorder of the given type, e.g. to qualify the variables of asyncio tasks
+        self.buffer_type = buffer_type
+        self.deferred_events = buffer_type()
+
+    def on_call_start(self, function: Callable) -> List[Event]:
+        """Returns the deferred events if the function to slice is entered again, they have to be recorded after all."""
+        if not self.enabled:
+            return []
+        is_function_to_slice = getattr(function, "__name__", None) == self.function_name
+        if self.calls or is_function_to_slice:
+            self.calls.append(is_function_to_slice)
+            self.update()
+        if self.deferring or not self.deferred_events.event_stack:
+            return []
+        events = self.deferred_events.event_stack
+        self.deferred_events = self.buffer_type()
+        return events
+
+    def on_call_end(self):
+        if not self.enabled or not self.calls:
+            return
+        self.calls.pop()
+        self.update()
+
+    def update(self):
+        if self.include_callees:
+            self.in_extent = len(self.calls) > 0
+        else:
+            self.in_extent = len(self.calls) > 0 and self.calls[-1]
+        self.entered = self.entered or len(self.calls) > 0
+        # outside of any call of the function to slice, only module level code is executed
+        self.recording = self.in_extent or not self.calls
+        self.deferring = self.entered and not self.calls
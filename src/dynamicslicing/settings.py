@@ -7,3 +7,119 @@ PLOT_HEIGHT = 8
 
 # Whether to save the recorder data
 SAVE_RECORDER_DATA = True
+
+# Whether to collect hook counters, phase timings and event/edge counts, saved as profiling_report.json next to the
+# sliced program
+ENABLE_PROFILING = False
+
+# Whether to save a hot spot report of the recorded events (by line, kind and variable) and of the dataflow edges per
+# definition as trace_report.json next to the sliced program
+ENABLE_TRACE_REPORT = False
+
+# Whether to account the memory (peak and retained bytes, via tracemalloc) of each analysis phase, added to
+# profiling_report.json. Slows down the analysis considerably.
+ENABLE_MEMORY_ACCOUNTING = False
+
+# Whether to stop recording once the slicing criterion can no longer be executed, i.e. after slice_me returned (if it is
+# called only once). If EARLY_TERMINATION_OCCURRENCES is set to a number k, recording also stops after the k-th
+# execution of the slicing criterion, so that the slice only covers its first k executions.
+EARLY_TERMINATION = False
+EARLY_TERMINATION_OCCURRENCES = None
+
+# Whether to only record events inside the dynamic extent of slice_me and the module level code that may define the
+# globals it reads: module level code is recorded until slice_me is called, afterwards its events are only kept if
+# slice_me is called again. If SCOPE_FILTER_INCLUDE_CALLEES is disabled, the events of functions called by slice_me are
+# dropped as well, which only keeps the slice unchanged if these functions do not access variables of slice_me.
+SCOPE_FILTER = False
+SCOPE_FILTER_INCLUDE_CALLEES = True
+
+# Whether to compute the dataflow dependencies by traversing the recorded trace backwards from the last execution of the
+# slicing criterion (demand-driven), instead of building the dataflow graph of the whole trace. The traversal stops as
+# soon as no further definition can be relevant, which pays off if the criterion only depends on a small tail of a long
+# run. Plots and the trace report are not available in this mode, as no dataflow graph is built.
+DEMAND_DRIVEN_SLICING = False
+
+# Whether to slice on statement instance level, based on a compacted dynamic dependence graph whose edges are labeled
+# with compressed sequences of execution instance pairs. If INSTANCE_SLICING_OCCURRENCE is set to a number k, the slice
+# is computed for the k-th execution of the slicing criterion only, otherwise for all of its executions.
+INSTANCE_SLICING = False
+INSTANCE_SLICING_OCCURRENCE = None
+
+# Whether to compute the slice online, i.e. during execution, without storing any events. For each variable, the set of
+# lines its current value depends on is kept as bitset, so memory is bounded by the number of variables times the number
+# of lines. Plots, the trace report and the recorder data are not available in this mode.
+ONLINE_SLICING = False
+
+# Whether to record the events of each thread into its own buffer, tagged with a global sequence number and merged in
+# order when the slice is computed. Required for programs that execute instrumented code in multiple threads. Not used
+# by DEMAND_DRIVEN_SLICING and ONLINE_SLICING, which require a single thread.
+THREAD_SAFE_RECORDING = False
+
+# Whether to record the events of each asyncio task (and thread) into its own buffer, stitched together in execution
+# order. The local variables of the coroutines a task runs (including the coroutines it awaits) are qualified with the
+# task, so that the dataflow does not mix up the local variables of concurrently running coroutines.
+ASYNC_RECORDING = False
+
+# Whether to record the events of forked child processes (e.g. multiprocessing or ProcessPoolExecutor workers with the
+# fork start method) into trace shards, saved to a trace_shards folder next to the sliced program when the children
+# exit. The shards are merged into the dataflow graph at the end of execution. Children started with the spawn or
+# forkserver start methods are not covered.
+TRACE_SHARDS = False
+
+# Whether to detect aliases by object identity instead of syntactically. An assignment is an alias of the variable that
+# first held the assigned object, also if the object was passed through a call or taken out of a container. Objects are
+# mapped to the variables holding them (qualified by frame), not to their defining line, as aliases are recorded by
+# variable name. Objects that do not support weak references (e.g. lists) are kept alive while a variable holds them.
+IDENTITY_ALIASES = False
+
+# Whether to cache slice results in the dynamicslicing_slice_cache folder of the system temp directory, keyed by the
+# source, the slicing criterion, the analysis, the settings that change the slice and a hash of the recorded trace. On a
+# hit, the graph construction and remove_lines are skipped. If an input fingerprint is set (e.g. a hash of the program
+# inputs), it is used instead of the trace hash, which then needs not be computed. The least recently used entries are
+# removed once the cache holds more than the maximum number of entries.
+SLICE_RESULT_CACHE = False
+SLICE_RESULT_CACHE_INPUT_FINGERPRINT = None
+SLICE_RESULT_CACHE_MAX_ENTRIES = 1000
+
+# Whether to record which functions are entered during execution. The slicing server uses this to re-slice an edited
+# program from the trace of its previous run, if the edit does not change the execution (e.g. comments, formatting or
+# bodies of functions that were not entered), instead of instrumenting and running it again.
+INCREMENTAL_SLICING = False
+
+# Whether to build the dataflow graph with NumPy, resolving the definitions of alias free stretches of the trace in bulk
+# instead of event by event. Produces the same graph. NumPy is optional, without it this setting has no effect.
+VECTORIZED_DATAFLOW = False
+
+# Whether to build the dataflow graph in a process pool. The trace is partitioned by the connected components of the
+# alias relation, as the definitions of unrelated variables are independent, and each worker resolves the def-use edges
+# of its partitions. Starting the workers only pays off for large traces, smaller ones are processed in this process.
+# The number of workers defaults to the number of cores. Not combined with TRACE_SHARDS.
+PARALLEL_DATAFLOW = False
+PARALLEL_DATAFLOW_WORKERS = None
+PARALLEL_DATAFLOW_MIN_EVENTS = 100000
+
+# Whether to restrict the recording by a conservative static backward slice from the slicing criterion. Events of
+# variables whose root name (e.g. p for p.age) can not reach the slicing criterion are dropped, and the hooks skip the
+# lines that do not mention any relevant name. The slice stays the same. Not combined with IDENTITY_ALIASES, as aliases
+# detected by object identity are not visible in the source.
+STATIC_PRE_SLICE = False
+
+# Whether to suspend the recording of loop iterations that can not add new dependencies. The hook calls between two
+# loop events (the start of an iteration or the end of a loop) form a segment. Once the recorded segments end with a
+# period of up to LOOP_FIXED_POINT_MAX_PERIOD segments repeated LOOP_FIXED_POINT_ITERATIONS times (at least 2), the
+# latest definitions are the same before and after each further repetition, so its events are dropped. Segments that
+# turn out to differ are recorded after all, the slice stays the same. Not combined with INSTANCE_SLICING,
+# IDENTITY_ALIASES, THREAD_SAFE_RECORDING or ASYNC_RECORDING.
+LOOP_FIXED_POINT = False
+LOOP_FIXED_POINT_ITERATIONS = 2
+LOOP_FIXED_POINT_MAX_PERIOD = 16
+
+# Additional slices of the full analysis (Slice), computed from the same execution and dependency graph. Maps a name to
+# the graph layers ("definitions", "dataflow", "control_flow") the slice follows, each slice is saved as
+# sliced_<name>.py next to the program, e.g. {"dataflow": ["definitions", "dataflow"]} for the slice without control
+# flow dependencies. The heads of the loops and conditions enclosing a line of the slice are kept, so that the line can
+# be shown, but without the control flow layer, their dependencies are not. Unlike SliceDataflow, assignments of
+# primitive values do not create aliases (as recorded by Slice).
+# Only used with the dependency graph, i.e. not with ONLINE_SLICING, DEMAND_DRIVEN_SLICING or INSTANCE_SLICING, and
+# results are not taken from the SLICE_RESULT_CACHE.
+LAYERED_SLICES = {}
@@ -0,0 +1,95 @@
+"""This file implements a persistent cache for slice results. A slice only depends on the source, the slicing criterion,
+the analysis and its settings, and the recorded trace (which in turn only depends on the inputs of the program). The
+cache stores the lines of the slice and the content of sliced.py under a hash of these, so that slicing the same program
+with the same inputs again skips the graph construction and remove_lines. The cache is bounded, the least recently used
+entries are removed first."""
+
+import hashlib
+import os
+import tempfile
+from json import dumps, loads
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+from dynamicslicing import settings
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, EventAlias
+
+DEFAULT_CACHE_FOLDER = Path(tempfile.gettempdir()).joinpath("dynamicslicing_slice_cache")
+
+# the settings that change how the trace is recorded or sliced. Settings that only control outputs (plots, reports,
+# profiling, the saved recorder) or select an engine computing the same slice (vectorized or parallel graph
+# construction, static pre-slice) are not part of the key
+SLICE_SETTINGS = (
+    "EARLY_TERMINATION", "EARLY_TERMINATION_OCCURRENCES", "SCOPE_FILTER", "SCOPE_FILTER_INCLUDE_CALLEES",
+    "DEMAND_DRIVEN_SLICING", "INSTANCE_SLICING", "INSTANCE_SLICING_OCCURRENCE", "ONLINE_SLICING",
+    "THREAD_SAFE_RECORDING", "ASYNC_RECORDING", "TRACE_SHARDS", "IDENTITY_ALIASES", "LOOP_FIXED_POINT",
+    "LOOP_FIXED_POINT_ITERATIONS", "LOOP_FIXED_POINT_MAX_PERIOD",
+)
+
+
+def get_trace_fingerprint(recorders: Iterable[DataflowRecorderSimple]) -> str:
+    """Hash the events of the given recorders. The aliases resolved by the indexed recorder are left out, as they are
+    derived from the events."""
+    digest = hashlib.sha256()
+    for recorder in recorders:
+        digest.update(b"recorder\n")
+        for event in recorder.event_stack:
+            if isinstance(event, EventAlias):
+                entry = f"{type(event).__name__} {event.line} {event.alias} {event.variable_behind_alias}\n"
+            else:
+                entry = f"{type(event).__name__} {event.line} {event.variable}\n"
+            digest.update(entry.encode())
+    return digest.hexdigest()
+
+
+def get_slice_cache_key(source: str, slicing_criterion_line: int, analysis_name: str, fingerprint: str) -> str:
+    """Hash the inputs of a slice, including the settings that change how the trace is recorded or sliced."""
+    content = dumps({
+        "source": hashlib.sha256(source.encode()).hexdigest(),
+        "criterion": slicing_criterion_line,
+        "analysis": analysis_name,
+        "fingerprint": fingerprint,
+        "settings": {name: repr(getattr(settings, name)) for name in SLICE_SETTINGS},
+    }, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class SliceResultCache:
+
+    def __init__(self, folder: Optional[Path] = None, max_entries: Optional[int] = None):
+        self.folder = folder or DEFAULT_CACHE_FOLDER
+        self.max_entries = settings.SLICE_RESULT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+    def load(self, key: str) -> Optional[Tuple[Set[int], str]]:
+        """Return the lines of the slice and the content of sliced.py stored for the key, if any."""
+        path = self.folder.joinpath(key + ".json")
+        try:
+            with open(path, 'r') as file:
+                data = loads(file.read())
+            # the modification time orders the entries by their last use
+            os.utime(path)
+        except FileNotFoundError:
+            # another run may have evicted the entry
+            return None
+        return set(data["lines"]), data["sliced"]
+
+    def store(self, key: str, lines: Set[int], sliced: str):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first, so that concurrent runs never read a partial entry
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(dumps({"lines": sorted(lines), "sliced": sliced}))
+        os.replace(temporary_path, self.folder.joinpath(key + ".json"))
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries beyond the maximum number of entries."""
+        entries = []
+        for path in self.folder.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            path.unlink(missing_ok=True)
@@ -2,90 +2,203 @@
 """
 
 from pathlib import Path
-from typing import Any, List, Callable, Sequence, Dict, Set, Tuple, Optional
+from typing import Any, List, Callable, Sequence, Dict, Set, Tuple, Optional, Iterable
 
 import libcst as cst
+from rdflib import Graph
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
-from dynapyt.instrument.IIDs import IIDs
+from dynapyt.instrument.IIDs import IIDs, Location
 from dynapyt.utils.nodeLocator import get_node_by_location
 
-from .dataflow_recorder import DataflowRecorderSimple, save_recorder_to_file
+from .analysis_cache import get_static_analysis, get_instrumented_ast, get_iids
+from .dataflow_recorder import (DataflowRecorderSimple, DataflowRecorderIndexed, DataflowRecorderThreaded,
+                                DataflowRecorderAsync, save_recorder_to_file, replay_events)
+from .dataflow_recorder_online import DataflowRecorderOnline
 from .dependency_graph_query import get_dependency_nodes
+from .dependency_trace_backward import DependencyTraceBackward, get_static_dependencies
 from .dependency_graph_utils import statement_to_node, node_to_statement
-from .finders import find_slicing_criterion_line, find_definitions, find_slice_me_call
-from .settings import GENERATE_PLOTS, SAVE_RECORDER_DATA
-from .utils import remove_lines
+from .early_termination import create_criterion_tracker
+from .scope_filter import DynamicExtentFilter
+from .slice_cache import SliceResultCache, get_slice_cache_key, get_trace_fingerprint
+from .trace_shards import TraceShardManager
+from .identity_aliases import IdentityAliasTable
+from .loop_fixed_point import LoopFixedPointTracker, HookCall
+from .profiling import AnalysisProfiler, profile_hook, save_profiling_report
+from .settings import (GENERATE_PLOTS, SAVE_RECORDER_DATA, ENABLE_PROFILING, ENABLE_TRACE_REPORT,
+                       ENABLE_MEMORY_ACCOUNTING, EARLY_TERMINATION, EARLY_TERMINATION_OCCURRENCES,
+                       SCOPE_FILTER, SCOPE_FILTER_INCLUDE_CALLEES, DEMAND_DRIVEN_SLICING,
+                       INSTANCE_SLICING, INSTANCE_SLICING_OCCURRENCE, ONLINE_SLICING,
+                       THREAD_SAFE_RECORDING, ASYNC_RECORDING, TRACE_SHARDS, IDENTITY_ALIASES,
+                       SLICE_RESULT_CACHE, SLICE_RESULT_CACHE_INPUT_FINGERPRINT, INCREMENTAL_SLICING,
+                       VECTORIZED_DATAFLOW, PARALLEL_DATAFLOW, PARALLEL_DATAFLOW_WORKERS,
+                       PARALLEL_DATAFLOW_MIN_EVENTS, STATIC_PRE_SLICE, LOOP_FIXED_POINT,
+                       LOOP_FIXED_POINT_ITERATIONS, LOOP_FIXED_POINT_MAX_PERIOD)
+from .utils import remove_lines, is_of_primitive_type
 from .variable_extractor import (extract_variables_from_expression, extract_variables_from_args,
                                  get_contained_variables)
-from .dependency_graph_definitions import create_graph_from_definitions
 from .graph_visualizer import save_rdf_graph
 from .dependency_graph_dataflow import create_graph_from_dataflow
+from .dependency_graph_vectorized import create_graph_from_dataflow_vectorized
+from .dependency_graph_parallel import create_graph_from_dataflow_parallel
+from .dependency_graph_instances import create_instance_graph
+from .trace_statistics import TraceHotSpotAnalyzer, save_trace_report
 
 
 class SliceDataflow(BaseAnalysis):
+    # whether assigning a variable holding a primitive value (e.g. an int) to another one records an alias
+    alias_primitive_values = True
+
     def __init__(self, source_path):
         super().__init__()
+        self.profiler = AnalysisProfiler(ENABLE_PROFILING, ENABLE_MEMORY_ACCOUNTING)
+        self.profiler.start_phase("static_analysis")
 
         with open(source_path, "r") as file:
             self.source = file.read()
         iid_object = IIDs(source_path)
         self.source_path = source_path
-        self.ast = cst.parse_module(self.source)
-        self.definitions = find_definitions(self.ast)
-        self.slicing_criterion = find_slicing_criterion_line(self.ast)
-        self.slice_me_call = find_slice_me_call(self.ast)
-        self.recorder = DataflowRecorderSimple()
+        self.static_analysis = get_static_analysis(self.source)
+        self.ast = self.static_analysis.ast
+        self.definitions = self.static_analysis.definitions
+        self.slicing_criterion = self.static_analysis.slicing_criterion
+        self.slice_me_call = self.static_analysis.slice_me_call
+        self.slice_me_calls = self.static_analysis.slice_me_calls
+        self.criterion_tracker = create_criterion_tracker(EARLY_TERMINATION, self.ast, self.definitions["slice_me"],
+                                                          self.slice_me_call, self.slicing_criterion,
+                                                          EARLY_TERMINATION_OCCURRENCES)
+        self.extent_filter = DynamicExtentFilter(SCOPE_FILTER, "slice_me", SCOPE_FILTER_INCLUDE_CALLEES,
+                                                 DataflowRecorderAsync if ASYNC_RECORDING else DataflowRecorderSimple)
+        self.recorder = self.create_recorder()
+        self.save_recorder_data = SAVE_RECORDER_DATA
+        self.shard_manager = TraceShardManager(TRACE_SHARDS, self, Path(source_path).parent.joinpath("trace_shards"))
+        self.identity_aliases = IdentityAliasTable()
+        # first lines of the functions entered during execution, to tell which edits leave the execution unchanged
+        self.entered_functions: Set[int] = set()
+        # the static backward slice restricting which events are recorded
+        self.pre_slice = self.static_analysis.get_static_pre_slice() if STATIC_PRE_SLICE and not IDENTITY_ALIASES \
+            else None
+        # dropping repeated loop iterations changes the instance numbers and requires a single order of hook calls
+        self.loop_tracker = LoopFixedPointTracker(LOOP_FIXED_POINT and not (INSTANCE_SLICING or IDENTITY_ALIASES
+                                                                            or THREAD_SAFE_RECORDING
+                                                                            or ASYNC_RECORDING),
+                                                  LOOP_FIXED_POINT_ITERATIONS, LOOP_FIXED_POINT_MAX_PERIOD)
+        self.profiler.stop_phase("static_analysis")
+
+    def create_recorder(self):
+        if ONLINE_SLICING:
+            static_dependencies = get_static_dependencies(self.static_analysis.get_graph_definitions())
+            return DataflowRecorderOnline(self.slicing_criterion, self.definitions, static_dependencies, {})
+        if DEMAND_DRIVEN_SLICING:
+            return DataflowRecorderIndexed()
+        if ASYNC_RECORDING:
+            return DataflowRecorderAsync()
+        if THREAD_SAFE_RECORDING:
+            return DataflowRecorderThreaded()
+        return DataflowRecorderSimple()
+
+    def load_trace(self, recorder: DataflowRecorderSimple):
+        """Slice the events of a saved trace instead of executing the program. They are recorded again with the recorder
+        of the current settings, which builds its indexes or, for online slicing, the slice of the current slicing
+        criterion. The trace is not saved again."""
+        self.recorder = self.create_recorder()
+        replay_events(recorder.event_stack, self.recorder)
+        self.save_recorder_data = False
+
+    def _get_ast(self, filepath: str) -> Optional[Tuple[cst.Module, IIDs]]:
+        return get_instrumented_ast(filepath)
+
+    def iid_to_location(self, filepath: str, iid: int) -> Location:
+        return get_iids(filepath).iid_to_location[iid]
+
+    def is_relevant_variable(self, variable: str) -> bool:
+        return self.pre_slice is None or self.pre_slice.is_relevant_variable(variable)
+
+    def is_relevant_line(self, line: int) -> bool:
+        return self.pre_slice is None or self.pre_slice.is_relevant_line(line)
+
+    def get_pre_slice_criterion(self) -> Optional[int]:
+        """Return the slicing criterion the recorded events are restricted to if the static pre-slice skips events."""
+        return self.slicing_criterion if self.pre_slice is not None else None
+
+    def get_event_recorder(self) -> DataflowRecorderSimple:
+        # after slice_me returned, the events of module level code only matter if it is called again
+        return self.extent_filter.deferred_events if self.extent_filter.deferring else self.recorder
 
     def record_alias(self, alias: str, variable_behind_alias: str, line: int):
-        self.recorder.record_alias(alias, variable_behind_alias, line)
+        if self.is_relevant_variable(alias):
+            self.get_event_recorder().record_alias(alias, variable_behind_alias, line)
 
     def record_modification(self, variable: str, line: int):
-        self.recorder.record_modification(variable, line)
+        if self.is_relevant_variable(variable):
+            self.get_event_recorder().record_modification(variable, line)
 
     def record_modifications(self, variables: Sequence[str], line: int):
         for variable in variables:
             self.record_modification(variable, line)
 
     def record_assignment(self, variable: str, line: int, ):
-        self.recorder.record_assignment(variable, line)
+        if self.is_relevant_variable(variable):
+            self.get_event_recorder().record_assignment(variable, line)
 
     def record_assignments(self, variables: Sequence[str], line: int):
         for variable in variables:
             self.record_assignment(variable, line)
 
     def record_usage(self, variable: str, line: int):
-        self.recorder.record_usage(variable, line)
+        if self.is_relevant_variable(variable):
+            self.get_event_recorder().record_usage(variable, line)
 
     def record_usages(self, variables: Sequence[str], line: int):
         for variable in variables:
             self.record_usage(variable, line)
 
+    @profile_hook
     def write(
             self, dyn_ast: str, iid: int, old_vals: List[Callable], new_val: Any
     ) -> Any:
-        ast = self._get_ast(dyn_ast)
+        if not self.is_recording():
+            return
         location = self.iid_to_location(dyn_ast, iid)
+        if not self.criterion_tracker.observe_line(location.start_line):
+            return
+        # lines that do not mention a name relevant to the static pre-slice can not record relevant events
+        if not self.is_relevant_line(location.start_line):
+            return
+        # whether an alias is recorded depends on the value
+        if self.loop_tracker.enabled and self.loop_tracker.defer("write", dyn_ast, iid, new_val,
+                                                                 is_of_primitive_type(new_val)):
+            return
+        self.record_write(dyn_ast, iid, location, new_val)
+
+    def record_write(self, dyn_ast: str, iid: int, location: Location, new_val: Any):
+        ast = self._get_ast(dyn_ast)
         node = get_node_by_location(ast[0], location)
 
         if isinstance(node, cst.Assign):
             targets: Sequence[cst.AssignTarget] = node.targets
             value: cst.BaseExpression = node.value
             is_alias_for = None
-            if isinstance(value, cst.Name):
+            if IDENTITY_ALIASES:
+                is_alias_for = self.identity_aliases.find_owner(new_val)
+            elif isinstance(value, cst.Name) and (self.alias_primitive_values or not is_of_primitive_type(new_val)):
                 is_alias_for = value.value
 
             for target in targets:
-                self.record_assign_to_target(target.target, location, is_alias_for, False)
+                path = self.record_assign_to_target(target.target, location, is_alias_for, False)
+                if IDENTITY_ALIASES:
+                    self.identity_aliases.record_assignment(path, new_val)
 
         elif isinstance(node, cst.AugAssign):
             target_expression: cst.BaseAssignTargetExpression = node.target
-            self.record_assign_to_target(target_expression, location, None, True)
+            path = self.record_assign_to_target(target_expression, location, None, True)
+            if IDENTITY_ALIASES:
+                self.identity_aliases.record_assignment(path, new_val)
 
         else:
             raise RuntimeError("Unexpected behavior: found write event that is not of type cst.Assign: " + str(node))
 
     def record_assign_to_target(self, target: cst.BaseAssignTargetExpression, location, is_alias_for: Optional[str],
-                                is_aug_assign: bool):
+                                is_aug_assign: bool) -> str:
         if isinstance(target, cst.Subscript):
             subscript = target
             prefix = extract_variables_from_expression(subscript.value)[0]  # todo: support more?
@@ -97,8 +210,10 @@ class SliceDataflow(BaseAnalysis):
 
             self.record_modification(prefix, location.start_line)
 
-            if is_alias_for:
+            # an object may be assigned to the variable already holding it (e.g. x = identity(x))
+            if is_alias_for and is_alias_for != path:
                 self.record_alias(path, is_alias_for, location.start_line)
+            return path
 
         elif isinstance(target, cst.Attribute):
             attribute = target
@@ -112,8 +227,10 @@ class SliceDataflow(BaseAnalysis):
 
             self.record_modification(prefix, location.start_line)
 
-            if is_alias_for:
+            # an object may be assigned to the variable already holding it (e.g. x = identity(x))
+            if is_alias_for and is_alias_for != path:
                 self.record_alias(path, is_alias_for, location.start_line)
+            return path
 
         elif isinstance(target, cst.Name):
             name = target
@@ -122,25 +239,59 @@ class SliceDataflow(BaseAnalysis):
             else:
                 self.record_assignment(name.value, location.start_line)
 
-            if is_alias_for:
+            # an object may be assigned to the variable already holding it (e.g. x = identity(x))
+            if is_alias_for and is_alias_for != name.value:
                 self.record_alias(name.value, is_alias_for, location.start_line)
+            return name.value
 
         else:
             raise RuntimeError("Unknown assign target: " + str(target))
 
+    @profile_hook
     def read(self, dyn_ast: str, iid: int, val: Any) -> Any:
-        ast = self._get_ast(dyn_ast)
+        if not self.is_recording():
+            return
         location = self.iid_to_location(dyn_ast, iid)
+        if not self.criterion_tracker.observe_line(location.start_line):
+            return
+        if not self.is_relevant_line(location.start_line):
+            return
+        if self.loop_tracker.enabled and self.loop_tracker.defer("read", dyn_ast, iid, val):
+            return
+        self.record_read(dyn_ast, iid, location, val)
+
+    def record_read(self, dyn_ast: str, iid: int, location: Location, val: Any):
+        ast = self._get_ast(dyn_ast)
         node = get_node_by_location(ast[0], location)
         value_variables = extract_variables_from_expression(node)
         value_variables_extensive = get_contained_variables(value_variables)
         self.record_usages(value_variables_extensive, location.start_line)
+        if IDENTITY_ALIASES and isinstance(node, cst.Name):
+            self.identity_aliases.record_read(node.value, val)
 
+    @profile_hook
     def pre_call(
             self, dyn_ast: str, iid: int, function: Callable, pos_args: Tuple, kw_args: Dict
     ):
-        ast = self._get_ast(dyn_ast)
+        # the arguments are recorded as part of the calling code, i.e. before entering the callee
+        if self.is_recording():
+            self.record_call(dyn_ast, iid)
+        if self.criterion_tracker.is_unresolved_call(function):
+            self.criterion_tracker.on_call_start(function, self.iid_to_location(dyn_ast, iid).start_line)
+        replay_events(self.extent_filter.on_call_start(function), self.recorder)
+
+    def record_call(self, dyn_ast: str, iid: int):
         location = self.iid_to_location(dyn_ast, iid)
+        if not self.criterion_tracker.observe_line(location.start_line):
+            return
+        if not self.is_relevant_line(location.start_line):
+            return
+        if self.loop_tracker.enabled and self.loop_tracker.defer("call", dyn_ast, iid):
+            return
+        self.record_call_arguments(dyn_ast, iid, location)
+
+    def record_call_arguments(self, dyn_ast: str, iid: int, location: Location):
+        ast = self._get_ast(dyn_ast)
         node = get_node_by_location(ast[0], location)
         if isinstance(node, cst.Call):
             args = node.args
@@ -154,38 +305,219 @@ class SliceDataflow(BaseAnalysis):
                     self.record_usages(target_variables_extensive, location.start_line)
                     self.record_modification(func_value.value, location.start_line)
 
+    def function_enter(self, dyn_ast: str, iid: int, args: List[Any], name: str, is_lambda: bool) -> None:
+        if INCREMENTAL_SLICING and not is_lambda:
+            self.entered_functions.add(self.iid_to_location(dyn_ast, iid).start_line)
+
+    def enter_for(self, dyn_ast: str, iid: int, next_value: Any, iterable: Iterable) -> Optional[Any]:
+        self.on_loop_event(dyn_ast, iid, not isinstance(next_value, StopIteration))
+
+    def exit_for(self, dyn_ast: str, iid: int):
+        self.on_loop_event(dyn_ast, iid, False)
+
+    def enter_while(self, dyn_ast: str, iid: int, cond_value: bool) -> Optional[bool]:
+        self.on_loop_event(dyn_ast, iid, bool(cond_value))
+
+    def exit_while(self, dyn_ast: str, iid: int):
+        self.on_loop_event(dyn_ast, iid, False)
+
+    def on_loop_event(self, dyn_ast: str, iid: int, is_iteration: bool):
+        if self.loop_tracker.enabled and self.is_recording():
+            self.replay_hooks(self.loop_tracker.on_loop_event(dyn_ast, iid, is_iteration))
+
+    def replay_hooks(self, hook_calls: Sequence[HookCall]):
+        """Record the deferred hook calls of loop iterations that turned out to differ from the repeated ones."""
+        for hook, dyn_ast, iid, value in hook_calls:
+            location = self.iid_to_location(dyn_ast, iid)
+            if hook == "write":
+                self.record_write(dyn_ast, iid, location, value)
+            elif hook == "read":
+                self.record_read(dyn_ast, iid, location, value)
+            else:
+                self.record_call_arguments(dyn_ast, iid, location)
+
+    def post_call(
+            self, dyn_ast: str, iid: int, result: Any, call: Callable, pos_args: Tuple, kw_args: Dict
+    ) -> Any:
+        self.extent_filter.on_call_end()
+        self.criterion_tracker.on_call_end(call)
+
+    def is_recording(self) -> bool:
+        return self.criterion_tracker.recording and self.extent_filter.recording
+
     def begin_execution(self) -> None:
         """Hook for the start of execution."""
-        pass
+        self.profiler.start_phase("execution")
 
     def end_execution(self) -> None:
         """Hook for the end of execution."""
+        if self.loop_tracker.enabled:
+            self.replay_hooks(self.loop_tracker.finish())
+            self.profiler.set_count("loop_segments_dropped", self.loop_tracker.dropped_segments)
+        if self.shard_manager.is_child:
+            # a forked child process only contributes its events
+            self.shard_manager.save_shard()
+            return
+        self.shard_manager.stop()
+        self.profiler.stop_phase("execution")
+        self.profiler.account_recorder_memory()
+        cache_key = None
+        # the online recorder already computed the slice during execution, nothing to skip
+        if SLICE_RESULT_CACHE and not ONLINE_SLICING:
+            with self.profiler.measure_phase("slice_cache_lookup"):
+                cache_key = self.get_slice_cache_key()
+                cached_result = SliceResultCache().load(cache_key)
+            if cached_result is not None:
+                self.save_slice(*cached_result)
+                return
         result_slice = self.compute_slice()
-        self.save_slice(result_slice)
+        file_content = self.save_slice(result_slice)
+        if cache_key is not None:
+            SliceResultCache().store(cache_key, result_slice, file_content)
 
-    def compute_slice(self) -> Set[int]:
-        graph_definitions = create_graph_from_definitions(self.definitions)
-        graph_dataflow = create_graph_from_dataflow(self.recorder, self.slicing_criterion, self.definitions)
-        graph = graph_definitions + graph_dataflow
+    def get_slice_cache_key(self) -> str:
+        fingerprint = SLICE_RESULT_CACHE_INPUT_FINGERPRINT
+        if fingerprint is None:
+            recorders = [self.recorder] + [shard.recorder for shard in self.shard_manager.load_shards()]
+            fingerprint = get_trace_fingerprint(recorders)
+        return get_slice_cache_key(self.source, self.slicing_criterion, type(self).__name__, fingerprint)
 
-        target_node = statement_to_node(self.slicing_criterion)
-        dependency_nodes = get_dependency_nodes(graph, target_node)
+    def compute_slice(self) -> Set[int]:
+        if ONLINE_SLICING:
+            return self.compute_slice_online()
+        if DEMAND_DRIVEN_SLICING:
+            return self.compute_slice_demand_driven()
+        if INSTANCE_SLICING:
+            return self.compute_slice_instances()
+
+        with self.profiler.measure_phase("graph_definitions"):
+            graph_definitions = self.static_analysis.get_graph_definitions()
+        trace_analyzer = None
+        with self.profiler.measure_phase("graph_dataflow"):
+            if PARALLEL_DATAFLOW and not TRACE_SHARDS and \
+                    len(self.recorder.event_stack) >= PARALLEL_DATAFLOW_MIN_EVENTS:
+                # forked workers would save trace shards, so trace shards are not combined with parallel construction
+                graph_dataflow = create_graph_from_dataflow_parallel(self.recorder, self.slicing_criterion,
+                                                                     self.definitions, PARALLEL_DATAFLOW_WORKERS,
+                                                                     VECTORIZED_DATAFLOW)
+            elif VECTORIZED_DATAFLOW:
+                graph_dataflow = create_graph_from_dataflow_vectorized(self.recorder, self.slicing_criterion,
+                                                                       self.definitions,
+                                                                       self.shard_manager.load_shards())
+            elif ENABLE_TRACE_REPORT:
+                # builds the dataflow graph and the hot spot report in the same pass over the trace
+                trace_analyzer = TraceHotSpotAnalyzer(self.recorder, self.slicing_criterion, self.definitions,
+                                                      self.shard_manager.load_shards())
+                graph_dataflow = trace_analyzer.g
+            else:
+                graph_dataflow = create_graph_from_dataflow(self.recorder, self.slicing_criterion, self.definitions,
+                                                            self.shard_manager.load_shards())
+        with self.profiler.measure_phase("graph_merge"):
+            graph = graph_definitions + graph_dataflow
+        with self.profiler.measure_phase("query"):
+            target_node = statement_to_node(self.slicing_criterion)
+            dependency_nodes = get_dependency_nodes(graph, target_node)
 
         corresponding_lines = [node_to_statement(node) for node in dependency_nodes]
-        corresponding_lines.append(self.slice_me_call)
+        corresponding_lines.extend(self.slice_me_calls)
 
-        if GENERATE_PLOTS:
-            save_rdf_graph(graph, Path(self.source_path).parent, self.source, corresponding_lines)
+        self.profiler.count_events(self.recorder)
+        self.profiler.set_count("edges_definitions", len(graph_definitions))
+        self.profiler.set_count("edges_dataflow", len(graph_dataflow))
+        self.profiler.set_count("edges", len(graph))
+        self.profiler.set_count("slice_lines", len(set(corresponding_lines)))
 
-        if SAVE_RECORDER_DATA:
-            save_recorder_to_file(self.recorder, Path(self.source_path).parent.joinpath("recorder.json"))
+        if GENERATE_PLOTS:
+            with self.profiler.measure_phase("plots"):
+                save_rdf_graph(graph, Path(self.source_path).parent, self.source, corresponding_lines)
+
+        if self.save_recorder_data:
+            with self.profiler.measure_phase("save_recorder"):
+                save_recorder_to_file(self.recorder, Path(self.source_path).parent.joinpath("recorder.json"),
+                                      self.get_pre_slice_criterion())
+
+        if ENABLE_TRACE_REPORT:
+            with self.profiler.measure_phase("save_trace_report"):
+                if trace_analyzer is None:
+                    # the dataflow graph was built by another engine, the report takes a pass of its own
+                    trace_analyzer = TraceHotSpotAnalyzer(self.recorder, self.slicing_criterion, self.definitions,
+                                                          self.shard_manager.load_shards())
+                save_trace_report(trace_analyzer.create_report(self.source),
+                                  Path(self.source_path).parent.joinpath("trace_report.json"))
 
         return set(corresponding_lines)
 
-    def save_slice(self, slice_to_save: Set[int]):
+    def compute_slice_online(self) -> Set[int]:
+        # the slice was already computed during execution, no events were stored
+        with self.profiler.measure_phase("query"):
+            corresponding_lines = self.recorder.get_slice_lines()
+        corresponding_lines.update(self.slice_me_calls)
+
+        self.profiler.set_count("events", self.recorder.event_count)
+        self.profiler.set_count("slice_lines", len(corresponding_lines))
+        return corresponding_lines
+
+    def compute_slice_demand_driven(self) -> Set[int]:
+        with self.profiler.measure_phase("graph_definitions"):
+            graph_definitions = self.static_analysis.get_graph_definitions()
+        with self.profiler.measure_phase("query"):
+            traversal = DependencyTraceBackward(self.recorder, self.slicing_criterion, self.definitions,
+                                                graph_definitions)
+
+        corresponding_lines = traversal.lines | self.slice_me_calls
+
+        self.profiler.count_events(self.recorder)
+        self.profiler.set_count("events_visited", traversal.visited_events)
+        self.profiler.set_count("slice_lines", len(corresponding_lines))
+
+        if self.save_recorder_data:
+            with self.profiler.measure_phase("save_recorder"):
+                save_recorder_to_file(self.recorder, Path(self.source_path).parent.joinpath("recorder.json"),
+                                      self.get_pre_slice_criterion())
+
+        return corresponding_lines
+
+    def compute_slice_instances(self) -> Set[int]:
+        with self.profiler.measure_phase("graph_definitions"):
+            structural_dependencies = get_static_dependencies(self.static_analysis.get_graph_definitions())
+        with self.profiler.measure_phase("graph_instances"):
+            graph = create_instance_graph(self.recorder, self.definitions, {})
+        with self.profiler.measure_phase("query"):
+            corresponding_lines = graph.get_dependency_lines(self.slicing_criterion, INSTANCE_SLICING_OCCURRENCE,
+                                                             structural_dependencies)
+        corresponding_lines.update(self.slice_me_calls)
+
+        self.profiler.count_events(self.recorder)
+        self.profiler.set_count("instance_pairs", graph.count_pairs())
+        self.profiler.set_count("instance_runs", graph.count_runs())
+        self.profiler.set_count("slice_lines", len(corresponding_lines))
+
+        if self.save_recorder_data:
+            with self.profiler.measure_phase("save_recorder"):
+                save_recorder_to_file(self.recorder, Path(self.source_path).parent.joinpath("recorder.json"),
+                                      self.get_pre_slice_criterion())
+
+        return corresponding_lines
+
+    def create_dependency_graph(self) -> Graph:
+        """Build the dependency graph of the recorded trace, e.g. to query forward slices and chops."""
+        graph_dataflow = create_graph_from_dataflow(self.recorder, self.slicing_criterion, self.definitions,
+                                                    self.shard_manager.load_shards())
+        return self.static_analysis.get_graph_definitions() + graph_dataflow
+
+    def save_slice(self, slice_to_save: Set[int], file_content: Optional[str] = None) -> str:
         original_file_path = Path(self.source_path)
         folder_path = original_file_path.parent
         slice_file_path = folder_path.joinpath("sliced.py")
-        file_content = remove_lines(self.source, list(slice_to_save))
-        with open(slice_file_path, "w") as file:
-            file.write(file_content)
+        if file_content is None:
+            with self.profiler.measure_phase("remove_lines"):
+                file_content = remove_lines(self.source, list(slice_to_save))
+        with self.profiler.measure_phase("write_slice"):
+            with open(slice_file_path, "w") as file:
+                file.write(file_content)
+
+        if self.profiler.active:
+            self.profiler.finish()
+            save_profiling_report(self.profiler, folder_path.joinpath("profiling_report.json"))
+
+        return file_content
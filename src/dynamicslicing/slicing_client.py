@@ -0,0 +1,61 @@
+"""This file implements a client for the slicing server (see slicing_server.py). It only depends on the standard
+library, so that sending a request does not pay for the imports of the analysis.
+
+Usage:
+    python -m dynamicslicing.slicing_client --socket /tmp/slicing.sock slice program.py
+    python -m dynamicslicing.slicing_client --socket /tmp/slicing.sock reslice program.py recorder.json --criterion 12
+    python -m dynamicslicing.slicing_client --socket /tmp/slicing.sock query program.py recorder.json forward --source 3
+"""
+
+import argparse
+import socket
+import sys
+from json import dumps, loads
+from typing import List
+
+
+def send_request(socket_path: str, request: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall((dumps(request) + "\n").encode())
+        with connection.makefile("r") as file:
+            return loads(file.readline())
+
+
+def main(arguments: List[str] = None):
+    parser = argparse.ArgumentParser(description="Send a request to a running slicing server.")
+    parser.add_argument("--socket", required=True, help="Path of the Unix domain socket of the server")
+    parser.add_argument("--analysis", help="Class path of the analysis (default: dynamicslicing.slice.Slice)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    slice_parser = commands.add_parser("slice", help="Instrument and run a program, then write its sliced.py")
+    slice_parser.add_argument("program", help="Path of the program to slice")
+    reslice_parser = commands.add_parser("reslice", help="Slice a saved recorder file for another criterion")
+    reslice_parser.add_argument("program", help="Path of the (uninstrumented) program the trace was recorded for")
+    reslice_parser.add_argument("recorder", help="Path of the recorder.json file")
+    reslice_parser.add_argument("--criterion", type=int, help="Line of the slicing criterion")
+    query_parser = commands.add_parser("query", help="Query the lines of the dependency graph of a saved recorder file")
+    query_parser.add_argument("program", help="Path of the (uninstrumented) program the trace was recorded for")
+    query_parser.add_argument("recorder", help="Path of the recorder.json file")
+    query_parser.add_argument("kind", choices=["backward", "forward", "chop"],
+                              help="Lines the target depends on, lines depending on the source, or lines in between")
+    query_parser.add_argument("--source", type=int, help="Line of the source (forward and chop)")
+    query_parser.add_argument("--target", type=int, help="Line of the target (default: the slicing criterion)")
+    query_parser.add_argument("--layers", nargs="+", choices=["definitions", "dataflow", "control_flow"],
+                              help="Layers of the dependency graph to follow (default: all)")
+    commands.add_parser("ping", help="Check whether the server is running")
+    commands.add_parser("shutdown", help="Stop the server")
+    args = parser.parse_args(arguments)
+
+    request = {key: value for key, value in vars(args).items() if key != "socket" and value is not None}
+    response = send_request(args.socket, request)
+    if not response.get("ok"):
+        print(response.get("error"), file=sys.stderr)
+        sys.exit(1)
+    if args.command == "reslice":
+        print(response["sliced"], end="")
+    else:
+        print(dumps(response, indent=4))
+
+
+if __name__ == "__main__":
+    main()
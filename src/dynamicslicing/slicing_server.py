@@ -0,0 +1,272 @@
+"""This file implements a persistent slicing server. Running a slice through the DynaPyt command line starts a new
+interpreter, which imports DynaPyt, libcst and rdflib and repeats the static analysis of the program for each request.
+The server keeps a single process alive and serves requests over a Unix domain socket, so that these imports, the
+hooks of each analysis class and the caches of analysis_cache stay warm between requests.
+
+The protocol is one JSON object per line in each direction. Requests carry a "command":
+    {"command": "slice", "program": <path>, "analysis": <class path>}
+        instruments and runs the program, then writes sliced.py next to it like the DynaPyt command line does. If the
+        program was edited since its previous slice without changing its execution, the previous trace is reused.
+    {"command": "reslice", "program": <path>, "recorder": <path>, "criterion": <line>, "analysis": <class path>}
+        computes the slice of a saved recorder file for another slicing criterion, without executing the program. The
+        recorder file is not overwritten.
+    {"command": "query", "program": <path>, "recorder": <path>, "kind": "backward" | "forward" | "chop",
+     "source": <line>, "target": <line>, "layers": [<layer>, ...], "analysis": <class path>}
+        determines the lines of the dependency graph of a saved recorder file that the target line depends on
+        (backward), that depend on the source line (forward, "what does the line affect") or that lie on the
+        dependency paths from the source to the target line (chop, "how does the line influence the target"). The
+        layers ("definitions", "dataflow", "control_flow") default to all of them.
+    {"command": "ping"} and {"command": "shutdown"}
+Responses contain "ok" and either the result or an "error" message.
+
+Usage:
+    python -m dynamicslicing.slicing_server --socket /tmp/slicing.sock
+"""
+
+import argparse
+import atexit
+import contextlib
+import importlib
+import os
+import runpy
+import shutil
+import signal
+import socketserver
+import sys
+import traceback
+from json import dumps, loads
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dynamicslicing.analysis_hooks import get_analysis_hooks
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, load_recorder_from_file
+from dynamicslicing.dependency_graph_query import (LAYERS_ALL, get_chop_nodes, get_dependency_nodes,
+                                                   get_dependent_nodes, get_layer_mask)
+from dynamicslicing.dependency_graph_utils import node_to_statement, statement_to_node
+from dynamicslicing.incremental_slicing import PreviousRun
+from dynamicslicing.instrumentation_cache import instrument_file_cached
+from dynamicslicing.settings import SLICE_RESULT_CACHE, INCREMENTAL_SLICING, ONLINE_SLICING, TRACE_SHARDS
+from dynamicslicing.slice_cache import SliceResultCache
+from dynamicslicing.utils import remove_lines
+
+DEFAULT_ANALYSIS = "dynamicslicing.slice.Slice"
+
+# the hooks only depend on the analysis class and the settings, computing them instantiates the analysis
+hooks_by_analysis: Dict[str, dict] = {}
+
+# the latest run of each program and analysis, to re-slice edits that do not change the execution from its trace
+previous_runs: Dict[Tuple[str, str], PreviousRun] = {}
+
+
+def load_analysis_class(analysis_path: str):
+    module_name, class_name = analysis_path.rsplit(".", 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def create_analysis(analysis_path: str, program_file: Path):
+    """Create an analysis for an uninstrumented program, which is not going to be executed."""
+    iids_file = program_file.with_name(program_file.stem + "-dynapyt.json")
+    iids_file_existed = iids_file.exists()
+    analysis = load_analysis_class(analysis_path)(str(program_file))
+    # the analysis creates an IID map for the program, which is not needed without instrumentation
+    if not iids_file_existed and iids_file.exists():
+        iids_file.unlink()
+    return analysis
+
+
+def get_hooks(analysis_path: str, program_file: Path) -> dict:
+    if analysis_path not in hooks_by_analysis:
+        hooks_by_analysis[analysis_path] = get_analysis_hooks([f"{analysis_path}:{program_file}"])
+    return hooks_by_analysis[analysis_path]
+
+
+def run_instrumented(program_file: Path, analysis):
+    """Execute the instrumented program with the given analysis instance in this process, including the end of
+    execution hook. The signal and exit handlers registered by the DynaPyt runtime are removed again afterwards."""
+    import dynapyt.runtime as _rt
+
+    previous_handlers = {number: signal.getsignal(number) for number in (signal.SIGINT, signal.SIGTERM)}
+    _rt.analyses = None
+    _rt.set_analysis([analysis])
+    try:
+        analysis.begin_execution()
+        runpy.run_path(str(program_file), run_name="__main__")
+        _rt.end_execution()
+    finally:
+        _rt.end_execution_called = True
+        atexit.unregister(_rt.end_execution)
+        for number, handler in previous_handlers.items():
+            signal.signal(number, handler)
+        del sys.modules["dynapyt.runtime"]
+
+
+def slice_program(program: str, analysis_path: str = DEFAULT_ANALYSIS) -> dict:
+    program_file = Path(program).resolve()
+    orig_program_file = program_file.with_name(program_file.name + ".orig")
+    iids_file = program_file.with_name(program_file.stem + "-dynapyt.json")
+    with open(program_file, "r") as file:
+        source = file.read()
+
+    # the online recorder keeps no trace and the trace of forked children is not kept in the recorder
+    run_key = (str(program_file), analysis_path)
+    if INCREMENTAL_SLICING and not ONLINE_SLICING and not TRACE_SHARDS and run_key in previous_runs:
+        previous_run = previous_runs[run_key].update(source)
+        if previous_run is not None:
+            analysis = create_analysis(analysis_path, program_file)
+            analysis.recorder = previous_run.recorder
+            analysis.save_slice(analysis.compute_slice())
+            previous_runs[run_key] = previous_run
+            return {
+                "sliced_file": str(program_file.with_name("sliced.py")),
+                "event_count": len(analysis.recorder.event_stack),
+                "incremental": True,
+            }
+
+    # instrumentation prints progress, which would mix with the output of the server
+    with contextlib.redirect_stdout(sys.stderr):
+        instrument_file_cached(str(program_file), get_hooks(analysis_path, program_file))
+    try:
+        analysis = load_analysis_class(analysis_path)(str(orig_program_file))
+        run_instrumented(program_file, analysis)
+    finally:
+        shutil.move(str(orig_program_file), str(program_file))
+        if iids_file.exists():
+            iids_file.unlink()
+
+    if INCREMENTAL_SLICING:
+        previous_runs[run_key] = PreviousRun(source, analysis.recorder, analysis.entered_functions)
+    return {
+        "sliced_file": str(program_file.with_name("sliced.py")),
+        "event_count": len(analysis.recorder.event_stack),
+        "incremental": False,
+    }
+
+
+def get_program_lines(lines: Iterable[int]) -> List[int]:
+    # the dependency graph resolves names defined outside of the program (e.g. builtins) to line -1
+    return sorted(line for line in set(lines) if line != -1)
+
+
+def check_pre_slice_criterion(trace: DataflowRecorderSimple, criterion: Optional[int]):
+    """A trace recorded with STATIC_PRE_SLICE only holds the events relevant to its slicing criterion, so slicing it for
+    another criterion (None for a forward query) would silently miss dependencies."""
+    if trace.pre_slice_criterion is not None and trace.pre_slice_criterion != criterion:
+        raise ValueError(f"The trace was recorded with a static pre-slice for line {trace.pre_slice_criterion} and "
+                         f"can only be sliced for that line")
+
+
+def reslice_program(program: str, recorder: str, criterion: Optional[int],
+                    analysis_path: str = DEFAULT_ANALYSIS) -> dict:
+    analysis = create_analysis(analysis_path, Path(program).resolve())
+    if criterion is not None:
+        analysis.slicing_criterion = criterion
+    trace = load_recorder_from_file(Path(recorder))
+    check_pre_slice_criterion(trace, analysis.slicing_criterion)
+    # the saved trace is recorded again with the recorder the settings require, e.g. the indexed or online recorder
+    analysis.load_trace(trace)
+    cache_key = analysis.get_slice_cache_key() if SLICE_RESULT_CACHE else None
+    cached_result = SliceResultCache().load(cache_key) if cache_key else None
+    if cached_result is not None:
+        lines, sliced = cached_result
+    else:
+        lines = analysis.compute_slice()
+        sliced = remove_lines(analysis.source, list(lines))
+        if cache_key:
+            SliceResultCache().store(cache_key, lines, sliced)
+    return {
+        "lines": get_program_lines(lines),
+        "sliced": sliced,
+        "cached": cached_result is not None,
+    }
+
+
+def query_program(program: str, recorder: str, kind: str, source: Optional[int], target: Optional[int],
+                  layers: Optional[List[str]], analysis_path: str = DEFAULT_ANALYSIS) -> dict:
+    analysis = create_analysis(analysis_path, Path(program).resolve())
+    # the dependency graph is built from the events regardless of the settings, so the saved trace is used as is
+    analysis.recorder = load_recorder_from_file(Path(recorder))
+    if kind in ("forward", "chop") and source is None:
+        raise ValueError(f"A {kind} query requires a source line")
+    # forward queries follow dependencies that need not reach the slicing criterion
+    check_pre_slice_criterion(analysis.recorder, None if kind == "forward" else target or analysis.slicing_criterion)
+    graph = analysis.create_dependency_graph()
+    layer_mask = get_layer_mask(layers) if layers is not None else LAYERS_ALL
+    target_node = statement_to_node(target or analysis.slicing_criterion)
+    if kind == "backward":
+        nodes = get_dependency_nodes(graph, target_node, layer_mask)
+    elif kind == "forward":
+        nodes = get_dependent_nodes(graph, statement_to_node(source), layer_mask)
+    elif kind == "chop":
+        nodes = get_chop_nodes(graph, statement_to_node(source), target_node, layer_mask)
+    else:
+        raise ValueError(f"Unknown query kind: {kind}")
+    return {
+        "lines": get_program_lines(node_to_statement(node) for node in nodes),
+    }
+
+
+def handle_request(request: dict, server: socketserver.BaseServer) -> dict:
+    command = request.get("command")
+    analysis_path = request.get("analysis", DEFAULT_ANALYSIS)
+    if command == "ping":
+        return {"pid": os.getpid()}
+    if command == "shutdown":
+        server.shutdown_requested = True
+        return {}
+    if command == "slice":
+        return slice_program(request["program"], analysis_path)
+    if command == "reslice":
+        return reslice_program(request["program"], request["recorder"], request.get("criterion"), analysis_path)
+    if command == "query":
+        return query_program(request["program"], request["recorder"], request["kind"], request.get("source"),
+                             request.get("target"), request.get("layers"), analysis_path)
+    raise ValueError(f"Unknown command: {command}")
+
+
+class SlicingRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = {"ok": True, **handle_request(loads(line), self.server)}
+            except Exception as e:
+                traceback.print_exc()
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((dumps(response) + "\n").encode())
+            self.wfile.flush()
+            if self.server.shutdown_requested:
+                return
+
+
+class SlicingServer(socketserver.UnixStreamServer):
+    """Serves one connection at a time, as the analyses rely on the global state of the DynaPyt runtime and requests
+    must not run concurrently."""
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.shutdown_requested = False
+        super().__init__(socket_path, SlicingRequestHandler)
+
+    def serve_until_shutdown(self):
+        while not self.shutdown_requested:
+            self.handle_request()
+
+
+def main(arguments: List[str] = None):
+    parser = argparse.ArgumentParser(description="Serve slicing requests over a Unix domain socket.")
+    parser.add_argument("--socket", required=True, help="Path of the Unix domain socket to listen on")
+    args = parser.parse_args(arguments)
+
+    with SlicingServer(args.socket) as server:
+        try:
+            server.serve_until_shutdown()
+        finally:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
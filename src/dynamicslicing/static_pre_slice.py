@@ -0,0 +1,282 @@
+"""This file implements a conservative static backward slice, used to restrict which events are recorded. The dynamic
+dependency graph only connects a use of a variable to definitions of variables with the same root name (e.g. p for
+p.age or ages for ages[?]) or to definitions of aliases created by assignments, plus static structural and control flow
+edges between lines. Mirroring this on the source, a fixed point computes the lines that may be reached from the
+slicing criterion and the root names they may use. Events of other root names can never reach the slicing criterion,
+so they need not be recorded, and lines that do not mention any relevant root name need not be analyzed by the hooks.
+The analysis is purely syntactic, it does not distinguish scopes or resolve calls, which keeps it conservative."""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+import libcst as cst
+from libcst.metadata import PositionProvider
+
+from dynamicslicing.finders import CFElement, Definition
+
+ROOT_SEPARATOR = re.compile(r"[.\[]")
+
+
+def get_variable_root(variable: str) -> str:
+    return ROOT_SEPARATOR.split(variable, 1)[0]
+
+
+def get_expression_root(expression: cst.BaseExpression) -> Optional[str]:
+    """Return the name the variables extracted from the expression start with, if any."""
+    if isinstance(expression, cst.Name):
+        return expression.value
+    if isinstance(expression, (cst.Attribute, cst.Subscript)):
+        return get_expression_root(expression.value)
+    if isinstance(expression, cst.Call):
+        return get_expression_root(expression.func)
+    return None
+
+
+class PreSliceStatement:
+    """A simple statement or the header of a compound statement, with the lines it spans, the root names it mentions
+    and the root names it may define."""
+
+    def __init__(self, first_line: int, last_line: int, names: Set[str], definitions: Set[str]):
+        self.first_line = first_line
+        self.last_line = last_line
+        self.names = names
+        self.definitions = definitions
+
+    @property
+    def lines(self) -> range:
+        return range(self.first_line, self.last_line + 1)
+
+
+class NameCollector(cst.CSTVisitor):
+    """Collects the names an expression or statement mentions and the root names it may define."""
+
+    def __init__(self):
+        super().__init__()
+        self.names: Set[str] = set()
+        self.definitions: Set[str] = set()
+        # pairs of (alias, aliased name) of assignments with a name as value
+        self.aliases: List[tuple] = []
+
+    def visit_Name(self, node: cst.Name):
+        self.names.add(node.value)
+
+    def visit_Attribute(self, node: cst.Attribute):
+        # the attribute name is not a variable on its own
+        node.value.visit(self)
+        return False
+
+    def visit_Assign(self, node: cst.Assign):
+        for target in node.targets:
+            self.add_target(target.target)
+            if isinstance(node.value, cst.Name):
+                for root in self.get_target_roots(target.target):
+                    self.aliases.append((root, node.value.value))
+
+    def visit_AugAssign(self, node: cst.AugAssign):
+        self.add_target(node.target)
+
+    def visit_AnnAssign(self, node: cst.AnnAssign):
+        self.add_target(node.target)
+
+    def visit_NamedExpr(self, node: cst.NamedExpr):
+        self.add_target(node.target)
+
+    def visit_Del(self, node: cst.Del):
+        self.add_target(node.target)
+
+    def visit_Call(self, node: cst.Call):
+        # a method call is recorded as modification of the object it is called on
+        if isinstance(node.func, cst.Attribute):
+            self.add_target(node.func.value)
+
+    def visit_ImportAlias(self, node: cst.ImportAlias):
+        name = node.asname.name if node.asname else node.name
+        self.add_target(name if isinstance(name, cst.Name) else get_leftmost_name(name))
+
+    def visit_AsName(self, node: cst.AsName):
+        self.add_target(node.name)
+
+    def add_target(self, target: cst.BaseExpression):
+        self.definitions.update(self.get_target_roots(target))
+
+    def get_target_roots(self, target: cst.BaseExpression) -> List[str]:
+        if isinstance(target, (cst.Tuple, cst.List)):
+            return [root for element in target.elements for root in self.get_target_roots(element.value)]
+        if isinstance(target, cst.StarredElement):
+            return self.get_target_roots(target.value)
+        root = get_expression_root(target)
+        return [root] if root is not None else []
+
+
+def get_leftmost_name(expression: cst.BaseExpression) -> Optional[cst.Name]:
+    while isinstance(expression, cst.Attribute):
+        expression = expression.value
+    return expression if isinstance(expression, cst.Name) else None
+
+
+class StatementFinder(cst.CSTVisitor):
+    METADATA_DEPENDENCIES = (
+        PositionProvider,
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.statements: List[PreSliceStatement] = []
+        self.aliases: List[tuple] = []
+
+    def visit_SimpleStatementLine(self, node: cst.SimpleStatementLine):
+        self.add_statement(node, [node])
+        return False
+
+    def visit_SimpleStatementSuite(self, node: cst.SimpleStatementSuite):
+        self.add_statement(node, [node])
+        return False
+
+    def on_visit(self, node: cst.CSTNode):
+        if not super().on_visit(node):
+            return False
+        if isinstance(node, cst.Match):
+            self.add_statement(node, [node.subject], self.get_metadata(PositionProvider, node.subject).end.line)
+            return True
+        body = getattr(node, "body", None)
+        if isinstance(body, cst.BaseSuite):
+            # compound statements (and their else, except and finally clauses): only the header is a statement
+            header = [child for child in node.children
+                      if not isinstance(child, cst.BaseSuite) and not isinstance(getattr(child, "body", None),
+                                                                                   cst.BaseSuite)]
+            self.add_statement(node, header, self.get_header_end(node, body))
+            if isinstance(node, (cst.FunctionDef, cst.ClassDef)):
+                self.statements[-1].definitions.add(node.name.value)
+        return True
+
+    def get_header_end(self, node: cst.CSTNode, body: cst.BaseSuite) -> int:
+        if isinstance(body, cst.IndentedBlock) and body.body:
+            return max(self.get_metadata(PositionProvider, body.body[0]).start.line - 1,
+                       self.get_metadata(PositionProvider, node).start.line)
+        return self.get_metadata(PositionProvider, node).end.line
+
+    def add_statement(self, node: cst.CSTNode, parts: Iterable[cst.CSTNode], last_line: Optional[int] = None):
+        position = self.get_metadata(PositionProvider, node)
+        collector = NameCollector()
+        for part in parts:
+            part.visit(collector)
+        self.statements.append(PreSliceStatement(position.start.line, last_line or position.end.line,
+                                                 collector.names, collector.definitions))
+        self.aliases.extend(collector.aliases)
+
+
+class StaticPreSlice:
+    """
+    The result of the static backward slice: the lines that may be part of the slice, the root names whose events may
+    reach the slicing criterion and the lines on which such events may be recorded.
+    """
+
+    def __init__(self, lines: Set[int], roots: Set[str], recorded_lines: Set[int]):
+        self.lines = lines
+        self.roots = roots
+        self.recorded_lines = recorded_lines
+
+    def is_relevant_variable(self, variable: str) -> bool:
+        return get_variable_root(variable) in self.roots
+
+    def is_relevant_line(self, line: int) -> bool:
+        return line in self.recorded_lines
+
+
+class StaticPreSliceBuilder:
+
+    def __init__(self, ast: cst.Module, definitions: dict[str, Definition], cf_element: CFElement):
+        finder = StatementFinder()
+        cst.metadata.MetadataWrapper(ast).visit(finder)
+        self.statements = finder.statements
+        self.statements_by_line: Dict[int, List[PreSliceStatement]] = {}
+        self.statements_by_definition: Dict[str, List[PreSliceStatement]] = {}
+        for statement in self.statements:
+            for line in statement.lines:
+                self.statements_by_line.setdefault(line, []).append(statement)
+            for root in statement.definitions:
+                self.statements_by_definition.setdefault(root, []).append(statement)
+        self.alias_groups = self.find_alias_groups(finder.aliases)
+        self.definitions = list(flatten_definitions(definitions))
+        self.cf_elements = list(flatten_control_flow_elements(cf_element))
+
+        self.lines: Set[int] = set()
+        self.roots: Set[str] = set()
+        self.pending_lines: List[int] = []
+
+    @staticmethod
+    def find_alias_groups(aliases: List[tuple]) -> Dict[str, Set[str]]:
+        groups: Dict[str, Set[str]] = {}
+        for alias, name in aliases:
+            group = groups.get(alias, {alias}) | groups.get(name, {name})
+            for member in group:
+                groups[member] = group
+        return groups
+
+    def build(self, slicing_criterion_line: int) -> StaticPreSlice:
+        self.add_line(slicing_criterion_line)
+        while self.pending_lines:
+            line = self.pending_lines.pop()
+            for statement in self.statements_by_line.get(line, ()):
+                for name in statement.names:
+                    self.add_root(name)
+            self.add_structural_dependencies(line)
+
+        recorded_lines = set()
+        for statement in self.statements:
+            if not statement.names.isdisjoint(self.roots) or not statement.definitions.isdisjoint(self.roots):
+                recorded_lines.update(statement.lines)
+        return StaticPreSlice(self.lines, self.roots, recorded_lines)
+
+    def add_structural_dependencies(self, line: int):
+        """Mirror of the edges of the definitions and control flow graph layers."""
+        for definition in self.definitions:
+            start, end = definition.location.start.line, definition.location.end.line
+            if start < line <= end:
+                self.add_line(start)
+            if start == line:
+                # the functions nested in a definition are fully included with it
+                for child in definition.children.values():
+                    if isinstance(child.node, cst.FunctionDef):
+                        self.add_lines(range(child.location.start.line, child.location.end.line + 1))
+        for element in self.cf_elements:
+            if not isinstance(element.node, cst.FunctionDef) and element.body_start <= line <= element.body_end:
+                self.add_line(element.main_line)
+
+    def add_root(self, root: str):
+        for member in self.alias_groups.get(root, (root,)):
+            if member in self.roots:
+                continue
+            self.roots.add(member)
+            for statement in self.statements_by_definition.get(member, ()):
+                self.add_lines(statement.lines)
+            # uses without a recorded definition fall back to the static definition
+            for definition in self.definitions:
+                if definition.name == member:
+                    self.add_line(definition.location.start.line)
+
+    def add_lines(self, lines: Iterable[int]):
+        for line in lines:
+            self.add_line(line)
+
+    def add_line(self, line: int):
+        if line not in self.lines:
+            self.lines.add(line)
+            self.pending_lines.append(line)
+
+
+def flatten_definitions(definitions: dict[str, Definition]) -> Iterable[Definition]:
+    for definition in definitions.values():
+        yield definition
+        yield from flatten_definitions(definition.children)
+
+
+def flatten_control_flow_elements(element: CFElement) -> Iterable[CFElement]:
+    yield element
+    for child in element.children:
+        yield from flatten_control_flow_elements(child)
+
+
+def compute_static_pre_slice(ast: cst.Module, definitions: dict[str, Definition], cf_element: CFElement,
+                             slicing_criterion_line: int) -> StaticPreSlice:
+    return StaticPreSliceBuilder(ast, definitions, cf_element).build(slicing_criterion_line)
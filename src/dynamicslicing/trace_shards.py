@@ -0,0 +1,117 @@
+"""This file implements trace sharding for programs that fork worker processes (e.g. multiprocessing or
+ProcessPoolExecutor with the fork start method). The analysis only lives in the DynaPyt runtime of the parent process,
+so without sharding, all events recorded in child processes are lost. With sharding, each forked child records into a
+fresh recorder and writes it as trace shard to a shared directory when it exits. The shards are loaded at the end of
+execution and merged into the dataflow of the parent."""
+
+import atexit
+import os
+import uuid
+import weakref
+from json import dumps, loads
+from multiprocessing import util
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, convert_recorder_to_dict, \
+    convert_dict_to_recorder
+
+SHARD_FILE_PREFIX = "shard-"
+
+
+def create_process_id(fork_index: int) -> str:
+    """Identifies a recording process. Unlike the pid, which the operating system may reuse for a later child, it is
+    unique across the run."""
+    return f"{fork_index}-{uuid.uuid4().hex}"
+
+
+class TraceShard:
+    """The events recorded by a child process, together with the process it was forked from and the number of events
+    the parent had recorded at that time. Processes are identified by the ids of create_process_id."""
+
+    def __init__(self, process_id: str, parent_id: str, pid: int, fork_index: int, recorder: DataflowRecorderSimple):
+        self.process_id = process_id
+        self.parent_id = parent_id
+        self.pid = pid
+        self.fork_index = fork_index
+        self.recorder = recorder
+
+
+class TraceShardManager:
+    """
+    Replaces the recorder of the analysis in each forked child process and saves it as shard when the child exits.
+    Children started by multiprocessing exit without running atexit handlers, so the shard is saved by a multiprocessing
+    finalizer in that case. Processes started with the spawn or forkserver start methods are not covered, as they do not
+    inherit the analysis.
+    """
+
+    def __init__(self, enabled: bool, analysis, folder: Path):
+        self.enabled = enabled
+        self.analysis = weakref.ref(analysis)
+        self.folder = folder
+        self.root_pid = os.getpid()
+        self.is_child = False
+        self.saved = False
+        # forks after the end of execution, e.g. by a later analysis in the same process, are not recorded
+        self.stopped = False
+        self.fork_index = 0
+        self.process_id = create_process_id(self.fork_index)
+        self.parent_id: Optional[str] = None
+
+        if enabled:
+            self.remove_shards()
+            manager = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: manager() and manager().on_fork_in_child())
+            # multiprocessing clears the finalizers inherited by a child before running it, but runs these callbacks
+            util.register_after_fork(self, TraceShardManager.register_finalizer)
+
+    def on_fork_in_child(self):
+        analysis = self.analysis()
+        if not self.enabled or self.stopped or analysis is None:
+            return
+        self.fork_index = len(analysis.recorder.event_stack)
+        self.parent_id = self.process_id
+        self.process_id = create_process_id(self.fork_index)
+        self.is_child = True
+        self.saved = False
+        analysis.recorder = DataflowRecorderSimple()
+        atexit.register(self.save_shard)
+
+    def stop(self):
+        self.stopped = True
+
+    def register_finalizer(self):
+        util.Finalize(self, self.save_shard, exitpriority=100)
+
+    def save_shard(self):
+        analysis = self.analysis()
+        if not self.is_child or self.saved or analysis is None:
+            return
+        self.saved = True
+        data = convert_recorder_to_dict(analysis.recorder)
+        data.update({"process_id": self.process_id, "parent_id": self.parent_id, "pid": os.getpid(),
+                     "fork_index": self.fork_index})
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(self.folder.joinpath(SHARD_FILE_PREFIX + self.process_id + ".json"), 'w') as file:
+            file.write(dumps(data))
+
+    def load_shards(self) -> List[TraceShard]:
+        if not self.enabled or not self.folder.exists():
+            return []
+        shards = []
+        for path in sorted(self.folder.glob(SHARD_FILE_PREFIX + "*.json")):
+            with open(path, 'r') as file:
+                data = loads(file.read())
+            shards.append(TraceShard(data["process_id"], data["parent_id"], data["pid"], data["fork_index"],
+                                     convert_dict_to_recorder(data)))
+        return shards
+
+    def remove_shards(self):
+        if self.folder.exists():
+            for path in self.folder.glob(SHARD_FILE_PREFIX + "*.json"):
+                path.unlink()
+
+
+def find_child_shards(shards: Sequence[TraceShard], parent_id: Optional[str]) -> List[TraceShard]:
+    """Return the shards of the children forked by the given process, in the order they were forked."""
+    return sorted((shard for shard in shards if shard.parent_id == parent_id), key=lambda shard: shard.fork_index)
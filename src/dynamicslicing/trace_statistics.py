@@ -0,0 +1,117 @@
+"""This file implements a hot spot report for recorded dataflow events. In a single pass over the trace, it counts the
+events by line, kind and variable and the dataflow edges created for each definition, while building the dataflow
+graph. The report can be created at the end of execution or offline from a saved recorder file:
+
+    python -m dynamicslicing.trace_statistics path/to/recorder.json path/to/program.py
+"""
+
+import argparse
+from collections import Counter
+from json import dumps
+from pathlib import Path
+from typing import List, Sequence
+
+import libcst as cst
+from rdflib import URIRef
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple, Event, load_recorder_from_file
+from dynamicslicing.dependency_graph_dataflow import DependencyGraphDataflowShards
+from dynamicslicing.finders import Definition, find_definitions, find_slicing_criterion_line
+from dynamicslicing.trace_shards import TraceShard
+
+DEFAULT_TOP_LINES = 10
+
+
+class TraceHotSpotAnalyzer(DependencyGraphDataflowShards):
+    """Builds the dataflow graph like create_graph_from_dataflow, including the events of the trace shards, but
+    additionally counts events and edges while doing so."""
+
+    def __init__(self, recorder: DataflowRecorderSimple, slicing_criterion_line: int,
+                 definitions: dict[str, Definition], shards: Sequence[TraceShard] = ()):
+        self.events_by_line: Counter = Counter()
+        self.events_by_kind: Counter = Counter()
+        self.events_by_variable: Counter = Counter()
+        self.events_by_line_kind_variable: Counter = Counter()
+        self.edges_by_definition: Counter = Counter()
+        self.edge_occurrences: Counter = Counter()
+        super().__init__(recorder, shards, slicing_criterion_line, definitions)
+
+    def process_event(self, event: Event):
+        kind = event.__class__.__name__
+        variable = getattr(event, "variable", None) or getattr(event, "alias", None)
+        self.events_by_line[event.line] += 1
+        self.events_by_kind[kind] += 1
+        self.events_by_variable[variable] += 1
+        self.events_by_line_kind_variable[(event.line, kind, variable)] += 1
+        super().process_event(event)
+
+    def add_definition_use_tuple(self, definition_line: int, use_line: int, relationship: URIRef):
+        self.edges_by_definition[definition_line] += 1
+        self.edge_occurrences[(definition_line, use_line, str(relationship))] += 1
+        super().add_definition_use_tuple(definition_line, use_line, relationship)
+
+    def create_report(self, source: str, top_lines: int = DEFAULT_TOP_LINES) -> dict:
+        source_lines = source.splitlines()
+
+        def line_text(line: int) -> str:
+            return source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""
+
+        distinct_targets: Counter = Counter(definition for definition, _, _ in self.edge_occurrences)
+
+        return {
+            "events": sum(self.events_by_kind.values()),
+            "events_by_kind": dict(self.events_by_kind.most_common()),
+            "events_by_line": {str(line): count for line, count in self.events_by_line.most_common()},
+            "events_by_variable": dict(self.events_by_variable.most_common()),
+            "events_by_line_kind_variable": [
+                {"line": line, "kind": kind, "variable": variable, "count": count}
+                for (line, kind, variable), count in self.events_by_line_kind_variable.most_common()
+            ],
+            "hot_lines": [
+                {"line": line, "count": count, "source": line_text(line)}
+                for line, count in self.events_by_line.most_common(top_lines)
+            ],
+            "edges_by_definition": [
+                {"line": line, "edges": count, "distinct_targets": distinct_targets[line], "source": line_text(line)}
+                for line, count in self.edges_by_definition.most_common()
+            ],
+            "top_edges": [
+                {"definition": definition, "use": use, "relationship": relationship, "count": count}
+                for (definition, use, relationship), count in self.edge_occurrences.most_common(top_lines)
+            ],
+        }
+
+
+def create_trace_report(recorder: DataflowRecorderSimple, source: str, top_lines: int = DEFAULT_TOP_LINES) -> dict:
+    """Create the hot spot report for a recorder, e.g. one loaded from a saved recorder file."""
+    ast = cst.parse_module(source)
+    analyzer = TraceHotSpotAnalyzer(recorder, find_slicing_criterion_line(ast), find_definitions(ast))
+    return analyzer.create_report(source, top_lines)
+
+
+def save_trace_report(report: dict, path: Path):
+    json_string = dumps(report, indent=4)
+    with open(path, 'w') as file:
+        file.write(json_string)
+
+
+def main(arguments: List[str] = None):
+    parser = argparse.ArgumentParser(description="Create a hot spot report from a saved recorder file.")
+    parser.add_argument("recorder", help="Path of the recorder.json file")
+    parser.add_argument("program", help="Path of the (uninstrumented) program the trace was recorded for")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_LINES, help="Number of hot lines and edges to list")
+    parser.add_argument("--output", help="File to write the report to (default: stdout)")
+    args = parser.parse_args(arguments)
+
+    with open(args.program, "r") as file:
+        source = file.read()
+    report = create_trace_report(load_recorder_from_file(Path(args.recorder)), source, args.top)
+
+    if args.output:
+        save_trace_report(report, Path(args.output))
+    else:
+        print(dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
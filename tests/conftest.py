@@ -12,6 +12,8 @@ def pytest_addoption(parser):
 
 
 def pytest_generate_tests(metafunc):
+    if "directory_pair" not in metafunc.fixturenames:
+        return
     # find all subdirectories that contain a micro-test
     directories = []
     selection = metafunc.config.getoption("only", default=None, skip=False)
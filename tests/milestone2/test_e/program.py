@@ -0,0 +1,12 @@
+LIMIT = 5
+OFFSET = 2
+
+
+def slice_me():
+    x = LIMIT + 1
+    y = OFFSET
+    return x # slicing criterion
+
+
+slice_me()
+LIMIT = 7
@@ -0,0 +1,5 @@
+LIMIT = 5
+def slice_me():
+    x = LIMIT + 1
+    return x # slicing criterion
+slice_me()
@@ -0,0 +1,9 @@
+LIMIT = 5
+def slice_me():
+    x = LIMIT + 1
+    return x # slicing criterion
+def run():
+    slice_me()
+run()
+LIMIT = 7
+run()
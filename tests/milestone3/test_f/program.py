@@ -0,0 +1,17 @@
+LIMIT = 5
+OFFSET = 2
+
+
+def slice_me():
+    x = LIMIT + 1
+    return x # slicing criterion
+
+
+def run():
+    slice_me()
+
+
+run()
+OFFSET = LIMIT
+LIMIT = 7
+run()
@@ -0,0 +1,5 @@
+def slice_me():
+    def work():
+        total = a + b
+        return total # slicing criterion
+slice_me()
@@ -0,0 +1,7 @@
+def slice_me():
+    a = 1
+    b = 2
+    def work():
+        total = a + b
+        return total # slicing criterion
+slice_me()
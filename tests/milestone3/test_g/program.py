@@ -0,0 +1,19 @@
+def slice_me():
+    import multiprocessing
+    a = 1
+    b = 2
+    c = 3
+
+    def work():
+        total = a + b
+        return total # slicing criterion
+
+    c = 4
+    context = multiprocessing.get_context("fork")
+    process = context.Process(target=work)
+    process.start()
+    process.join()
+    return c
+
+
+slice_me()
@@ -0,0 +1,5 @@
+async def scale(value):
+    if value > 10:
+        factor = value * 2
+    return factor # slicing criterion
+slice_me()
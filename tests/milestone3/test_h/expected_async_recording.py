@@ -0,0 +1,7 @@
+async def scale(value):
+    if value > 10:
+        factor = value * 2
+    else:
+        factor = value * 3
+    return factor # slicing criterion
+slice_me()
@@ -0,0 +1,24 @@
+async def scale(value):
+    if value > 10:
+        factor = value * 2
+    else:
+        factor = value * 3
+    await asyncio.sleep(0)
+    return factor # slicing criterion
+
+
+async def compute(value):
+    result = await scale(value)
+    return result
+
+
+async def main():
+    await asyncio.gather(compute(1), compute(100))
+
+
+def slice_me():
+    asyncio.run(main())
+
+
+import asyncio
+slice_me()
@@ -0,0 +1,10 @@
+def slice_me():
+    total = 0
+    step = 1
+    i = 0
+    while i < 3:
+        if i == 2:
+            step = 10
+        total = total + step # slicing criterion
+        i = i + 1
+slice_me()
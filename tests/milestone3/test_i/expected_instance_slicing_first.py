@@ -0,0 +1,7 @@
+def slice_me():
+    total = 0
+    step = 1
+    i = 0
+    while i < 3:
+        total = total + step # slicing criterion
+slice_me()
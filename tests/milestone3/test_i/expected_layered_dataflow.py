@@ -0,0 +1,8 @@
+def slice_me():
+    total = 0
+    step = 1
+    while i < 3:
+        if i == 2:
+            step = 10
+        total = total + step # slicing criterion
+slice_me()
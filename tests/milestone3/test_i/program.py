@@ -0,0 +1,15 @@
+def slice_me():
+    total = 0
+    step = 1
+    unused = 0
+    i = 0
+    while i < 3:
+        if i == 2:
+            step = 10
+        total = total + step # slicing criterion
+        unused = unused + 1
+        i = i + 1
+    return total
+
+
+slice_me()
@@ -0,0 +1,7 @@
+values = [1, 2, 3]
+def produce():
+    offset = len(values)
+def slice_me():
+    result = offset + 1
+    return result # slicing criterion
+slice_me()
@@ -0,0 +1,26 @@
+values = [1, 2, 3]
+
+
+def produce():
+    global offset
+    offset = len(values)
+
+
+def ignore():
+    global ignored
+    ignored = 0
+
+
+def slice_me():
+    import threading
+    first = threading.Thread(target=produce)
+    second = threading.Thread(target=ignore)
+    first.start()
+    second.start()
+    first.join()
+    second.join()
+    result = offset + 1
+    return result # slicing criterion
+
+
+slice_me()
@@ -0,0 +1,13 @@
+class Task:
+    def __init__(self, size):
+        self.size = size
+
+    def slice_me(self):
+        return self.size * 2
+def slice_me():
+    task = Task(3)
+    unused = Task(4)
+    doubled = task.slice_me()
+    result = doubled + 1
+    return result # slicing criterion
+slice_me()
@@ -0,0 +1,44 @@
+from os.path import dirname, join, realpath
+from pathlib import Path
+from shutil import copyfile
+
+import pytest
+
+from dynamicslicing import analysis_hooks
+from dynamicslicing.analysis_hooks import get_analysis_hooks
+
+PROGRAM_DIR = join(dirname(realpath(__file__)), "milestone3", "test_b")
+ANALYSES = ["dynamicslicing.slice.Slice", "dynamicslicing.slice_dataflow.SliceDataflow"]
+
+# the optional hooks, each with the settings requiring it
+OPTIONAL_HOOK_SETTINGS = [
+    ("post_call", "EARLY_TERMINATION"),
+    ("post_call", "SCOPE_FILTER"),
+    ("function_enter", "INCREMENTAL_SLICING"),
+    ("enter_for", "LOOP_FIXED_POINT"),
+    ("exit_for", "LOOP_FIXED_POINT"),
+    ("enter_while", "LOOP_FIXED_POINT"),
+    ("exit_while", "LOOP_FIXED_POINT"),
+]
+
+
+@pytest.fixture
+def program_file(tmp_path: Path) -> Path:
+    # the analyses are instantiated to determine their hooks, which writes the IIDs file next to the program
+    program_file = tmp_path.joinpath("program.py")
+    copyfile(join(PROGRAM_DIR, "program.py"), program_file)
+    return program_file
+
+
+@pytest.mark.parametrize("analysis", ANALYSES)
+def test_default_hooks(analysis: str, program_file: Path):
+    hooks = get_analysis_hooks([f"{analysis}:{program_file}"])
+    assert {"read_identifier", "write", "pre_call"} <= set(hooks)
+    assert not {hook for hook, _ in OPTIONAL_HOOK_SETTINGS} & set(hooks)
+
+
+@pytest.mark.parametrize("analysis", ANALYSES)
+@pytest.mark.parametrize("hook, setting", OPTIONAL_HOOK_SETTINGS)
+def test_optional_hooks(analysis: str, hook: str, setting: str, program_file: Path, monkeypatch):
+    monkeypatch.setattr(analysis_hooks, setting, True)
+    assert hook in get_analysis_hooks([f"{analysis}:{program_file}"])
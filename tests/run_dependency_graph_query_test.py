@@ -0,0 +1,66 @@
+import pytest
+from rdflib import Graph
+
+from dynamicslicing.dependency_graph_control_flow import RELATIONSHIP_CONTROL_FLOW_HAS_DEPENDENT
+from dynamicslicing.dependency_graph_dataflow import RELATIONSHIP_DEFINITION_IS_USED_BY
+from dynamicslicing.dependency_graph_definitions import RELATIONSHIP_DEFINITION_HAS_DEPENDENT
+from dynamicslicing.dependency_graph_query import (LAYER_DATAFLOW, LAYER_DEFINITIONS, get_chop_nodes,
+                                                   get_dependency_nodes, get_dependent_nodes, get_enclosing_nodes,
+                                                   get_layer_mask)
+from dynamicslicing.dependency_graph_utils import node_to_statement, statement_to_node
+
+# 1 is a function definition that 3 depends on, 2 and 3 are in the loop with head 4, 5 depends on 3 and 6 is unrelated
+EDGES = [
+    (1, RELATIONSHIP_DEFINITION_HAS_DEPENDENT, 3),
+    (2, RELATIONSHIP_DEFINITION_IS_USED_BY, 3),
+    (3, RELATIONSHIP_DEFINITION_IS_USED_BY, 5),
+    (4, RELATIONSHIP_CONTROL_FLOW_HAS_DEPENDENT, 2),
+    (4, RELATIONSHIP_CONTROL_FLOW_HAS_DEPENDENT, 3),
+    (6, RELATIONSHIP_DEFINITION_IS_USED_BY, 6),
+]
+
+
+@pytest.fixture
+def graph() -> Graph:
+    g = Graph()
+    for source, relationship, target in EDGES:
+        g.add((statement_to_node(source), relationship, statement_to_node(target)))
+    return g
+
+
+def lines(nodes) -> list:
+    return sorted(node_to_statement(node) for node in nodes)
+
+
+def test_backward(graph: Graph):
+    assert lines(get_dependency_nodes(graph, statement_to_node(5))) == [1, 2, 3, 4, 5]
+    assert lines(get_dependency_nodes(graph, statement_to_node(5), LAYER_DATAFLOW)) == [2, 3, 5]
+    assert lines(get_dependency_nodes(graph, statement_to_node(5), LAYER_DEFINITIONS)) == [5]
+
+
+def test_forward(graph: Graph):
+    assert lines(get_dependent_nodes(graph, statement_to_node(4))) == [2, 3, 4, 5]
+    assert lines(get_dependent_nodes(graph, statement_to_node(4), LAYER_DATAFLOW)) == [4]
+    assert lines(get_dependent_nodes(graph, statement_to_node(1))) == [1, 3, 5]
+    assert lines(get_dependent_nodes(graph, statement_to_node(6))) == [6]
+
+
+def test_chop(graph: Graph):
+    assert lines(get_chop_nodes(graph, statement_to_node(4), statement_to_node(5))) == [2, 3, 4, 5]
+    assert lines(get_chop_nodes(graph, statement_to_node(2), statement_to_node(5))) == [2, 3, 5]
+    assert lines(get_chop_nodes(graph, statement_to_node(3), statement_to_node(3))) == [3]
+    # without a path between the two nodes, the chop is empty
+    assert lines(get_chop_nodes(graph, statement_to_node(4), statement_to_node(5), LAYER_DATAFLOW)) == []
+    assert lines(get_chop_nodes(graph, statement_to_node(5), statement_to_node(2))) == []
+    assert lines(get_chop_nodes(graph, statement_to_node(6), statement_to_node(5))) == []
+
+
+def test_layer_mask():
+    assert get_layer_mask(["definitions", "dataflow"]) == LAYER_DEFINITIONS | LAYER_DATAFLOW
+    with pytest.raises(ValueError):
+        get_layer_mask(["calls"])
+
+
+def test_enclosing_nodes(graph: Graph):
+    nodes = get_dependency_nodes(graph, statement_to_node(5), LAYER_DATAFLOW)
+    assert lines(get_enclosing_nodes(graph, nodes)) == [2, 3, 4, 5]
@@ -0,0 +1,72 @@
+import gc
+import sys
+
+from dynamicslicing.identity_aliases import IdentityAliasTable
+
+
+class Box:
+    pass
+
+
+def test_alias_through_call():
+    table = IdentityAliasTable()
+    box = Box()
+
+    def create():
+        table.record_assignment("created", box, sys._getframe())
+        return box
+
+    # like the analyses, the owner is looked up before the assignment is registered
+    result = create()
+    assert table.find_owner(result) == "created"
+    table.record_assignment("result", result, sys._getframe())
+    assert table.find_owner(box) == "result"
+
+
+def test_variables_qualified_by_frame():
+    table = IdentityAliasTable()
+    box, other = Box(), Box()
+    table.record_assignment("x", box, sys._getframe())
+
+    def reassign():
+        # the x of this call is another variable than the x of the caller
+        table.record_assignment("x", other, sys._getframe())
+        assert table.find_owner(box) == "x" and table.find_owner(other) == "x"
+
+    reassign()
+    table.record_assignment("x", other, sys._getframe())
+    assert table.find_owner(box) is None
+
+
+def test_finished_frames_pruned():
+    table = IdentityAliasTable()
+    items = [1, 2, 3]
+
+    def hold():
+        table.record_assignment("items", items, sys._getframe())
+
+    hold()
+    assert table.find_owner(items) == "items"
+
+    def enter():
+        table.record_assignment("box", Box(), sys._getframe())
+
+    # entering another frame prunes the variables of the finished ones, the list is not referenced anymore
+    enter()
+    assert table.find_owner(items) is None
+    assert all(entry.get_object() is not items for entry in table.entries.values())
+
+
+def test_collected_objects_pruned():
+    table = IdentityAliasTable()
+    box = Box()
+    table.record_assignment("box", box, sys._getframe())
+    del box
+    gc.collect()
+    assert not table.entries and not table.objects_by_holder
+
+
+def test_primitive_values_not_aliased():
+    table = IdentityAliasTable()
+    table.record_assignment("count", 7, sys._getframe())
+    assert table.find_owner(7) is None
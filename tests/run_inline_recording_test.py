@@ -0,0 +1,54 @@
+from os import sep
+from os.path import join
+from pathlib import Path
+from shutil import copyfile
+from typing import Tuple
+
+import pytest
+
+from dynamicslicing.inline_recording import slice_with_inline_recording
+from run_single_test import correct_output
+
+ANALYSES = {
+    "milestone2": "dynamicslicing.slice_dataflow.SliceDataflow",
+    "milestone3": "dynamicslicing.slice.Slice",
+}
+
+ALIAS_PROGRAM = """class Box:
+    def __init__(self):
+        self.value = 0
+def slice_me():
+    count = 1
+    box = Box()
+    copy = count
+    other = box
+    count += 1
+    other.value = 5
+    result = copy + box.value
+    return result # slicing criterion
+slice_me()
+"""
+
+# copying the primitive value of count is only an alias for SliceDataflow, copying the box is one for both analyses
+ALIAS_EXPECTED = {
+    "dynamicslicing.slice.Slice": ALIAS_PROGRAM.replace("    count += 1\n", ""),
+    "dynamicslicing.slice_dataflow.SliceDataflow": ALIAS_PROGRAM,
+}
+
+
+def test_inline_recording(directory_pair: Tuple[str, str], tmp_path: Path):
+    abs_dir, rel_dir = directory_pair
+    milestone = rel_dir.split(sep)[0]
+    if milestone not in ANALYSES:
+        pytest.skip(f"{milestone} has no slicing criterion")
+    copyfile(join(abs_dir, "program.py"), tmp_path.joinpath("program.py"))
+    slice_with_inline_recording(str(tmp_path.joinpath("program.py")), ANALYSES[milestone])
+    with open(join(abs_dir, "expected.py"), "r") as file:
+        assert correct_output(file.read(), tmp_path.joinpath("sliced.py").read_text())
+
+
+@pytest.mark.parametrize("analysis", list(ALIAS_EXPECTED))
+def test_inline_recording_aliases(analysis: str, tmp_path: Path):
+    tmp_path.joinpath("program.py").write_text(ALIAS_PROGRAM)
+    slice_with_inline_recording(str(tmp_path.joinpath("program.py")), analysis)
+    assert correct_output(ALIAS_EXPECTED[analysis], tmp_path.joinpath("sliced.py").read_text())
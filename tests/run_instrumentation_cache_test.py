@@ -0,0 +1,39 @@
+from os.path import dirname, join, realpath
+from pathlib import Path
+from shutil import copyfile, move
+from typing import Tuple
+
+from dynamicslicing.analysis_hooks import get_analysis_hooks
+from dynamicslicing.instrumentation_cache import instrument_file_cached
+
+PROGRAM_DIR = join(dirname(realpath(__file__)), "milestone3", "test_b")
+
+
+def instrument(program_file: Path, cache_folder: Path) -> Tuple[bool, str]:
+    """Instrument the program like the test runner does and restore the original afterwards. Return whether the cache
+    was hit and the instrumented program."""
+    hooks = get_analysis_hooks([f"dynamicslicing.slice.Slice:{program_file}"])
+    hit = instrument_file_cached(str(program_file), hooks, cache_folder)
+    instrumented = program_file.read_text()
+    assert "DYNAPYT: DO NOT INSTRUMENT" in instrumented
+    assert program_file.with_name("program-dynapyt.json").exists()
+    move(str(program_file.with_name("program.py.orig")), str(program_file))
+    return hit, instrumented
+
+
+def test_instrumentation_cache_hits(tmp_path: Path):
+    cache_folder = tmp_path.joinpath("cache")
+    program_file = tmp_path.joinpath("program.py")
+    copyfile(join(PROGRAM_DIR, "program.py"), program_file)
+
+    hit, instrumented = instrument(program_file, cache_folder)
+    assert not hit
+    # a hit restores the same instrumented program
+    assert instrument(program_file, cache_folder) == (True, instrumented)
+
+    # an edit of the program misses the cache
+    program_file.write_text(program_file.read_text() + "\n# edited\n")
+    hit, edited_instrumented = instrument(program_file, cache_folder)
+    assert not hit and edited_instrumented != instrumented
+    assert instrument(program_file, cache_folder) == (True, edited_instrumented)
+    assert len(list(cache_folder.iterdir())) == 2
@@ -0,0 +1,38 @@
+from os import remove
+from os.path import join, exists
+from typing import Tuple
+
+import pytest
+
+from run_settings_test import apply_settings
+from run_single_test import run_milestone_test as run_milestone, correct_output
+
+LAYERED_SLICES = {
+    "all": ["definitions", "dataflow", "control_flow"],
+    "dataflow": ["definitions", "dataflow"],
+}
+
+
+def test_layered_slices(directory_pair: Tuple[str, str], capsys, monkeypatch):
+    abs_dir, rel_dir = directory_pair
+    if not rel_dir.startswith("milestone3"):
+        pytest.skip("layered slices are computed by Slice only")
+    import dynamicslicing.slice  # noqa: F401
+    apply_settings(monkeypatch, {"LAYERED_SLICES": LAYERED_SLICES})
+    run_milestone(directory_pair, capsys)
+
+    # the slice following all layers is the slice of the analysis, a directory may contain an
+    # expected_layered_<name>.py for the other slices
+    expected_files = {"all": "expected.py", "dataflow": "expected_layered_dataflow.py"}
+    for name, expected_file_name in expected_files.items():
+        sliced_file = join(abs_dir, f"sliced_{name}.py")
+        with open(sliced_file, "r") as file:
+            actual = file.read()
+        remove(sliced_file)
+        if not exists(join(abs_dir, expected_file_name)):
+            continue
+        with open(join(abs_dir, expected_file_name), "r") as file:
+            expected = file.read()
+        if not correct_output(expected, actual):
+            pytest.fail(f"Layered slice {name} of {rel_dir} does not match expected output.\n--> Expected:\n{expected}"
+                        f"\n--> Actual:\n{actual}")
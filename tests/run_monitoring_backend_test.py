@@ -0,0 +1,46 @@
+from os.path import dirname, join, realpath
+from pathlib import Path
+from shutil import copyfile
+
+from dynamicslicing.monitoring_backend import slice_with_monitoring
+from run_single_test import correct_output
+
+THREADED_PROGRAM = """def produce():
+    global offset
+    offset = 5
+
+
+def slice_me():
+    import threading
+    worker = threading.Thread(target=produce)
+    worker.start()
+    worker.join()
+    result = offset + 1
+    return result # slicing criterion
+
+
+slice_me()
+"""
+
+THREADED_EXPECTED = """def produce():
+    offset = 5
+def slice_me():
+    result = offset + 1
+    return result # slicing criterion
+slice_me()
+"""
+
+
+def test_monitoring_backend(tmp_path: Path):
+    program_dir = join(dirname(realpath(__file__)), "milestone3", "test_b")
+    copyfile(join(program_dir, "program.py"), tmp_path.joinpath("program.py"))
+    slice_with_monitoring(str(tmp_path.joinpath("program.py")), "dynamicslicing.slice.Slice")
+    with open(join(program_dir, "expected.py"), "r") as file:
+        assert correct_output(file.read(), tmp_path.joinpath("sliced.py").read_text())
+
+
+def test_monitoring_backend_threads(tmp_path: Path):
+    # the write of the thread defines the global read by the slicing criterion
+    tmp_path.joinpath("program.py").write_text(THREADED_PROGRAM)
+    slice_with_monitoring(str(tmp_path.joinpath("program.py")), "dynamicslicing.slice.Slice")
+    assert correct_output(THREADED_EXPECTED, tmp_path.joinpath("sliced.py").read_text())
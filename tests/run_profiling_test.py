@@ -0,0 +1,65 @@
+import json
+from os.path import dirname, join, realpath
+from pathlib import Path
+
+from dynamicslicing import slice as slice_module
+from dynamicslicing.analysis_cache import get_static_analysis
+from dynamicslicing.dataflow_recorder_online import DataflowRecorderOnline
+from dynamicslicing.profiling import AnalysisProfiler
+from run_single_test import run_milestone_test
+
+PROGRAM = """def slice_me():
+    a = 1
+    b = a + 1
+    return b # slicing criterion
+slice_me()
+"""
+
+
+def test_cache_hits():
+    # a source that no other test analyzes, so that the first lookup misses
+    source = PROGRAM + "# test_cache_hits\n"
+    profiler = AnalysisProfiler(True)
+    static_analysis = get_static_analysis(source)
+    static_analysis.get_graph_definitions()
+    assert profiler.get_cache_hits() == {}
+
+    static_analysis = get_static_analysis(source)
+    static_analysis.get_graph_definitions()
+    static_analysis.get_graph_definitions()
+    assert profiler.get_cache_hits() == {"static_analysis": 1, "graph_definitions": 2}
+    assert profiler.to_dict()["cache_hits"] == {"static_analysis": 1, "graph_definitions": 2}
+
+
+def test_online_recorder_memory():
+    profiler = AnalysisProfiler(False, track_memory=True)
+    try:
+        static_analysis = get_static_analysis(PROGRAM)
+        recorder = DataflowRecorderOnline(static_analysis.slicing_criterion, static_analysis.definitions, {}, {})
+        variables = [f"variable_{index}" for index in range(1000)]
+        for index, variable in enumerate(variables):
+            recorder.record_assignment(variable, 100 + index)
+        profiler.account_recorder_memory()
+    finally:
+        profiler.finish()
+    # the online recorder stores no events, its memory is held by the slices of the variables and lines
+    assert profiler.phase_memory["recorder"]["retained"] > 0
+
+
+def test_profiling_report(capsys, monkeypatch):
+    monkeypatch.setattr(slice_module, "ENABLE_PROFILING", True)
+    program_dir = join(dirname(realpath(__file__)), "milestone3", "test_a")
+    report_file = Path(program_dir, "profiling_report.json")
+    try:
+        run_milestone_test((program_dir, join("milestone3", "test_a")), capsys)
+        report = json.loads(report_file.read_text())
+    finally:
+        report_file.unlink(missing_ok=True)
+
+    # eight reads (slice_me, a and b, a and c, d twice and x), nine writes (seven assignments and two augmented ones)
+    # and the call of slice_me
+    assert {hook: value["count"] for hook, value in report["hooks"].items()} == {"read": 8, "write": 9, "pre_call": 1}
+    assert all(value["time"] > 0 for value in report["hooks"].values())
+    for phase in ["static_analysis", "execution", "graph_dataflow", "query", "remove_lines", "write_slice"]:
+        assert report["phases"][phase] > 0
+    assert report["counts"]["events"] == 17
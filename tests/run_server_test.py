@@ -0,0 +1,136 @@
+import os
+from os.path import dirname, join, realpath
+from pathlib import Path
+from shutil import copyfile
+
+import pytest
+
+from dynamicslicing import slice as slice_module, slice_cache, slicing_server
+from dynamicslicing.slicing_server import slice_program, reslice_program, query_program
+from run_settings_test import apply_settings
+from run_single_test import correct_output
+
+PROGRAM_DIR = join(dirname(realpath(__file__)), "milestone3", "test_b")
+SLICE_LINES = [1, 2, 3, 4, 5, 6, 7, 8, 11, 12, 13, 14, 15]
+SLICE_LINES_CRITERION_10 = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 15]
+
+
+@pytest.fixture
+def sliced_program(tmp_path: Path) -> Path:
+    """A copy of a milestone 3 program, sliced by the server, so that its recorder.json is saved next to it."""
+    program_file = tmp_path.joinpath("program.py")
+    copyfile(join(PROGRAM_DIR, "program.py"), program_file)
+    slice_program(str(program_file))
+    return program_file
+
+
+def test_slice(sliced_program: Path):
+    with open(join(PROGRAM_DIR, "expected.py"), "r") as file:
+        expected = file.read()
+    assert correct_output(expected, sliced_program.with_name("sliced.py").read_text())
+
+
+def test_reslice(sliced_program: Path):
+    program, recorder_file = str(sliced_program), sliced_program.with_name("saved_trace.json")
+    sliced_program.with_name("recorder.json").rename(recorder_file)
+    assert reslice_program(program, str(recorder_file), None)["lines"] == SLICE_LINES
+    assert reslice_program(program, str(recorder_file), 10)["lines"] == SLICE_LINES_CRITERION_10
+    # reslicing must not save the trace it reads again
+    assert not sliced_program.with_name("recorder.json").exists()
+
+
+@pytest.mark.parametrize("setting", ["DEMAND_DRIVEN_SLICING", "ONLINE_SLICING"])
+def test_reslice_with_recorder_of_settings(sliced_program: Path, setting: str, monkeypatch):
+    monkeypatch.setattr(slice_module, setting, True)
+    program, recorder_file = str(sliced_program), sliced_program.with_name("recorder.json")
+    assert reslice_program(program, str(recorder_file), None)["lines"] == SLICE_LINES
+    assert reslice_program(program, str(recorder_file), 10)["lines"] == SLICE_LINES_CRITERION_10
+
+
+def test_reslice_cache(sliced_program: Path, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(slice_cache, "DEFAULT_CACHE_FOLDER", tmp_path.joinpath("slice_cache"))
+    monkeypatch.setattr(slicing_server, "SLICE_RESULT_CACHE", True)
+    program, recorder_file = str(sliced_program), str(sliced_program.with_name("recorder.json"))
+    first = reslice_program(program, recorder_file, None)
+    second = reslice_program(program, recorder_file, None)
+    assert not first["cached"] and second["cached"]
+    assert second["lines"] == SLICE_LINES and second["sliced"] == first["sliced"]
+    # another slicing criterion is a different entry of the cache
+    assert not reslice_program(program, recorder_file, 10)["cached"]
+    assert reslice_program(program, recorder_file, 10)["cached"]
+
+
+def test_slice_cache_key_settings(monkeypatch):
+    def get_key() -> str:
+        return slice_cache.get_slice_cache_key("source", 3, "Slice", "fingerprint")
+
+    key = get_key()
+    # settings that only control outputs do not change the slice
+    apply_settings(monkeypatch, {"ENABLE_PROFILING": True, "GENERATE_PLOTS": True, "ENABLE_TRACE_REPORT": True,
+                                 "SAVE_RECORDER_DATA": False})
+    assert get_key() == key
+    apply_settings(monkeypatch, {"SCOPE_FILTER": True})
+    assert get_key() != key
+
+
+def test_slice_cache_eviction(tmp_path: Path):
+    cache = slice_cache.SliceResultCache(tmp_path, max_entries=2)
+    cache.store("first", {1}, "first\n")
+    os.utime(tmp_path.joinpath("first.json"), (1, 1))
+    cache.store("second", {2}, "second\n")
+    os.utime(tmp_path.joinpath("second.json"), (2, 2))
+    # loading an entry marks it as recently used, so that the second entry is the least recently used one
+    assert cache.load("first") == ({1}, "first\n")
+    cache.store("third", {3}, "third\n")
+    assert cache.load("second") is None
+    assert cache.load("first") is not None and cache.load("third") is not None
+
+
+def test_incremental_slice(tmp_path: Path, monkeypatch):
+    apply_settings(monkeypatch, {"INCREMENTAL_SLICING": True})
+    # the hooks of the analysis depend on the settings
+    monkeypatch.setattr(slicing_server, "hooks_by_analysis", {})
+    monkeypatch.setattr(slicing_server, "previous_runs", {})
+    program_file = tmp_path.joinpath("program.py")
+    copyfile(join(PROGRAM_DIR, "program.py"), program_file)
+    assert not slice_program(str(program_file))["incremental"]
+
+    # an edit outside of the executed functions reuses the trace with the lines renumbered
+    source = program_file.read_text()
+    program_file.write_text("# edited\n" + source)
+    assert slice_program(str(program_file))["incremental"]
+    incremental_slice = program_file.with_name("sliced.py").read_text()
+    monkeypatch.setattr(slicing_server, "previous_runs", {})
+    assert not slice_program(str(program_file))["incremental"]
+    assert program_file.with_name("sliced.py").read_text() == incremental_slice
+
+    # an edit of slice_me may change the execution, so the program is executed again, even if all recorded lines are
+    # still there
+    program_file.write_text(source.replace("    p2 = p1\n", "    p1.age = 10\n    p2 = p1\n"))
+    assert not slice_program(str(program_file))["incremental"]
+
+
+def test_reslice_static_pre_slice(tmp_path: Path, monkeypatch):
+    apply_settings(monkeypatch, {"STATIC_PRE_SLICE": True})
+    program_file = tmp_path.joinpath("program.py")
+    copyfile(join(PROGRAM_DIR, "program.py"), program_file)
+    slice_program(str(program_file))
+    program, recorder_file = str(program_file), str(program_file.with_name("recorder.json"))
+    assert reslice_program(program, recorder_file, None)["lines"] == SLICE_LINES
+    assert reslice_program(program, recorder_file, 14)["lines"] == SLICE_LINES
+    # the trace only holds the events relevant to the slicing criterion of the program
+    with pytest.raises(ValueError):
+        reslice_program(program, recorder_file, 10)
+    with pytest.raises(ValueError):
+        query_program(program, recorder_file, "forward", 9, None, None)
+    assert query_program(program, recorder_file, "chop", 6, 14, None)["lines"] == [6, 7, 8, 13, 14]
+
+
+def test_query(sliced_program: Path):
+    recorder_file = str(sliced_program.with_name("recorder.json"))
+    program = str(sliced_program)
+    assert query_program(program, recorder_file, "backward", None, None, None)["lines"] == SLICE_LINES[:-1]
+    assert query_program(program, recorder_file, "forward", 9, None, None)["lines"] == [9, 10]
+    assert query_program(program, recorder_file, "chop", 6, 14, None)["lines"] == [6, 7, 8, 13, 14]
+    assert query_program(program, recorder_file, "chop", 9, 14, None)["lines"] == []
+    assert query_program(program, recorder_file, "backward", None, 8, ["dataflow"])["lines"] == [1, 5, 6, 7, 8]
@@ -0,0 +1,60 @@
+from os.path import join, exists
+from shutil import rmtree
+from typing import Tuple
+import sys
+
+import pytest
+
+from dynamicslicing import settings
+from run_single_test import run_milestone_test as run_milestone
+
+# the analysis options to test, each case runs all tests of milestone 2 and 3 with the given settings; a directory may
+# contain an expected_<case>.py if the slice of the case differs from expected.py
+SETTINGS_CASES = {
+    "scope_filter": {"SCOPE_FILTER": True},
+    "trace_shards": {"TRACE_SHARDS": True},
+    "async_recording": {"ASYNC_RECORDING": True},
+    "early_termination": {"EARLY_TERMINATION": True},
+    "early_termination_first": {"EARLY_TERMINATION": True, "EARLY_TERMINATION_OCCURRENCES": 1},
+    "demand_driven_slicing": {"DEMAND_DRIVEN_SLICING": True},
+    "instance_slicing": {"INSTANCE_SLICING": True},
+    "instance_slicing_first": {"INSTANCE_SLICING": True, "INSTANCE_SLICING_OCCURRENCE": 1},
+    "online_slicing": {"ONLINE_SLICING": True},
+    "thread_safe_recording": {"THREAD_SAFE_RECORDING": True},
+    "identity_aliases": {"IDENTITY_ALIASES": True},
+    "vectorized_dataflow": {"VECTORIZED_DATAFLOW": True},
+    "parallel_dataflow": {"PARALLEL_DATAFLOW": True, "PARALLEL_DATAFLOW_MIN_EVENTS": 0, "PARALLEL_DATAFLOW_WORKERS": 2},
+    "static_pre_slice": {"STATIC_PRE_SLICE": True},
+    "loop_fixed_point": {"LOOP_FIXED_POINT": True},
+}
+
+# cases that slice for some of the executions of the slicing criterion only, they only run where expected_<case>.py
+# exists
+PARTIAL_CASES = {"early_termination_first", "instance_slicing_first"}
+
+
+def apply_settings(monkeypatch, case_settings: dict):
+    # the settings are imported by name, so they are replaced in every module that imported them
+    modules = [module for name, module in list(sys.modules.items())
+               if name == "dynamicslicing" or name.startswith("dynamicslicing.")]
+    for setting, value in case_settings.items():
+        assert hasattr(settings, setting), f"Unknown setting {setting}"
+        for module in modules:
+            if hasattr(module, setting):
+                monkeypatch.setattr(module, setting, value)
+
+
+@pytest.mark.parametrize("settings_case", list(SETTINGS_CASES))
+def test_settings_runner(directory_pair: Tuple[str, str], settings_case: str, capsys, monkeypatch):
+    abs_dir, rel_dir = directory_pair
+    if rel_dir.startswith("milestone1"):
+        pytest.skip("milestone 1 has no slicing criterion")
+    import dynamicslicing.slice, dynamicslicing.slice_dataflow  # noqa: F401
+    apply_settings(monkeypatch, SETTINGS_CASES[settings_case])
+    expected_file_name = f"expected_{settings_case}.py"
+    if not exists(join(abs_dir, expected_file_name)):
+        if settings_case in PARTIAL_CASES:
+            pytest.skip(f"{settings_case} has no expected output for {rel_dir}")
+        expected_file_name = "expected.py"
+    run_milestone(directory_pair, capsys, expected_file_name)
+    rmtree(join(abs_dir, "trace_shards"), ignore_errors=True)
@@ -8,10 +8,11 @@ from typing import Tuple
 import libcst as cst
 import pytest
 
-from dynapyt.instrument.instrument import instrument_file
-from dynapyt.utils.hooks import get_hooks_from_analysis
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
 
+from dynamicslicing.analysis_hooks import get_analysis_hooks
+from dynamicslicing.instrumentation_cache import instrument_file_cached
+
 
 def correct_output(expected: str, actual: str) -> bool:
     if actual == expected or actual == expected + "\n":
@@ -26,6 +27,10 @@ def correct_output(expected: str, actual: str) -> bool:
 
 
 def test_runner(directory_pair: Tuple[str, str], capsys):
+    run_milestone_test(directory_pair, capsys)
+
+
+def run_milestone_test(directory_pair: Tuple[str, str], capsys, expected_file_name: str = "expected.py"):
     abs_dir, rel_dir = directory_pair
     import dynapyt.runtime as _rt
 
@@ -53,9 +58,10 @@ def test_runner(directory_pair: Tuple[str, str], capsys):
                 pytest.fail(f"Could find only the instrumented program in {rel_dir}")
             copyfile(orig_program_file, program_file)
 
-    selected_hooks = get_hooks_from_analysis([f"{module_name}.{ac[0]}:{program_file}" for ac in analysis_classes])
+    selected_hooks = get_analysis_hooks([f"{module_name}.{ac[0]}:{program_file}" for ac in analysis_classes])
 
-    instrument_file(program_file, selected_hooks)
+    # restores the instrumented program from the cache if neither the program nor the hooks changed
+    instrument_file_cached(program_file, selected_hooks)
 
     analysis_instances = [class_[1](orig_program_file) for class_ in analysis_classes]
 
@@ -67,13 +73,15 @@ def test_runner(directory_pair: Tuple[str, str], capsys):
     for analysis_instance in analysis_instances:
         if hasattr(analysis_instance, "begin_execution"):
             analysis_instance.begin_execution()
+    # the program may have been imported by an earlier test of the same directory
+    sys.modules.pop(f"{module_prefix}.program", None)
     import_module(f"{module_prefix}.program")
     _rt.end_execution()
     del sys.modules["dynapyt.runtime"]
     del _rt
 
     # check output
-    expected_file = join(abs_dir, "expected.py")
+    expected_file = join(abs_dir, expected_file_name)
     with open(expected_file, "r") as file:
         expected = file.read()
 
@@ -0,0 +1,55 @@
+import copy
+import os
+import weakref
+from pathlib import Path
+
+from dynamicslicing.dataflow_recorder import DataflowRecorderSimple
+from dynamicslicing.trace_shards import TraceShardManager, find_child_shards
+
+
+class RecordingAnalysis:
+
+    def __init__(self, recorder: DataflowRecorderSimple):
+        self.recorder = recorder
+
+
+def fork(manager: TraceShardManager) -> TraceShardManager:
+    """Imitate the fork of the process of the given manager, the child gets a copy of its analysis and manager."""
+    child_analysis = RecordingAnalysis(manager.analysis().recorder)
+    child = copy.copy(manager)
+    child.analysis = weakref.ref(child_analysis)
+    child.on_fork_in_child()
+    # the analysis is only referenced weakly, like the runtime of a real child would keep it alive
+    child.analysis_reference = child_analysis
+    return child
+
+
+def test_shards_of_reused_pids(tmp_path: Path):
+    # all children of this test run in the same process, like children whose pid is reused by the operating system
+    analysis = RecordingAnalysis(DataflowRecorderSimple())
+    manager = TraceShardManager(True, analysis, tmp_path)
+    try:
+        analysis.recorder.record_assignment("a", 1)
+        first_child = fork(manager)
+        first_child.analysis().recorder.record_usage("a", 2)
+        grandchild = fork(first_child)
+        grandchild.analysis().recorder.record_usage("a", 3)
+        grandchild.save_shard()
+        first_child.save_shard()
+        analysis.recorder.record_assignment("a", 4)
+        analysis.recorder.record_assignment("b", 5)
+        second_child = fork(manager)
+        second_child.analysis().recorder.record_usage("a", 6)
+        second_child.save_shard()
+    finally:
+        manager.stop()
+
+    shards = manager.load_shards()
+    assert len(list(tmp_path.iterdir())) == 3
+    assert {shard.pid for shard in shards} == {os.getpid()}
+    children = find_child_shards(shards, manager.process_id)
+    assert [shard.fork_index for shard in children] == [1, 3]
+    assert [[event.line for event in shard.recorder.event_stack] for shard in children] == [[2], [6]]
+    grandchildren = find_child_shards(shards, children[0].process_id)
+    assert [[event.line for event in shard.recorder.event_stack] for shard in grandchildren] == [[3]]
+    assert find_child_shards(shards, children[1].process_id) == []
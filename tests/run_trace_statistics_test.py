@@ -0,0 +1,53 @@
+from os.path import dirname, join, realpath
+from pathlib import Path
+from shutil import rmtree
+import json
+
+from dynamicslicing import slice as slice_module
+from dynamicslicing.dataflow_recorder import load_recorder_from_file
+from dynamicslicing.trace_statistics import create_trace_report
+from run_settings_test import apply_settings
+from run_single_test import run_milestone_test
+
+MILESTONE_DIR = join(dirname(realpath(__file__)), "milestone3")
+
+
+def test_trace_report_counts(capsys, monkeypatch):
+    monkeypatch.setattr(slice_module, "ENABLE_TRACE_REPORT", True)
+    program_dir = join(MILESTONE_DIR, "test_b")
+    report_file = Path(program_dir, "trace_report.json")
+    try:
+        run_milestone_test((program_dir, join("milestone3", "test_b")), capsys)
+        report = json.loads(report_file.read_text())
+    finally:
+        report_file.unlink(missing_ok=True)
+
+    assert report["events"] == 37
+    assert report["events_by_kind"] == {"EventUse": 24, "EventAssign": 6, "EventModify": 6, "EventAlias": 1}
+    # result.append(text) uses result, result.append and text and modifies result
+    assert report["events_by_line"]["13"] == 6
+    assert report["events_by_variable"]["result"] == 8
+    assert report["hot_lines"][0] == {"line": 10, "count": 6, "source": "unused_list.append(text)"}
+    # text is used twice, by the two appends
+    text_edges = next(entry for entry in report["edges_by_definition"] if entry["line"] == 8)
+    assert text_edges["edges"] == 4 and text_edges["distinct_targets"] == 2
+
+    # the report of the saved trace is the same
+    with open(join(program_dir, "program.py"), "r") as file:
+        source = file.read()
+    assert create_trace_report(load_recorder_from_file(Path(program_dir, "recorder.json")), source) == report
+
+
+def test_trace_report_with_trace_shards(capsys, monkeypatch):
+    # the report must not change the slice, so it is built from the trace shards of forked children as well
+    apply_settings(monkeypatch, {"TRACE_SHARDS": True, "ENABLE_TRACE_REPORT": True})
+    program_dir = join(MILESTONE_DIR, "test_g")
+    report_file = Path(program_dir, "trace_report.json")
+    try:
+        run_milestone_test((program_dir, join("milestone3", "test_g")), capsys, "expected_trace_shards.py")
+        report = json.loads(report_file.read_text())
+    finally:
+        report_file.unlink(missing_ok=True)
+        rmtree(join(program_dir, "trace_shards"), ignore_errors=True)
+    # total = a + b and return total run in the forked child only
+    assert report["events_by_line"]["8"] > 0 and report["events_by_line"]["9"] > 0